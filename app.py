@@ -9,18 +9,44 @@ Deploy to Streamlit Cloud with: streamlit cloud deploy
 import streamlit as st
 import pandas as pd
 import numpy as np
-import folium
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
-from sklearn.linear_model import LinearRegression
 import warnings
 import os
+import threading
+
+from hsri.forecast import fit_models_cached, predict_models, site_window_keys, snapshot_forecast, stack_site_windows
+from hsri.models import ModelRegistry
+from hsri.formula import RISK_LEVELS, RISK_RANGES, get_risk_category
+from hsri.forecast_job import DAYS_AHEAD, FORECAST_TABLE, MIN_ROWS, WINDOW, lookup_forecasts, read_forecast_table
+from hsri.ingest import load_store_cube, load_weather_store
+from hsri.boundaries import aggregate_by_area, load_county_boundaries, load_metro_outline
+from hsri.maps import (
+    COUNTY_ZOOM, WEATHER_DETAILS, build_county_map, build_playback_map, build_site_map, county_values, map_center, render_map_html,
+    site_feature_collection,
+)
+from hsri.playback import PLAYBACK_MAX_DAYS, playback_frames
+from hsri.render_cache import RenderCache
+from hsri.result_cache import ResultCache
+from hsri.snapshot import build_snapshot
+from hsri.spatial import SiteIndex
+from hsri.surface import metro_surface
+from hsri.sites import join_sites, load_metro_data as read_metro_data, load_site_data, load_site_registry as read_site_registry
+from hsri.timeindex import build_day_index, build_time_index, find_closest_time, find_day, get_day_slice
+from hsri.warmup import MODEL_REGISTRY, MODEL_REGISTRY_ENTRIES, WARM_HOURS, warm_positions
 #warnings.filterwarnings('ignore')
 
 # Define the base directory of your script file
 DIR_NAME = os.path.dirname(os.path.abspath(__file__))
 
+# Sidecar caches (Parquet copy of weather.csv, memory-mapped store, models)
+WEATHER_CACHE_DIR = os.path.join(DIR_NAME, 'data', '.cache')
+
+# Finer county outlines, served by Streamlit static file serving (.streamlit/config.toml)
+COUNTY_GEOJSON_DIR = os.path.join(DIR_NAME, 'static', 'geo')
+COUNTY_GEOJSON_URL = 'app/static/geo/'
+
 # ============================================================================
 # PAGE CONFIG
 # ============================================================================
@@ -37,231 +63,280 @@ st.markdown("**Heat Stress Risk Index** • Real-time conditions & clothing reco
 # ============================================================================
 # LOAD DATA
 # ============================================================================
-@st.cache_data
+@st.cache_resource
 def load_weather_data():
-    """Load and preprocess weather CSV, filtering for core meteorological data."""
+    """
+    Load the processed weather data as a read-only, memory-mapped frame.
+    
+    Shared by every session (st.cache_resource, no per-session copy); see
+    hsri.ingest.load_weather_store for the on-disk store behind it.
+    """
     # Use os.path.join for cross-platform path creation
     filepath = os.path.join(DIR_NAME, 'data', 'weather.csv')
-    
-    df = pd.read_csv(filepath)
-    df['datetime'] = pd.to_datetime(df['datetime'])
-    
-    # Filter for rows with core meteorological parameters only
-    required_cols = ['temp', 'humidity', 'windspeed']
-    df = df.dropna(subset=required_cols)
-    
-    # Keep solar radiation, UV index, and cloud cover as-is (with NaN for missing values)
-    # These will be handled as "N/A" in display
-    
-    return df
+    return load_weather_store(filepath, WEATHER_CACHE_DIR)
 
-@st.cache_data
-def load_metro_data():
-    """Load metro area county data."""
+@st.cache_resource
+def load_time_index(_weather_df):
+    """Time index over the cached weather data, built once per process."""
+    return build_time_index(_weather_df)
+
+@st.cache_resource
+def load_day_index(_weather_df):
+    """Per-day row ranges of the cached weather data, built once per process."""
+    return build_day_index(load_time_index(_weather_df))
+
+@st.cache_resource
+def load_model_registry():
+    """Process-wide registry of fitted forecast models, persisted next to the data cache."""
+    return ModelRegistry(max_entries=MODEL_REGISTRY_ENTRIES, path=MODEL_REGISTRY)
+
+@st.cache_resource
+def load_weather_cube(_weather_df):
+    """Dense [site, hour, variable] cube, memory-mapped from the weather store."""
+    return load_store_cube(_weather_df, WEATHER_CACHE_DIR)
+
+@st.cache_resource
+def load_map_cache():
+    """Process-wide cache of rendered map HTML, shared by every session."""
+    return RenderCache(max_bytes=64 * 2**20, max_entries=256)
+
+@st.cache_resource
+def load_result_cache():
+    """Process-wide cache of snapshots and forecasts, shared by every session."""
+    return ResultCache(max_entries=512)
+
+def render_site_map(maps, key, build_map):
+    """
+    HTML of a Folium map, reusing the HTML rendered for key by any session.
+
+    key must cover every input the map depends on; build_map is only
+    called (and the map only serialized) on a cache miss.
+    """
+    return maps.get_or_render(key, lambda: render_map_html(build_map()))
+
+def show_site_map(key, build_map):
+    """Draw a Folium map through the process-wide map cache (see render_site_map)."""
+    components.html(render_site_map(load_map_cache(), key, build_map), width=1400, height=700)
+
+def build_area_site_map(df_area, surface=None):
+    """Dashboard map: every site of the area through one GeoJSON layer, over the interpolated surface if given."""
+    site_features = site_feature_collection(
+        df_area['latitude'], df_area['longitude'], df_area['hsri'],
+        df_area['site_name'].fillna('Unknown').tolist(), df_area['county'].fillna('Unknown').tolist(),
+        details={key: df_area[key] for _, key, _, _ in WEATHER_DETAILS},
+    )
+    return build_site_map(
+        site_features,
+        map_center(df_area['latitude'], df_area['longitude']),
+        details=WEATHER_DETAILS,
+        zoom_start=11 if surface is None else 9,
+        surface=surface,
+    )
+
+@st.cache_resource
+def load_site_registry():
+    """Site registry from config/sites.rds and config/counties.rds, built once per process."""
+    return read_site_registry()
+
+@st.cache_resource
+def load_sites(_weather_df):
+    """Site metadata for every AQS id in the cached weather data, one row per site code."""
+    return load_site_data(_weather_df, load_site_registry())
+
+@st.cache_resource
+def load_site_index(_sites_df):
+    """Spatial index over every site in the cached weather data, built once per process."""
+    return SiteIndex(_sites_df['aqs_id_full'].to_numpy(), _sites_df['latitude'], _sites_df['longitude'])
+
+@st.cache_resource
+def load_county_geometry():
+    """Metro county boundaries and CSA outline; simplified GeoJSON is cached on them per detail level."""
+    return load_county_boundaries(), load_metro_outline()
+
+@st.cache_resource
+def load_county_levels():
+    """County outlines per detail level: the choropleth's starting level inline, the finer ones as static files."""
+    counties, _ = load_county_geometry()
+    return counties.detail_levels(inline_zoom=COUNTY_ZOOM, directory=COUNTY_GEOJSON_DIR, url_prefix=COUNTY_GEOJSON_URL)
+
+@st.cache_resource
+def load_surface_grid(_weather_cube, data_version):
+    """Inverse-distance weights from the cube's sites to the metro grid, computed once per data version."""
+    counties, _ = load_county_geometry()
+    if counties is None:
+        return None
+    latitude, longitude = load_site_registry().surveyed_coordinates(_weather_cube.site_ids)
+    return metro_surface(latitude, longitude, counties)
+
+@st.cache_data(max_entries=256)
+def load_hsri_surface(_surface_grid, _weather_cube, data_version, hour_pos):
+    """Interpolated HSRI grid for one hour of the cube, cached per timestamp."""
+    return _surface_grid.interpolate(_weather_cube.data[:, hour_pos, _weather_cube.variable_position('hsri')])
+
+def site_surface(surface_grid, weather_cube, aqs_ids, values):
+    """(grid, bounds) interpolated from per-site values; cube sites not in aqs_ids count as not reporting."""
+    site_values = np.full(len(weather_cube.site_ids), np.nan)
+    for aqs_id, value in zip(aqs_ids, values):
+        pos = weather_cube.site_position(aqs_id)
+        if pos is not None:
+            site_values[pos] = value
+    return surface_grid.interpolate(site_values), surface_grid.image_bounds
+
+@st.cache_resource
+def load_forecast_table(mtime_ns):
+    """Precomputed forecast table written by `python -m hsri.forecast_job` (reloaded when the file changes)."""
+    return read_forecast_table(FORECAST_TABLE)
+
+def forecast_table_mtime():
     try:
-        # Use os.path.join for cross-platform path creation
-        filepath = os.path.join(DIR_NAME, 'data', 'metro.csv')
-        metro_df = pd.read_csv(filepath)
-        return metro_df
-    except FileNotFoundError:
+        return os.stat(FORECAST_TABLE).st_mtime_ns
+    except OSError:
         return None
 
-def load_site_data(weather_df=None):
-    """Load site metadata - dynamically from weather data or defaults."""
-    if weather_df is None:
-        weather_df = load_weather_data()
-    
-    # Get unique AQS IDs from weather data
-    unique_aqs_ids = weather_df['aqs_id_full'].unique()
-    
-    # Create mapping for known/major NYC metro AQS IDs
-    aqs_mapping = {
-        # NYC (5 Boroughs)
-        840421010055: ('Manhattan-Midtown', 'New York County', 40.7614, -73.9776),
-        840421010075: ('Manhattan-Upper West', 'New York County', 40.7831, -73.9712),
-        840421010048: ('Manhattan-Upper East', 'New York County', 40.7688, -73.9519),
-        840090010010: ('Brooklyn-Downtown', 'Kings County', 40.6501, -73.9496),
-        
-        # Queens
-        840360470052: ('Queens-Astoria', 'Queens County', 40.7673, -73.9302),
-        840360470118: ('Queens-Jamaica', 'Queens County', 40.7014, -73.8156),
-        
-        # Bronx
-        840360610135: ('Bronx-SW', 'Bronx County', 40.8298, -73.8850),
-        840360610115: ('Bronx-Pelham', 'Bronx County', 40.8648, -73.8276),
-        
-        # Staten Island
-        840360850055: ('Staten Island-Fresh Kills', 'Richmond County', 40.5834, -74.1677),
-        840360850111: ('Staten Island-Coney Island', 'Richmond County', 40.5755, -74.1333),
-        
-        # Westchester County
-        840360050080: ('Westchester-Yonkers', 'Westchester County', 40.9230, -73.8987),
-        840360050110: ('Westchester-Mamaroneck', 'Westchester County', 40.9450, -73.7350),
-        840360050112: ('Westchester-Croton', 'Westchester County', 41.1833, -73.8667),
-        
-        # New Jersey - Bergen & Hudson
-        840360710002: ('NJ-Hudson', 'Hudson County', 40.7178, -74.0569),
-        
-        # Connecticut
-        840090090027: ('CT-New Haven', 'New Haven County', 41.3083, -72.9279),
-        840090110124: ('CT-Bridgeport', 'Fairfield County', 41.1833, -73.1833),
-        840090011123: ('CT-Stamford', 'Fairfield County', 41.0534, -73.5387),
-        
-        # Long Island - Nassau & Suffolk
-        840340030010: ('Nassau-NW', 'Nassau County', 40.8333, -73.6667),
-        840340070010: ('Nassau-Central', 'Nassau County', 40.8500, -73.5000),
-        840340170008: ('Suffolk-E', 'Suffolk County', 40.9500, -72.8000),
-        840340171003: ('Suffolk-SE', 'Suffolk County', 40.8667, -72.7333),
-        840340210005: ('Suffolk-Central', 'Suffolk County', 40.9000, -72.9000),
-        840340210008: ('Suffolk-NE', 'Suffolk County', 41.0500, -72.7500),
-        840340390004: ('Nassau-SW', 'Nassau County', 40.6833, -73.5000),
-        840340392003: ('Nassau-S', 'Nassau County', 40.6500, -73.6667),
-        840340190001: ('Hempstead', 'Nassau County', 40.7550, -73.6219),
-        840340273001: ('Freeport', 'Nassau County', 40.6575, -73.5819),
-        840340230011: ('Rockville Centre', 'Nassau County', 40.6667, -73.6500),
-        840340410007: ('Valley Stream', 'Nassau County', 40.6650, -73.7100),
-        
-        # Rockland County, NY
-        840360810120: ('Rockland-W', 'Rockland County', 41.0880, -74.2435),
-        840360810124: ('Rockland-S', 'Rockland County', 41.1333, -74.0333),
-        
-        # Orange County, NY
-        840360870005: ('Orange County', 'Orange County', 41.3333, -74.2667),
-        
-        # Dutchess & Putnam Counties, NY
-        840361030009: ('Dutchess County', 'Dutchess County', 41.6333, -73.7000),
-        840361192004: ('Putnam County', 'Putnam County', 41.4667, -73.8667),
-    }
-    
-    sites_list = []
-    for aqs_id in unique_aqs_ids:
-        if aqs_id in aqs_mapping:
-            site_name, county, lat, lon = aqs_mapping[aqs_id]
-            sites_list.append({
-                'aqs_id_full': aqs_id,
-                'site_name': site_name,
-                'county': county,
-                'latitude': lat,
-                'longitude': lon
-            })
-        else:
-            # For unknown AQS IDs, create generic entry with NYC center coordinates
-            sites_list.append({
-                'aqs_id_full': aqs_id,
-                'site_name': f'Location-{aqs_id}',
-                'county': 'Other',
-                'latitude': 40.7128,  # NYC center
-                'longitude': -74.0060
-            })
-    
-    sites = pd.DataFrame(sites_list)
-    return sites
+def load_area_forecasts(results, weather_cube, model_registry, data_version, aqs_ids, table_mtime_ns, forecast_table):
+    """
+    3-day forecasts {aqs_id: [day1, day2, day3]} issued at the latest hour in
+    the data, shared read-only by every session.
 
-# ============================================================================
-# HSRI CALCULATION (from project specification)
-# ============================================================================
-def compute_hsri(temp_f, humidity, wind_speed, solar_radiation, uv_index, cloud_cover):
+    Cached on the data version, site set and table version, so reruns that
+    only change the threshold, day or snapshot time do not refit, and
+    concurrent sessions asking for the same sites wait on one fit. New
+    models are left for the caller to save.
     """
-    Compute Heat Stress Risk Index (HSRI).
-    
-    Formula: HSRI = HI_base + α·UV + β·SR_eff − γ·WS [− δ·CC]
-    
-    where:
-    - HI_base: NWS Heat Index computed from temperature and humidity
-    - UV: UV index (0-10+), higher increases radiant heat load
-    - SR_eff: Effective solar radiation (W/m²), scaled to ~0-1
-    - WS: Wind speed (mph), cooling effect reduces HSRI
-    - CC: Cloud cover (%), shading effect
-    
-    Calibrated weights: α=0.3, β=8, γ=4, δ=0.05
-    Missing values for solar, UV, and cloud cover are treated as 0
+    return results.get_or_compute(
+        ('forecast', data_version, tuple(aqs_ids), table_mtime_ns),
+        lambda: compute_area_forecasts(weather_cube, model_registry, data_version, aqs_ids, forecast_table),
+    )
+
+def compute_area_forecasts(weather_cube, model_registry, data_version, aqs_ids, forecast_table):
     """
-    # NWS Heat Index (Rothfusz regression)
-    hi_base = compute_hi_nws(temp_f, humidity)
-    
-    # Handle missing values for solar radiation, UV, and cloud cover
-    sr_eff = 0 if pd.isna(solar_radiation) else max(0, solar_radiation / 1000.0)
-    uv_val = 0 if pd.isna(uv_index) else uv_index
-    cc_val = 0 if pd.isna(cloud_cover) else cloud_cover
-    
-    # HSRI components with empirically calibrated weights
-    alpha, beta, gamma, delta = 0.3, 8.0, 4.0, 0.05
-    hsri = hi_base + alpha * uv_val + beta * sr_eff - gamma * wind_speed - delta * cc_val
-    
-    return np.clip(hsri, -100, 100)  # Reasonable bounds for human comfort index
+    Uses the precomputed forecast table where the batch job has covered the
+    issue hour and fits the remaining sites' models in one batched solve over
+    their last WINDOW records (need MIN_ROWS records to forecast).
+    """
+    forecasts = {}
+    if len(weather_cube.times):
+        issue_time = weather_cube.timestamp(len(weather_cube.times) - 1)
+        forecasts.update(lookup_forecasts(forecast_table, issue_time, aqs_ids, data_version, min_rows=MIN_ROWS))
 
-def compute_hi_nws(temp_f, humidity):
-    """NWS Heat Index (Rothfusz regression)."""
-    T = temp_f
-    RH = humidity
-    
-    if T < 80:
-        return T
-    
-    # Coefficients
-    c1, c2, c3 = -42.379, 2.04901523, 10.14333127
-    c4, c5, c6 = -0.22475541, -0.00683783, -0.05481717
-    c7, c8, c9 = 0.00122874, 0.00085282, -0.00000199
-    
-    HI = (c1 + c2*T + c3*RH + c4*T*RH + c5*T**2 + c6*RH**2 +
-          c7*T**2*RH + c8*T*RH**2 + c9*T**2*RH**2)
-    return HI
+    live_aqs_ids = [aqs_id for aqs_id in aqs_ids if aqs_id not in forecasts]
+    if live_aqs_ids:
+        site_positions = [weather_cube.site_position(aqs_id) for aqs_id in live_aqs_ids]
+        windows = stack_site_windows(weather_cube, site_positions, window=WINDOW)
+        window_keys = site_window_keys(windows, live_aqs_ids, data_version)
+        site_models = fit_models_cached(windows.X, windows.y, windows.mask, window_keys, model_registry, min_rows=MIN_ROWS)
+        forecast_matrix = predict_models(site_models, days_ahead=DAYS_AHEAD)
 
-def forecast_hsri(historical_data, days_ahead=3):
+        for aqs_id, forecast in zip(live_aqs_ids, forecast_matrix):
+            if not np.isnan(forecast).any():
+                forecasts[aqs_id] = forecast.tolist()
+    return forecasts
+
+def load_snapshot(results, weather_df, time_index, sites_df, metro_df, data_version, pos):
+    """Enriched snapshot for one timestamp, built once and shared read-only by every session."""
+    return results.get_or_compute(
+        ('snapshot', data_version, int(time_index.times[pos])),
+        lambda: build_snapshot(weather_df, time_index, pos, sites_df, metro_df),
+    )
+
+def load_snapshot_forecast(results, snapshot, model_registry, data_version):
     """
-    Forecast HSRI for next 1-3 days using Linear Regression.
-    
-    Based on project findings: Linear Regression (R² = 0.965) recommended
-    for operational deployment due to interpretability and accuracy.
+    3-day forecast from a snapshot's rows (None if no model fits), computed
+    once per timestamp. New models are left for the caller to save.
     """
-    if len(historical_data) < 10:
-        return None
+    return results.get_or_compute(
+        ('snapshot-forecast', data_version, snapshot.time.value),
+        lambda: snapshot_forecast(snapshot.rows, snapshot.time.value, model_registry, data_version),
+    )
+
+def area_options(snapshot):
+    """{area name: site names} for the areas with sites in a snapshot, 'All Areas' first."""
+    snapshot_sites = snapshot.rows['site_name']
+    
+    # Get only known sites (not Location-XXXXX) that have data at this time
+    known_sites_available = snapshot_sites[~snapshot_sites.str.contains('Location-', regex=False)].unique().tolist()
+    
+    if not known_sites_available:
+        # Fallback to all available sites
+        known_sites_available = snapshot_sites.unique().tolist()
+    
+    # Create borough options ONLY with sites that exist in current data
+    nyc_areas = {'All Areas': known_sites_available}
+    
+    predefined_areas = {
+        'Manhattan': ['Manhattan-Midtown', 'Manhattan-Upper West', 'Manhattan-Upper East'],
+        'Brooklyn': ['Brooklyn-Downtown'],
+        'Queens': ['Queens-Astoria', 'Queens-Jamaica'],
+        'Bronx': ['Bronx-SW', 'Bronx-Pelham'],
+        'Staten Island': ['Staten Island-Fresh Kills', 'Staten Island-Coney Island'],
+        'Westchester': ['Westchester-Yonkers', 'Westchester-Mamaroneck', 'Westchester-Croton'],
+        'Long Island (Nassau)': ['Nassau-NW', 'Nassau-Central', 'Nassau-SW', 'Nassau-S', 'Hempstead', 'Freeport', 'Rockville Centre', 'Valley Stream'],
+        'Long Island (Suffolk)': ['Suffolk-E', 'Suffolk-SE', 'Suffolk-Central', 'Suffolk-NE'],
+        'New Jersey': ['NJ-Hudson'],
+        'Connecticut': ['CT-New Haven', 'CT-Bridgeport', 'CT-Stamford'],
+        'Rockland County': ['Rockland-W', 'Rockland-S'],
+        'Orange/Dutchess': ['Orange County', 'Dutchess County', 'Putnam County']
+    }
     
-    try:
-        # Prepare features for modeling
-        feature_cols = ['temp', 'humidity', 'windspeed', 'solarradiation', 'uvindex', 'cloudcover']
-        X = historical_data[feature_cols].copy()
-        
-        # Fill NaN values in solar, UV, and cloud cover with column mean
-        X['solarradiation'] = X['solarradiation'].fillna(X['solarradiation'].mean())
-        X['uvindex'] = X['uvindex'].fillna(X['uvindex'].mean())
-        X['cloudcover'] = X['cloudcover'].fillna(X['cloudcover'].mean())
-        
-        X = X.values
-        y = historical_data['hsri'].values
-        
-        # Train linear regression
-        model = LinearRegression()
-        model.fit(X, y)
-        
-        # Generate forecast by interpolating future weather patterns
-        avg_features = X.mean(axis=0)
-        forecast_values = []
-        
-        for day in range(1, days_ahead + 1):
-            # Simple trend: assume weather gradually changes
-            forecast_features = avg_features * (1 + 0.02 * day)
-            forecast_hsri = model.predict([forecast_features])[0]
-            forecast_values.append(np.clip(forecast_hsri, -100, 100))
-        
-        return forecast_values
-    except:
-        return None
+    for area_name, sites in predefined_areas.items():
+        available_for_area = [s for s in sites if s in known_sites_available]
+        if available_for_area:
+            nyc_areas[area_name] = available_for_area
+    return nyc_areas
 
-def get_risk_category(hsri):
-    """Categorize heat risk based on HSRI threshold."""
-    if hsri >= 85:
-        return "🔴 CRITICAL", "Critical Heat"
-    elif hsri >= 75:
-        return "🟠 HIGH", "High Heat"
-    elif hsri >= 65:
-        return "🟡 MODERATE", "Moderate Heat"
-    elif hsri >= 50:
-        return "🟢 LOW", "Mild"
-    elif hsri >= 30:
-        return "🔵 COOL", "Cool"
-    else:
-        return "🟣 FREEZING", "Freezing"
+def area_forecast_ids(sites_df, site_names, weather_cube):
+    """AQS ids of the named sites that have a series in the cube."""
+    selected_aqs_ids = sites_df[sites_df['site_name'].isin(site_names)]['aqs_id_full'].unique()
+    return tuple(aqs_id for aqs_id in selected_aqs_ids if weather_cube.site_position(aqs_id) is not None)
+
+def warm_caches(results, maps, weather_df, time_index, sites_df, metro_df, weather_cube, model_registry,
+                data_version, table_mtime_ns, forecast_table, positions):
+    """
+    Fill the process-wide caches for the 'All Areas' view of each time
+    position: snapshot, Dashboard forecast and map, and area forecasts.
+    Sessions asking for an entry being warmed wait for it instead of
+    computing it again. Models fitted on the way are saved once, at the end.
+    """
+    for pos in positions:
+        snapshot = load_snapshot(results, weather_df, time_index, sites_df, metro_df, data_version, pos)
+        if len(snapshot) == 0:
+            continue
+        site_names = area_options(snapshot)['All Areas']
+        df_area = snapshot.view(snapshot.area_mask(site_names))
+        load_snapshot_forecast(results, snapshot, model_registry, data_version)
+        render_site_map(
+            maps, ('dashboard', data_version, snapshot.time.value, 'All Areas'), lambda: build_area_site_map(df_area)
+        )
+        load_area_forecasts(
+            results, weather_cube, model_registry, data_version,
+            area_forecast_ids(sites_df, site_names, weather_cube), table_mtime_ns, forecast_table,
+        )
+    model_registry.save()
+
+@st.cache_resource
+def start_cache_warmup(_weather_df, _time_index, _sites_df, _metro_df, _weather_cube, _model_registry, data_version, table_mtime_ns):
+    """
+    Warm the caches for the default view and the latest hours in a
+    background thread, once per process and data version (see hsri.warmup).
+    """
+    thread = threading.Thread(
+        target=warm_caches,
+        args=(
+            load_result_cache(), load_map_cache(), _weather_df, _time_index, _sites_df, _metro_df, _weather_cube,
+            _model_registry, data_version, table_mtime_ns, load_forecast_table(table_mtime_ns),
+            warm_positions(_time_index, WARM_HOURS),
+        ),
+        name='hsri-cache-warmup',
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+@st.cache_resource
+def load_metro_data():
+    """Load metro area county data."""
+    # Use os.path.join for cross-platform path creation
+    return read_metro_data(os.path.join(DIR_NAME, 'data', 'metro.csv'))
 
 # ============================================================================
 # MAIN APP
@@ -274,7 +349,7 @@ except FileNotFoundError:
     st.error("❌ `weather.csv` not found in data/ folder.")
     st.stop()
 
-sites_df = load_site_data(weather_df)
+sites_df = load_sites(weather_df)
 metro_df = load_metro_data()
 
 # Custom CSS for better styling
@@ -301,8 +376,16 @@ st.sidebar.header("⚙️ Dashboard Controls")
 # Time selection - use date and time inputs instead of slider
 col_date, col_time = st.sidebar.columns(2)
 
-min_date = weather_df['datetime'].min().date()
-max_date = weather_df['datetime'].max().date()
+time_index = load_time_index(weather_df)
+weather_cube = load_weather_cube(weather_df)
+model_registry = load_model_registry()
+data_version = weather_df.attrs.get('data_version')
+
+# Warm the snapshot, forecast and map caches for the default view and the latest hours
+start_cache_warmup(weather_df, time_index, sites_df, metro_df, weather_cube, model_registry, data_version, forecast_table_mtime())
+
+min_date = pd.Timestamp(time_index.times[0], tz='UTC').date()
+max_date = pd.Timestamp(time_index.times[-1], tz='UTC').date()
 
 with col_date:
     selected_date = st.date_input(
@@ -337,45 +420,15 @@ hsri_threshold = st.sidebar.number_input(
 st.sidebar.markdown("### 📍 NYC Area Selection")
 
 # Get sites available for current time
-available_times = weather_df['datetime'].unique()
 if pd.Timestamp(selected_datetime).tz is None:
     selected_ts = pd.Timestamp(selected_datetime, tz='UTC')
 else:
     selected_ts = pd.Timestamp(selected_datetime)
 
-closest_time = min(available_times, key=lambda x: abs((x - selected_ts).total_seconds()))
-df_time = weather_df[weather_df['datetime'] == closest_time].copy()
-df_time = df_time.merge(sites_df, on='aqs_id_full', how='left')
-
-# Get only known sites (not Location-XXXXX) that have data at this time
-known_sites_available = df_time[~df_time['site_name'].str.contains('Location-', regex=False)]['site_name'].unique().tolist()
-
-if not known_sites_available:
-    # Fallback to all available sites
-    known_sites_available = df_time['site_name'].unique().tolist()
-
-# Create borough options ONLY with sites that exist in current data
-nyc_areas = {'All Areas': known_sites_available}
-
-predefined_areas = {
-    'Manhattan': ['Manhattan-Midtown', 'Manhattan-Upper West', 'Manhattan-Upper East'],
-    'Brooklyn': ['Brooklyn-Downtown'],
-    'Queens': ['Queens-Astoria', 'Queens-Jamaica'],
-    'Bronx': ['Bronx-SW', 'Bronx-Pelham'],
-    'Staten Island': ['Staten Island-Fresh Kills', 'Staten Island-Coney Island'],
-    'Westchester': ['Westchester-Yonkers', 'Westchester-Mamaroneck', 'Westchester-Croton'],
-    'Long Island (Nassau)': ['Nassau-NW', 'Nassau-Central', 'Nassau-SW', 'Nassau-S', 'Hempstead', 'Freeport', 'Rockville Centre', 'Valley Stream'],
-    'Long Island (Suffolk)': ['Suffolk-E', 'Suffolk-SE', 'Suffolk-Central', 'Suffolk-NE'],
-    'New Jersey': ['NJ-Hudson'],
-    'Connecticut': ['CT-New Haven', 'CT-Bridgeport', 'CT-Stamford'],
-    'Rockland County': ['Rockland-W', 'Rockland-S'],
-    'Orange/Dutchess': ['Orange County', 'Dutchess County', 'Putnam County']
-}
-
-for area_name, sites in predefined_areas.items():
-    available_for_area = [s for s in sites if s in known_sites_available]
-    if available_for_area:
-        nyc_areas[area_name] = available_for_area
+closest_pos = find_closest_time(time_index, selected_ts)
+closest_time = pd.Timestamp(time_index.times[closest_pos], tz='UTC')
+snapshot = load_snapshot(load_result_cache(), weather_df, time_index, sites_df, metro_df, data_version, closest_pos)
+nyc_areas = area_options(snapshot)
 
 selected_area = st.sidebar.selectbox(
     "Select NYC Borough/Area",
@@ -405,55 +458,15 @@ tab_dashboard, tab_forecast_map, tab_weather, tab_financial, tab_about = st.tabs
 # ====================================================================
 # TAB 1: DASHBOARD
 # ====================================================================
-with tab_dashboard:
-    
-    df_current = df_time.copy()
-    
+# Snapshot views shared by the Dashboard and Weather Details tabs
+df_current, df_area, df_high_risk = snapshot.views(nyc_areas[selected_area], hsri_threshold)
+
+# Each tab body is a fragment taking its inputs as arguments: widgets inside
+# a tab rerun only that tab, and expensive results are cached on the inputs
+# that determine them (forecasts, maps, Financial figures).
+@st.fragment
+def render_dashboard_tab(snapshot, df_current, df_area, df_high_risk, sites_df, selected_area, hsri_threshold, closest_time, selected_datetime, weather_cube, data_version, model_registry):
     if not df_current.empty and len(df_current) > 0:
-        # Compute HSRI for current snapshot
-        df_current['hsri'] = df_current.apply(
-            lambda row: compute_hsri(
-                row.get('temp', 70),
-                row.get('humidity', 50),
-                row.get('windspeed', 5),
-                row.get('solarradiation', 500),
-                row.get('uvindex', 5),
-                row.get('cloudcover', 50)
-            ), axis=1
-        )
-        
-        # Enrich with metro data if available
-        if metro_df is not None:
-            df_current = df_current.merge(
-                metro_df, 
-                left_on='county', 
-                right_on='county', 
-                how='left'
-            )
-        
-        # Add risk categories
-        if not df_current.empty and len(df_current) > 0:
-            risk_data = df_current['hsri'].apply(lambda x: pd.Series(get_risk_category(x)))
-            if risk_data.shape[1] >= 2:
-                df_current['risk_emoji'] = risk_data.iloc[:, 0]
-                df_current['risk_text'] = risk_data.iloc[:, 1]
-            else:
-                df_current['risk_emoji'] = 'N/A'
-                df_current['risk_text'] = 'N/A'
-        else:
-            df_current['risk_emoji'] = 'N/A'
-            df_current['risk_text'] = 'N/A'
-        
-        # Filter by selected area/borough
-        selected_sites = nyc_areas[selected_area]
-        df_area = df_current[df_current['site_name'].isin(selected_sites)].copy()
-        
-        if df_area.empty:
-            df_area = df_current.copy()
-        
-        # Filter by HSRI threshold
-        df_high_risk = df_area[df_area['hsri'] >= hsri_threshold].copy()
-        
         # ====================================================================
         # ROW 1: KEY METRICS
         # ====================================================================
@@ -533,7 +546,9 @@ with tab_dashboard:
         with col_forecast:
             st.subheader("🔮 3-Day HSRI Forecast")
             
-            forecast = forecast_hsri(df_current, days_ahead=3)
+            # Snapshot model, fitted once per timestamp for every session
+            forecast = load_snapshot_forecast(load_result_cache(), snapshot, model_registry, data_version)
+            model_registry.save()
             
             if forecast:
                 forecast_dates = [closest_time + timedelta(days=i) for i in range(1, 4)]
@@ -600,6 +615,29 @@ with tab_dashboard:
                 st.metric("🏥 Healthcare Alert", "LOW ✅")
                 st.caption("Normal operations expected")
         
+        # Nearest reporting sites to a point, from the spatial index
+        with st.expander("📍 HSRI Near a Location"):
+            col_lat, col_lon = st.columns(2)
+            with col_lat:
+                point_lat = st.number_input("Latitude", min_value=38.0, max_value=43.0, value=40.7128, step=0.01, format="%.4f")
+            with col_lon:
+                point_lon = st.number_input("Longitude", min_value=-77.0, max_value=-71.0, value=-74.0060, step=0.01, format="%.4f")
+            
+            nearby_ids, nearby_km = load_site_index(sites_df).nearest(point_lat, point_lon, k=10)
+            current_rows = pd.Index(df_current['aqs_id_full'].to_numpy().astype(np.int64)).get_indexer(nearby_ids)
+            reporting = np.flatnonzero(current_rows >= 0)[:3]
+            if len(reporting) == 0:
+                st.info("No reporting sites near this location at the selected time.")
+            else:
+                df_nearby = df_current.iloc[current_rows[reporting]]
+                st.dataframe(pd.DataFrame({
+                    'Site': df_nearby['site_name'].to_numpy(),
+                    'County': df_nearby['county'].to_numpy(),
+                    'Distance (km)': nearby_km[reporting].round(1),
+                    'HSRI': df_nearby['hsri'].round(1).to_numpy(),
+                    'Risk': (df_nearby['risk_emoji'] + ' ' + df_nearby['risk_text']).to_numpy(),
+                }), use_container_width=True, hide_index=True)
+        
         st.divider()
         
         # ====================================================================
@@ -607,133 +645,112 @@ with tab_dashboard:
         # ====================================================================
         st.subheader("🗺️ Geographic Heat Risk Map")
         
-        # Create Folium map
-        if not df_area.empty:
-            center_lat = df_area['latitude'].mean()
-            center_lon = df_area['longitude'].mean()
-        else:
-            center_lat = 40.7128
-            center_lon = -74.0060
+        counties, metro_outline = load_county_geometry()
+        surface_grid = load_surface_grid(weather_cube, data_version)
+        map_layer = "Sites"
+        if counties is not None:
+            map_layer = st.radio(
+                "Map layer",
+                ["Sites", "Counties", "Surface", "Playback"],
+                horizontal=True,
+                help="Counties: mean HSRI of the sites in each metro county. "
+                     "Surface: HSRI interpolated between sites (inverse-distance weighting). "
+                     "Playback: animate hourly site HSRI over a date range"
+            )
         
-        if pd.isna(center_lat) or pd.isna(center_lon):
-            center_lat = 40.7128
-            center_lon = -74.0060
+        if map_layer == "Playback":
+            data_start = pd.Timestamp(weather_cube.times[0], tz='UTC').date()
+            data_end = pd.Timestamp(weather_cube.times[-1], tz='UTC').date()
+            week_end = min(max(selected_datetime.date(), data_start), data_end)
+            playback_range = st.date_input(
+                "Playback range",
+                value=(max(week_end - timedelta(days=6), data_start), week_end),
+                min_value=data_start,
+                max_value=data_end,
+                help=f"Up to {PLAYBACK_MAX_DAYS} days of hourly frames"
+            )
+            # A half-picked range arrives as a 1-tuple
+            playback_start, playback_end = (tuple(playback_range) * 2)[:2]
+            if (playback_end - playback_start).days >= PLAYBACK_MAX_DAYS:
+                st.caption(f"Showing the last {PLAYBACK_MAX_DAYS} days of the range.")
+        
+        # Mean HSRI per county geoid, filled by risk color
+        def build_county_choropleth():
+            geoids = join_sites(df_area[['aqs_id_full']], sites_df, columns=['geoid'])['geoid']
+            means, counts = aggregate_by_area(geoids, df_area['hsri'], counties.ids)
+            centroids = counties.centroids()
+            return build_county_map(
+                load_county_levels(),
+                county_values(counties.ids, means, counts),
+                map_center(centroids[:, 0], centroids[:, 1]),
+                outline=metro_outline.feature_collection(0.005) if metro_outline is not None else None,
+            )
         
-        m = folium.Map(
-            location=[center_lat, center_lon],
-            zoom_start=11,
-            tiles='OpenStreetMap'
-        )
+        # Draw every site through one GeoJSON layer (over the interpolated surface if asked)
+        def build_dashboard_map(surface=None):
+            return build_area_site_map(df_area, surface)
+        
+        def build_surface_map():
+            hour_pos = weather_cube.hour_position(closest_time)
+            if hour_pos is None:
+                return build_dashboard_map()
+            grid = load_hsri_surface(surface_grid, weather_cube, data_version, hour_pos)
+            return build_dashboard_map((grid, surface_grid.image_bounds))
+        
+        # Hourly HSRI of the area's sites, animated in the browser
+        def build_site_playback(frames):
+            meta = load_site_registry().lookup(frames.site_ids)
+            return build_playback_map(
+                frames.times, meta['latitude'], meta['longitude'],
+                meta['site_name'].fillna('Unknown').tolist(), meta['county'].fillna('Unknown').tolist(),
+                frames.values, map_center(meta['latitude'], meta['longitude']),
+            )
         
-        def get_marker_color(hsri_val):
-            if hsri_val >= 85:
-                return '#d62728'  # Critical - dark red
-            elif hsri_val >= 75:
-                return '#ff7f0e'  # High - orange
-            elif hsri_val >= 65:
-                return '#ffbb78'  # Moderate - light orange
-            elif hsri_val >= 50:
-                return '#2ca02c'  # Low - green
-            elif hsri_val >= 30:
-                return '#1f77b4'  # Cool - blue
+        if map_layer == "Playback":
+            frames = playback_frames(weather_cube, playback_start, playback_end, df_area['aqs_id_full'].to_numpy())
+            if len(frames.times) == 0:
+                st.info("No site reported HSRI in the selected range.")
             else:
-                return '#6a0dad'  # Freezing - dark purple
-        
-        for _, row in df_area.iterrows():
-            hsri_val = row.get('hsri', 0)
-            site_name = row.get('site_name', 'Unknown')
-            temp_val = row.get('temp', 'N/A')
-            humidity_val = row.get('humidity', 'N/A')
-            wind_val = row.get('windspeed', 'N/A')
-            county = row.get('county', 'Unknown')
-            
-            risk_emoji, risk_text = get_risk_category(hsri_val)
-            
-            popup_text = f"""
-            <div style="font-family: Arial; width: 300px;">
-                <b style="font-size: 14px;">{site_name}</b><br/>
-                <hr style="margin: 5px 0;">
-                <b>County:</b> {county}<br/>
-                <b>🌡️ Temperature:</b> {temp_val:.1f}°F<br/>
-                <b>💧 Humidity:</b> {humidity_val:.0f}%<br/>
-                <b>💨 Wind Speed:</b> {wind_val:.1f} mph<br/>
-                <hr style="margin: 5px 0;">
-                <b style="font-size: 13px;">HSRI: {hsri_val:.1f}</b><br/>
-                <b>{risk_emoji} {risk_text}</b>
-            </div>
-            """
-            
-            folium.CircleMarker(
-                location=[row['latitude'], row['longitude']],
-                radius=16,
-                popup=folium.Popup(popup_text, max_width="300px"),
-                tooltip=f"{site_name}: HSRI {hsri_val:.1f}",
-                color=get_marker_color(hsri_val),
-                fill=True,
-                fillColor=get_marker_color(hsri_val),
-                fillOpacity=0.7,
-                weight=2
-            ).add_to(m)
-            
-            # Add text label with HSRI value inside circle
-            # Use darker text for light backgrounds (Moderate/Low levels)
-            text_color = '#333333' if 50 <= hsri_val < 75 else 'white'
-            text_shadow = '1px 1px 2px rgba(255,255,255,0.8)' if 50 <= hsri_val < 75 else '1px 1px 2px rgba(0,0,0,0.8)'
-            
-            folium.Marker(
-                location=[row['latitude'], row['longitude']],
-                icon=folium.DivIcon(html=f"""
-                    <div style="
-                        font-size: 13px;
-                        font-weight: bold;
-                        color: {text_color};
-                        text-align: center;
-                        text-shadow: {text_shadow};
-                        width: 32px;
-                        height: 32px;
-                        display: flex;
-                        align-items: center;
-                        justify-content: center;
-                        margin-left: -16px;
-                        margin-top: -16px;
-                    ">{hsri_val:.0f}</div>
-                """)
-            ).add_to(m)
-        
-        st_folium(m, width=1400, height=700)
+                show_site_map(
+                    ('playback', data_version, str(playback_start), str(playback_end), tuple(frames.site_ids.tolist())),
+                    lambda: build_site_playback(frames),
+                )
+        elif map_layer == "Surface":
+            show_site_map(('dashboard-surface', data_version, closest_time.value, selected_area), build_surface_map)
+        elif map_layer == "Counties":
+            show_site_map(('dashboard-counties', data_version, closest_time.value, selected_area), build_county_choropleth)
+        else:
+            show_site_map(('dashboard', data_version, closest_time.value, selected_area), build_dashboard_map)
         
         # Legend with Clothing Recommendations
         st.markdown("**👕 Risk Level Legend with Protective Clothing Guide**")
         
-        recommendations = [
-            ("85+", "🩳", "Shorts + Tank", "🔴 Critical", "#ffe6e6", "#d62728"),
-            ("75-84", "👕", "Shorts + T-Shirt", "🟠 High", "#fff0e6", "#ff7f0e"),
-            ("65-74", "👔", "Short Sleeves", "🟡 Moderate", "#fffef0", "#ffbb78"),
-            ("50-64", "👗", "Light Layers", "🟢 Low", "#f0fff0", "#2ca02c"),
-            ("30-49", "🧥", "Light Jacket", "🔵 Cool", "#f0f8ff", "#1f77b4"),
-            ("<30", "🧤", "Winter Coat", "🟣 Freezing", "#f3e6ff", "#6a0dad"),
-        ]
-        
-        cols = st.columns(len(recommendations))
-        for i, (hsri_range, clothing_emoji, clothing_desc, risk_label, bg_color, border_color) in enumerate(recommendations):
-            with cols[i]:
+        cols = st.columns(len(RISK_LEVELS))
+        for col, level, hsri_range in zip(cols, reversed(RISK_LEVELS), reversed(RISK_RANGES)):
+            with col:
                 st.markdown(f"""
-                <div style="padding: 12px; background-color: {bg_color}; border-left: 5px solid {border_color}; border-radius: 5px;">
-                    <b>{risk_label}</b><br/>
+                <div style="padding: 12px; background-color: {level.background}; border-left: 5px solid {level.color}; border-radius: 5px;">
+                    <b>{level.legend_label}</b><br/>
                     <b>HSRI {hsri_range}</b><br/>
-                    <div style="font-size: 28px; margin: 8px 0;">{clothing_emoji}</div>
-                    <small>{clothing_desc}</small>
+                    <div style="font-size: 28px; margin: 8px 0;">{level.clothing_emoji}</div>
+                    <small>{level.clothing}</small>
                 </div>
                 """, unsafe_allow_html=True)
     
     else:
         st.warning(f"⚠️ No data available for {selected_datetime.strftime('%Y-%m-%d %H:%M UTC')}. Please select a different time.")
 
+with tab_dashboard:
+    render_dashboard_tab(
+        snapshot, df_current, df_area, df_high_risk, sites_df, selected_area, hsri_threshold,
+        closest_time, selected_datetime, weather_cube, data_version, model_registry,
+    )
+
 # ====================================================================
 # TAB 2: WEATHER DETAILS
 # ====================================================================
-with tab_weather:
-    
+@st.fragment
+def render_weather_tab(df_current, df_area, df_high_risk, hsri_threshold, closest_time):
     if not df_current.empty and len(df_current) > 0:
         st.subheader("🌦️ Complete Weather Conditions by Site")
         st.markdown("Detailed weather variables and HSRI output for each location")
@@ -741,7 +758,7 @@ with tab_weather:
         for _, row in df_area.iterrows():
             site_name = row.get('site_name', 'Unknown')
             hsri_val = row.get('hsri', 0)
-            risk_emoji, risk_text = get_risk_category(hsri_val)
+            risk_emoji = row['risk_emoji']
             
             with st.expander(f"{risk_emoji} {site_name} - HSRI: {hsri_val:.1f}°F"):
                 col1, col2, col3, col4 = st.columns(4)
@@ -799,16 +816,17 @@ with tab_weather:
         else:
             st.info(f"✅ No sites exceed HSRI threshold of {hsri_threshold}")
 
+with tab_weather:
+    render_weather_tab(df_current, df_area, df_high_risk, hsri_threshold, closest_time)
+
 # ====================================================================
 # TAB 3: FORECAST MAP
 # ====================================================================
-with tab_forecast_map:
+@st.fragment
+def render_forecast_map_tab(weather_df, sites_df, weather_cube, model_registry, data_version, selected_area, sites_to_show, closest_time, hsri_threshold):
     st.subheader("🔮 3-Day Historical HSRI Lookup & Forecast")
     st.markdown("View actual historical HSRI values or predict future heat stress risk across all monitoring locations")
     
-    # Apply area filter from sidebar
-    sites_to_show = nyc_areas[selected_area]
-    
     # Day selector for forecast
     forecast_day = st.selectbox(
         "Select day to view:",
@@ -818,29 +836,24 @@ with tab_forecast_map:
     
     target_date = pd.Timestamp(closest_time) + timedelta(days=forecast_day)
     
-    # Check if data exists for this date (convert to date for comparison)
-    weather_df_dates = weather_df.copy()
-    weather_df_dates['date'] = pd.to_datetime(weather_df_dates['datetime']).dt.date
+    surface_grid = load_surface_grid(weather_cube, data_version)
+    show_surface = surface_grid is not None and st.checkbox(
+        "Show interpolated HSRI surface",
+        help="HSRI estimated between sites by inverse-distance weighting"
+    )
+    
+    # Check if data exists for this date (the day's rows are one contiguous range)
     target_date_only = target_date.date()
-    data_for_date = weather_df_dates[weather_df_dates['date'] == target_date_only]
+    day_index = load_day_index(weather_df)
+    day_pos = find_day(day_index, target_date_only)
     
-    if not data_for_date.empty:
+    if day_pos is not None:
         st.info(f"✅ Historical data available for {target_date.strftime('%Y-%m-%d')} - Showing actual HSRI values")
-        # Use actual historical data
-        data_to_map = data_for_date.copy()
-        data_to_map['hsri'] = data_to_map.apply(
-            lambda row: compute_hsri(
-                row.get('temp', 70),
-                row.get('humidity', 50),
-                row.get('windspeed', 5),
-                row.get('solarradiation', 500),
-                row.get('uvindex', 5),
-                row.get('cloudcover', 50)
-            ), axis=1
-        )
+        # Use actual historical data (HSRI precomputed at load time)
+        data_for_date = get_day_slice(weather_df, day_index, day_pos)
         
         # Filter by selected area
-        data_to_map = data_to_map.merge(sites_df[['aqs_id_full', 'site_name']], on='aqs_id_full', how='left')
+        data_to_map = data_for_date.merge(sites_df[['aqs_id_full', 'site_name']], on='aqs_id_full', how='left')
         data_to_map = data_to_map[data_to_map['site_name'].isin(sites_to_show)]
         
         is_forecast = False
@@ -850,126 +863,41 @@ with tab_forecast_map:
         # Generate forecast for sites in selected area
         forecast_data_all = {}
         # Get AQS IDs for selected area
-        selected_aqs_ids = sites_df[sites_df['site_name'].isin(sites_to_show)]['aqs_id_full'].unique()
-        
-        for aqs_id in selected_aqs_ids:
-            site_data = weather_df[weather_df['aqs_id_full'] == aqs_id].sort_values('datetime').tail(50).copy()
-            if len(site_data) > 10:  # Need at least 10 records to forecast
-                # Compute HSRI for historical data
-                site_data['hsri'] = site_data.apply(
-                    lambda row: compute_hsri(
-                        row.get('temp', 70),
-                        row.get('humidity', 50),
-                        row.get('windspeed', 5),
-                        row.get('solarradiation', 500),
-                        row.get('uvindex', 5),
-                        row.get('cloudcover', 50)
-                    ), axis=1
-                )
-                forecast = forecast_hsri(site_data, days_ahead=3)
-                if forecast:
-                    forecast_data_all[aqs_id] = forecast
+        forecast_aqs_ids = area_forecast_ids(sites_df, sites_to_show, weather_cube)
+        table_mtime_ns = forecast_table_mtime()
+        forecast_data_all.update(load_area_forecasts(
+            load_result_cache(), weather_cube, model_registry, data_version, forecast_aqs_ids,
+            table_mtime_ns, load_forecast_table(table_mtime_ns),
+        ))
+        model_registry.save()
         is_forecast = True
         data_to_map = None
     
     if is_forecast and (forecast_data_all is None or not forecast_data_all):
         st.warning("⚠️ Insufficient data for generating forecasts. Make sure weather.csv has data with required columns.")
     elif not is_forecast and data_to_map is not None and not data_to_map.empty:
-        # Create map with historical HSRI data
-        hist_sites = sites_df[sites_df['aqs_id_full'].isin(data_to_map['aqs_id_full'].unique())]
-        
-        if not hist_sites.empty:
-            center_lat = hist_sites['latitude'].mean()
-            center_lon = hist_sites['longitude'].mean()
-        else:
-            center_lat = 40.7128
-            center_lon = -74.0060
-        
-        if pd.isna(center_lat) or pd.isna(center_lon):
-            center_lat = 40.7128
-            center_lon = -74.0060
+        # Create map with historical HSRI data (mean over the day per site)
+        def build_history_map():
+            hist_hsri = data_to_map.groupby('aqs_id_full', observed=True, sort=False)['hsri'].mean().rename('hsri').reset_index()
+            hist_sites = hist_hsri.merge(sites_df.drop_duplicates('aqs_id_full'), on='aqs_id_full', how='inner')
+            
+            site_features = site_feature_collection(
+                hist_sites['latitude'], hist_sites['longitude'], hist_sites['hsri'],
+                hist_sites['site_name'].tolist(), hist_sites['county'].tolist(),
+            )
+            return build_site_map(
+                site_features,
+                map_center(hist_sites['latitude'], hist_sites['longitude']),
+                value_label='Actual HSRI',
+                date=target_date.strftime('%Y-%m-%d'),
+                zoom_start=9 if show_surface else 11,
+                surface=site_surface(surface_grid, weather_cube, hist_sites['aqs_id_full'], hist_sites['hsri']) if show_surface else None,
+            )
         
-        m_forecast = folium.Map(
-            location=[center_lat, center_lon],
-            zoom_start=11,
-            tiles='OpenStreetMap'
+        show_site_map(
+            ('history', data_version, str(target_date_only), tuple(sites_to_show), show_surface), build_history_map
         )
         
-        def get_marker_color(hsri_val):
-            if hsri_val >= 85:
-                return '#d62728'  # Critical - dark red
-            elif hsri_val >= 75:
-                return '#ff7f0e'  # High - orange
-            elif hsri_val >= 65:
-                return '#ffbb78'  # Moderate - light orange
-            elif hsri_val >= 50:
-                return '#2ca02c'  # Low - green
-            elif hsri_val >= 30:
-                return '#1f77b4'  # Cool - blue
-            else:
-                return '#6a0dad'  # Freezing - dark purple
-        
-        # Add historical markers
-        for aqs_id in data_to_map['aqs_id_full'].unique():
-            site_info = hist_sites[hist_sites['aqs_id_full'] == aqs_id]
-            if not site_info.empty:
-                site_row = site_info.iloc[0]
-                site_data = data_to_map[data_to_map['aqs_id_full'] == aqs_id]
-                
-                # Get the HSRI value (should be one per site per day, but take mean if multiple)
-                hsri_val = site_data['hsri'].mean()
-                risk_emoji, risk_text = get_risk_category(hsri_val)
-                
-                popup_text = f"""
-                <div style="font-family: Arial; width: 300px;">
-                    <b style="font-size: 14px;">{site_row['site_name']}</b><br/>
-                    <hr style="margin: 5px 0;">
-                    <b>County:</b> {site_row['county']}<br/>
-                    <b>📅 Date:</b> {target_date.strftime('%Y-%m-%d')}<br/>
-                    <hr style="margin: 5px 0;">
-                    <b style="font-size: 13px;">Actual HSRI: {hsri_val:.1f}</b><br/>
-                    <b>{risk_emoji} {risk_text}</b>
-                </div>
-                """
-                
-                folium.CircleMarker(
-                    location=[site_row['latitude'], site_row['longitude']],
-                    radius=16,
-                    popup=folium.Popup(popup_text, max_width="300px"),
-                    tooltip=f"{site_row['site_name']}: HSRI {hsri_val:.1f}",
-                    color=get_marker_color(hsri_val),
-                    fill=True,
-                    fillColor=get_marker_color(hsri_val),
-                    fillOpacity=0.7,
-                    weight=2
-                ).add_to(m_forecast)
-                
-                # Add text label
-                text_color = '#333333' if 50 <= hsri_val < 75 else 'white'
-                text_shadow = '1px 1px 2px rgba(255,255,255,0.8)' if 50 <= hsri_val < 75 else '1px 1px 2px rgba(0,0,0,0.8)'
-                
-                folium.Marker(
-                    location=[site_row['latitude'], site_row['longitude']],
-                    icon=folium.DivIcon(html=f"""
-                    <div style="
-                        font-size: 13px;
-                        font-weight: bold;
-                        color: {text_color};
-                        text-align: center;
-                        text-shadow: {text_shadow};
-                        width: 32px;
-                        height: 32px;
-                        display: flex;
-                        align-items: center;
-                        justify-content: center;
-                        margin-left: -16px;
-                        margin-top: -16px;
-                    ">{hsri_val:.0f}</div>
-                """)
-                ).add_to(m_forecast)
-        
-        st_folium(m_forecast, width=1400, height=700)
-        
         # Summary statistics
         st.divider()
         st.subheader("📊 Historical HSRI Statistics")
@@ -999,99 +927,27 @@ with tab_forecast_map:
     
     elif is_forecast and forecast_data_all:
         # Create forecast map with forecasted HSRI
-        sites_with_forecast = sites_df[sites_df['aqs_id_full'].isin(forecast_data_all.keys())]
-        
-        if not sites_with_forecast.empty:
-            center_lat = sites_with_forecast['latitude'].mean()
-            center_lon = sites_with_forecast['longitude'].mean()
-        else:
-            center_lat = 40.7128
-            center_lon = -74.0060
-        
-        if pd.isna(center_lat) or pd.isna(center_lon):
-            center_lat = 40.7128
-            center_lon = -74.0060
-        
-        m_forecast = folium.Map(
-            location=[center_lat, center_lon],
-            zoom_start=11,
-            tiles='OpenStreetMap'
-        )
-        
-        def get_marker_color(hsri_val):
-            if hsri_val >= 85:
-                return '#d62728'  # Critical - dark red
-            elif hsri_val >= 75:
-                return '#ff7f0e'  # High - orange
-            elif hsri_val >= 65:
-                return '#ffbb78'  # Moderate - light orange
-            elif hsri_val >= 50:
-                return '#2ca02c'  # Low - green
-            elif hsri_val >= 30:
-                return '#1f77b4'  # Cool - blue
-            else:
-                return '#6a0dad'  # Freezing - dark purple
-        
-        # Add markers for each site with forecasted HSRI
-        for _, row in sites_with_forecast.iterrows():
-            aqs_id = row.get('aqs_id_full')
-            site_name = row.get('site_name', 'Unknown')
-            county = row.get('county', 'Unknown')
+        def build_forecast_map():
+            sites_with_forecast = sites_df[sites_df['aqs_id_full'].isin(forecast_data_all.keys())]
+            forecasted_hsri = [forecast_data_all[aqs_id][forecast_day - 1] for aqs_id in sites_with_forecast['aqs_id_full']]
             
-            if aqs_id in forecast_data_all:
-                forecast_values = forecast_data_all[aqs_id]
-                forecasted_hsri = forecast_values[forecast_day - 1]
-                risk_emoji, risk_text = get_risk_category(forecasted_hsri)
-                
-                popup_text = f"""
-                <div style="font-family: Arial; width: 300px;">
-                    <b style="font-size: 14px;">{site_name}</b><br/>
-                    <hr style="margin: 5px 0;">
-                    <b>County:</b> {county}<br/>
-                    <b>📅 Date:</b> {(pd.Timestamp(closest_time) + timedelta(days=forecast_day)).strftime('%Y-%m-%d')}<br/>
-                    <hr style="margin: 5px 0;">
-                    <b style="font-size: 13px;">Forecast HSRI: {forecasted_hsri:.1f}</b><br/>
-                    <b>{risk_emoji} {risk_text}</b>
-                </div>
-                """
-                
-                folium.CircleMarker(
-                    location=[row['latitude'], row['longitude']],
-                    radius=16,
-                    popup=folium.Popup(popup_text, max_width="300px"),
-                    tooltip=f"{site_name}: Forecast HSRI {forecasted_hsri:.1f}",
-                    color=get_marker_color(forecasted_hsri),
-                    fill=True,
-                    fillColor=get_marker_color(forecasted_hsri),
-                    fillOpacity=0.7,
-                    weight=2
-                ).add_to(m_forecast)
-                
-                # Add text label with forecasted HSRI value
-                text_color = '#333333' if 50 <= forecasted_hsri < 75 else 'white'
-                text_shadow = '1px 1px 2px rgba(255,255,255,0.8)' if 50 <= forecasted_hsri < 75 else '1px 1px 2px rgba(0,0,0,0.8)'
-                
-                folium.Marker(
-                    location=[row['latitude'], row['longitude']],
-                    icon=folium.DivIcon(html=f"""
-                    <div style="
-                        font-size: 13px;
-                        font-weight: bold;
-                        color: {text_color};
-                        text-align: center;
-                        text-shadow: {text_shadow};
-                        width: 32px;
-                        height: 32px;
-                        display: flex;
-                        align-items: center;
-                        justify-content: center;
-                        margin-left: -16px;
-                        margin-top: -16px;
-                    ">{forecasted_hsri:.0f}</div>
-                """)
-                ).add_to(m_forecast)
+            site_features = site_feature_collection(
+                sites_with_forecast['latitude'], sites_with_forecast['longitude'], forecasted_hsri,
+                sites_with_forecast['site_name'].fillna('Unknown').tolist(), sites_with_forecast['county'].fillna('Unknown').tolist(),
+            )
+            return build_site_map(
+                site_features,
+                map_center(sites_with_forecast['latitude'], sites_with_forecast['longitude']),
+                value_label='Forecast HSRI',
+                date=target_date.strftime('%Y-%m-%d'),
+                zoom_start=9 if show_surface else 11,
+                surface=site_surface(surface_grid, weather_cube, sites_with_forecast['aqs_id_full'], forecasted_hsri) if show_surface else None,
+            )
         
-        st_folium(m_forecast, width=1400, height=700)
+        show_site_map(
+            ('forecast', data_version, str(target_date_only), tuple(sites_to_show), table_mtime_ns, forecast_day, show_surface),
+            build_forecast_map,
+        )
         
         # Summary statistics for forecast
         st.divider()
@@ -1122,10 +978,183 @@ with tab_forecast_map:
             forecast_date = (pd.Timestamp(closest_time) + timedelta(days=forecast_day)).strftime('%b %d, %Y')
             st.metric("📅 Forecast Date", forecast_date)
 
+with tab_forecast_map:
+    render_forecast_map_tab(
+        weather_df, sites_df, weather_cube, model_registry, data_version,
+        selected_area, nyc_areas[selected_area], closest_time, hsri_threshold,
+    )
+
 # ====================================================================
 # TAB 4: FINANCIAL IMPACT
 # ====================================================================
-with tab_financial:
+# Data-independent inputs and figures, built once per process
+OPERATING_COST_COMPONENTS = {
+    "Weather Data API": 420,
+    "Cloud Infrastructure (AWS EC2)": 2100,
+    "Data Storage (S3 + RDS)": 90,
+    "Alert System (SNS)": 600,
+}
+
+IMPLEMENTATION_BREAKDOWN = {
+    "System Development": 75000,
+    "NYC Integration": 75000,
+    "Testing & Validation": 37500,
+    "Training & Documentation": 15000,
+}
+
+@st.cache_data
+def simulate_season_costs(days_in_season=120, seed=42):
+    """Simulated daily cooling-center costs over a summer season, current vs. targeted."""
+    rng = np.random.RandomState(seed)
+    
+    # Simulate HSRI values across the season (low baseline, occasional spikes)
+    base_hsri = rng.normal(65, 10, days_in_season)
+    # Add heat wave events
+    heat_waves = [(30, 40), (75, 85), (110, 120)]
+    for start, end in heat_waves:
+        base_hsri[start:end] += rng.uniform(15, 30, end-start)
+    
+    # Fraction of neighborhoods needing cooling centers (correlates with HSRI)
+    frac_needed = np.clip((base_hsri - 50) / 50, 0, 1)
+    
+    # Daily costs
+    daily_cost_current = np.where(frac_needed > 0, 6.67, 0)  # Open all or nothing
+    daily_cost_proposed = frac_needed * 6.67  # Proportional to need
+    
+    # Create dataframe
+    sim_data = pd.DataFrame({
+        'Day': range(1, days_in_season + 1),
+        'HSRI (Avg)': base_hsri,
+        'Current Model ($M)': daily_cost_current,
+        'Proposed Model ($M)': daily_cost_proposed,
+    })
+    
+    # Cumulative costs
+    sim_data['Current Model Cumulative ($M)'] = sim_data['Current Model ($M)'].cumsum()
+    sim_data['Proposed Model Cumulative ($M)'] = sim_data['Proposed Model ($M)'].cumsum()
+    return sim_data
+
+@st.cache_resource
+def build_financial_figures():
+    """Plotly figures of the Financial Impact tab (shared by every session)."""
+    cost_components = OPERATING_COST_COMPONENTS
+    implementation_breakdown = IMPLEMENTATION_BREAKDOWN
+    sim_data = simulate_season_costs()
+    
+    # Operating cost pie chart
+    operating_fig = go.Figure(data=[go.Pie(
+        labels=list(cost_components.keys()),
+        values=list(cost_components.values()),
+        hovertemplate="<b>%{label}</b><br>$%{value:,.0f}<br>%{percent}<extra></extra>",
+        marker=dict(colors=["#636EFA", "#EF553B", "#00CC96", "#AB63FA"])
+    )])
+    operating_fig.update_layout(
+        title="Annual Operating Costs ($3,210 total)",
+        height=400,
+        showlegend=True
+    )
+    
+    # Plot cumulative costs over season
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=sim_data['Day'],
+        y=sim_data['Current Model Cumulative ($M)'],
+        name='Current Model (All or Nothing)',
+        line=dict(color='#d62728', width=3),
+        hovertemplate='<b>Day %{x}</b><br>Cumulative Cost: $%{y:.1f}M<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=sim_data['Day'],
+        y=sim_data['Proposed Model Cumulative ($M)'],
+        name='Proposed Model (Targeted)',
+        line=dict(color='#2ca02c', width=3),
+        hovertemplate='<b>Day %{x}</b><br>Cumulative Cost: $%{y:.1f}M<extra></extra>'
+    ))
+    
+    # Add shaded area showing savings
+    fig.add_trace(go.Scatter(
+        x=sim_data['Day'].tolist() + sim_data['Day'].tolist()[::-1],
+        y=sim_data['Current Model Cumulative ($M)'].tolist() + sim_data['Proposed Model Cumulative ($M)'].tolist()[::-1],
+        fill='toself',
+        fillcolor='rgba(44, 160, 44, 0.2)',
+        line=dict(color='rgba(255,255,255,0)'),
+        hoverinfo='skip',
+        name='Savings Region'
+    ))
+    
+    final_current = sim_data['Current Model Cumulative ($M)'].iloc[-1]
+    final_proposed = sim_data['Proposed Model Cumulative ($M)'].iloc[-1]
+    season_savings = final_current - final_proposed
+    
+    fig.update_layout(
+        title=f'120-Day Summer Season: Cumulative Cost Comparison<br><sub>Seasonal Savings: ${season_savings:.1f}M (40% reduction)</sub>',
+        xaxis_title='Days in Season',
+        yaxis_title='Cumulative Cost ($M)',
+        hovermode='x unified',
+        height=400,
+        legend=dict(x=0.02, y=0.98),
+    )
+    
+    # Daily costs chart
+    fig2 = go.Figure()
+    
+    fig2.add_trace(go.Scatter(
+        x=sim_data['Day'],
+        y=sim_data['Current Model ($M)'],
+        name='Current (All or Nothing)',
+        fill='tozeroy',
+        fillcolor='rgba(214, 39, 40, 0.3)',
+        line=dict(color='#d62728', width=2),
+        hovertemplate='<b>Day %{x}</b><br>Daily Cost: $%{y:.2f}M<extra></extra>'
+    ))
+    
+    fig2.add_trace(go.Scatter(
+        x=sim_data['Day'],
+        y=sim_data['Proposed Model ($M)'],
+        name='Proposed (Targeted)',
+        fill='tozeroy',
+        fillcolor='rgba(44, 160, 44, 0.3)',
+        line=dict(color='#2ca02c', width=2),
+        hovertemplate='<b>Day %{x}</b><br>Daily Cost: $%{y:.2f}M<extra></extra>'
+    ))
+    
+    fig2.update_layout(
+        title='Daily Operating Costs Across Season',
+        xaxis_title='Days in Season',
+        yaxis_title='Daily Cost ($M)',
+        hovermode='x unified',
+        height=350,
+    )
+    
+    # Implementation cost bar chart
+    implementation_fig = go.Figure(data=[go.Bar(
+        x=list(implementation_breakdown.keys()),
+        y=list(implementation_breakdown.values()),
+        marker=dict(color=["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728"]),
+        text=[f"${v/1e3:.0f}K" for v in implementation_breakdown.values()],
+        textposition="outside",
+        hovertemplate="<b>%{x}</b><br>$%{y:,.0f}<extra></extra>"
+    )])
+    implementation_fig.update_layout(
+        title="Implementation Cost by Category",
+        xaxis_title="",
+        yaxis_title="Cost ($)",
+        height=350,
+        showlegend=False,
+        yaxis_tickformat="$,.0f"
+    )
+    
+    return {
+        'operating_costs': operating_fig,
+        'cumulative': fig,
+        'daily': fig2,
+        'implementation': implementation_fig,
+    }
+
+@st.fragment
+def render_financial_tab():
     st.header("💰 Financial Impact Analysis")
     st.markdown("**ROI and cost-benefit analysis of the predictive HSRI forecasting system**")
     
@@ -1204,29 +1233,13 @@ with tab_financial:
     # Cost Breakdown
     st.subheader("💸 Annual Operating Cost Breakdown")
     
-    cost_components = {
-        "Weather Data API": 420,
-        "Cloud Infrastructure (AWS EC2)": 2100,
-        "Data Storage (S3 + RDS)": 90,
-        "Alert System (SNS)": 600,
-    }
+    cost_components = OPERATING_COST_COMPONENTS
+    financial_figures = build_financial_figures()
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        # Create pie chart
-        fig = go.Figure(data=[go.Pie(
-            labels=list(cost_components.keys()),
-            values=list(cost_components.values()),
-            hovertemplate="<b>%{label}</b><br>$%{value:,.0f}<br>%{percent}<extra></extra>",
-            marker=dict(colors=["#636EFA", "#EF553B", "#00CC96", "#AB63FA"])
-        )])
-        fig.update_layout(
-            title="Annual Operating Costs ($3,210 total)",
-            height=400,
-            showlegend=True
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(financial_figures['operating_costs'], use_container_width=True)
     
     with col2:
         st.markdown("### Cost Components\n")
@@ -1283,118 +1296,17 @@ with tab_financial:
     # Visualization: Cost comparison over time
     st.markdown("### Cost Comparison: Current vs. Proposed System")
     
-    # Generate example data showing daily costs across a summer season
-    import pandas as pd
-    
-    days_in_season = 120  # Summer season
-    np.random.seed(42)
-    
-    # Simulate HSRI values across the season (low baseline, occasional spikes)
-    base_hsri = np.random.normal(65, 10, days_in_season)
-    # Add heat wave events
-    heat_waves = [(30, 40), (75, 85), (110, 120)]
-    for start, end in heat_waves:
-        base_hsri[start:end] += np.random.uniform(15, 30, end-start)
-    
-    # Fraction of neighborhoods needing cooling centers (correlates with HSRI)
-    frac_needed = np.clip((base_hsri - 50) / 50, 0, 1)
-    
-    # Daily costs
-    daily_cost_current = np.where(frac_needed > 0, 6.67, 0)  # Open all or nothing
-    daily_cost_proposed = frac_needed * 6.67  # Proportional to need
-    
-    # Create dataframe
-    sim_data = pd.DataFrame({
-        'Day': range(1, days_in_season + 1),
-        'HSRI (Avg)': base_hsri,
-        'Current Model ($M)': daily_cost_current,
-        'Proposed Model ($M)': daily_cost_proposed,
-    })
-    
-    # Cumulative costs
-    sim_data['Current Model Cumulative ($M)'] = sim_data['Current Model ($M)'].cumsum()
-    sim_data['Proposed Model Cumulative ($M)'] = sim_data['Proposed Model ($M)'].cumsum()
-    
-    # Plot cumulative costs over season
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=sim_data['Day'],
-        y=sim_data['Current Model Cumulative ($M)'],
-        name='Current Model (All or Nothing)',
-        line=dict(color='#d62728', width=3),
-        hovertemplate='<b>Day %{x}</b><br>Cumulative Cost: $%{y:.1f}M<extra></extra>'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=sim_data['Day'],
-        y=sim_data['Proposed Model Cumulative ($M)'],
-        name='Proposed Model (Targeted)',
-        line=dict(color='#2ca02c', width=3),
-        hovertemplate='<b>Day %{x}</b><br>Cumulative Cost: $%{y:.1f}M<extra></extra>'
-    ))
-    
-    # Add shaded area showing savings
-    fig.add_trace(go.Scatter(
-        x=sim_data['Day'].tolist() + sim_data['Day'].tolist()[::-1],
-        y=sim_data['Current Model Cumulative ($M)'].tolist() + sim_data['Proposed Model Cumulative ($M)'].tolist()[::-1],
-        fill='toself',
-        fillcolor='rgba(44, 160, 44, 0.2)',
-        line=dict(color='rgba(255,255,255,0)'),
-        hoverinfo='skip',
-        name='Savings Region'
-    ))
-    
-    final_current = sim_data['Current Model Cumulative ($M)'].iloc[-1]
-    final_proposed = sim_data['Proposed Model Cumulative ($M)'].iloc[-1]
-    season_savings = final_current - final_proposed
-    
-    fig.update_layout(
-        title=f'120-Day Summer Season: Cumulative Cost Comparison<br><sub>Seasonal Savings: ${season_savings:.1f}M (40% reduction)</sub>',
-        xaxis_title='Days in Season',
-        yaxis_title='Cumulative Cost ($M)',
-        hovermode='x unified',
-        height=400,
-        legend=dict(x=0.02, y=0.98),
-    )
+    # Example daily costs across a summer season
+    sim_data = simulate_season_costs()
+    days_in_season = len(sim_data)
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(financial_figures['cumulative'], use_container_width=True)
     
     # Daily costs chart
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        fig2 = go.Figure()
-        
-        fig2.add_trace(go.Scatter(
-            x=sim_data['Day'],
-            y=sim_data['Current Model ($M)'],
-            name='Current (All or Nothing)',
-            fill='tozeroy',
-            fillcolor='rgba(214, 39, 40, 0.3)',
-            line=dict(color='#d62728', width=2),
-            hovertemplate='<b>Day %{x}</b><br>Daily Cost: $%{y:.2f}M<extra></extra>'
-        ))
-        
-        fig2.add_trace(go.Scatter(
-            x=sim_data['Day'],
-            y=sim_data['Proposed Model ($M)'],
-            name='Proposed (Targeted)',
-            fill='tozeroy',
-            fillcolor='rgba(44, 160, 44, 0.3)',
-            line=dict(color='#2ca02c', width=2),
-            hovertemplate='<b>Day %{x}</b><br>Daily Cost: $%{y:.2f}M<extra></extra>'
-        ))
-        
-        fig2.update_layout(
-            title='Daily Operating Costs Across Season',
-            xaxis_title='Days in Season',
-            yaxis_title='Daily Cost ($M)',
-            hovermode='x unified',
-            height=350,
-        )
-        
-        st.plotly_chart(fig2, use_container_width=True)
+        st.plotly_chart(financial_figures['daily'], use_container_width=True)
     
     with col1:
         # Summary statistics
@@ -1522,12 +1434,7 @@ with tab_financial:
     # Implementation Costs
     st.subheader("🛠️ One-Time Implementation Costs")
     
-    implementation_breakdown = {
-        "System Development": 75000,
-        "NYC Integration": 75000,
-        "Testing & Validation": 37500,
-        "Training & Documentation": 15000,
-    }
+    implementation_breakdown = IMPLEMENTATION_BREAKDOWN
     
     col1, col2 = st.columns([1, 2])
     
@@ -1540,23 +1447,7 @@ with tab_financial:
         st.markdown(f"\n**Total:** ${total_impl/1e3:.0f}K")
     
     with col2:
-        fig = go.Figure(data=[go.Bar(
-            x=list(implementation_breakdown.keys()),
-            y=list(implementation_breakdown.values()),
-            marker=dict(color=["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728"]),
-            text=[f"${v/1e3:.0f}K" for v in implementation_breakdown.values()],
-            textposition="outside",
-            hovertemplate="<b>%{x}</b><br>$%{y:,.0f}<extra></extra>"
-        )])
-        fig.update_layout(
-            title="Implementation Cost by Category",
-            xaxis_title="",
-            yaxis_title="Cost ($)",
-            height=350,
-            showlegend=False,
-            yaxis_tickformat="$,.0f"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(financial_figures['implementation'], use_container_width=True)
     
     st.divider()
     
@@ -1617,10 +1508,14 @@ with tab_financial:
     **Contact:** For implementation inquiries or technical details, contact the project team.
     """)
 
+with tab_financial:
+    render_financial_tab()
+
 # ====================================================================
 # TAB 5: ABOUT
 # ====================================================================
-with tab_about:
+@st.fragment
+def render_about_tab():
     st.markdown("""
     # About This Dashboard
     
@@ -1786,7 +1681,7 @@ with tab_about:
     - **Frontend**: Streamlit (Python web app framework)
     - **Data Processing**: Pandas, NumPy
     - **Visualization**: Plotly, Folium
-    - **Machine Learning**: scikit-learn
+    - **Machine Learning**: Linear Regression (NumPy least squares)
     - **Deployment**: Cloud-ready for Streamlit Community Cloud
     
     ---
@@ -1822,6 +1717,9 @@ with tab_about:
     *Last Updated: December 2025*
     """)
 
+with tab_about:
+    render_about_tab()
+
 # ====================================================================
 # FOOTER
 # ====================================================================
@@ -0,0 +1,99 @@
+"""
+Computational core of the HSRI weather dashboard.
+
+Formula, storage, ingestion, site metadata and forecasting code that app.py
+builds on. The core depends only on NumPy and pandas, so batch jobs, tests
+and API workers can use it without importing Streamlit, Folium, Plotly or
+scikit-learn.
+
+Names are resolved lazily (PEP 562): `import hsri` loads nothing, and
+`from hsri import compute_hsri` loads only hsri.formula. The Folium map
+builder (hsri.maps) is the one UI module and is imported only on request.
+"""
+
+import importlib
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    # formula
+    'compute_hsri': 'formula',
+    'compute_hi_nws': 'formula',
+    'compute_hsri_batch': 'formula',
+    'compute_hi_nws_batch': 'formula',
+    'compute_hsri_frame': 'formula',
+    'compute_risk_code': 'formula',
+    'get_risk_category': 'formula',
+    'risk_labels': 'formula',
+    'add_hsri_columns': 'formula',
+    'RISK_THRESHOLDS': 'formula',
+    'RISK_CATEGORIES': 'formula',
+    'RISK_LEVELS': 'formula',
+    'RiskLevel': 'formula',
+    # storage and ingestion
+    'WeatherCube': 'cube',
+    'CUBE_VARIABLES': 'cube',
+    'TimeIndex': 'timeindex',
+    'build_time_index': 'timeindex',
+    'find_closest_time': 'timeindex',
+    'get_time_slice': 'timeindex',
+    'DayIndex': 'timeindex',
+    'build_day_index': 'timeindex',
+    'find_day': 'timeindex',
+    'get_day_slice': 'timeindex',
+    'Snapshot': 'snapshot',
+    'build_snapshot': 'snapshot',
+    'read_weather_csv': 'ingest',
+    'prepare_weather_data': 'ingest',
+    'load_weather_store': 'ingest',
+    'load_store_cube': 'ingest',
+    'load_site_data': 'sites',
+    'load_site_registry': 'sites',
+    'join_sites': 'sites',
+    'SiteRegistry': 'sites',
+    'load_metro_data': 'sites',
+    'Boundaries': 'boundaries',
+    'load_county_boundaries': 'boundaries',
+    'load_metro_outline': 'boundaries',
+    'aggregate_by_area': 'boundaries',
+    'contains_points': 'boundaries',
+    'KDTree': 'spatial',
+    'SiteIndex': 'spatial',
+    'HsriSurface': 'surface',
+    'metro_surface': 'surface',
+    'PlaybackFrames': 'playback',
+    'playback_frames': 'playback',
+    'read_rds': 'rds',
+    'read_rds_frame': 'rds',
+    # forecasting
+    'forecast_hsri': 'forecast',
+    'forecast_hsri_batch': 'forecast',
+    'fit_models': 'forecast',
+    'predict_models': 'forecast',
+    'stack_site_windows': 'forecast',
+    'LinearModel': 'models',
+    'ModelRegistry': 'models',
+    'OnlineForecaster': 'online',
+}
+
+_SUBMODULES = {
+    'backtest', 'boundaries', 'cube', 'forecast', 'forecast_job', 'formula', 'ingest',
+    'maps', 'models', 'online', 'playback', 'rds', 'render_cache', 'result_cache', 'sites', 'snapshot',
+    'spatial', 'store', 'surface', 'timeindex', 'warmup',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
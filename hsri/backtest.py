@@ -0,0 +1,258 @@
+"""
+Rolling-origin backtesting harness.
+
+Replays the weather history: at each issue time every site's model is
+trained on its trailing window, forecasts 1-3 days ahead are made, and each
+forecast is scored against the HSRI actually observed at that site 24, 48
+and 72 hours later. Sites are split into chunks that run on a process pool;
+the report gives accuracy per horizon (RMSE, MAE, bias, R²) and throughput
+(forecasts per second, training and prediction time per site).
+
+Usage:
+    python -m hsri.backtest                                  # whole history, daily issue times
+    python -m hsri.backtest --start 2024-07-01 --engine all --workers 8
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .cube import WeatherCube
+from .forecast import TARGET_COL, fit_models, predict_models, stack_site_windows
+from .forecast_job import DAYS_AHEAD, MIN_ROWS, WINDOW, issue_hour_positions
+from .ingest import WEATHER_CACHE_DIR, WEATHER_CSV, load_store_cube, load_weather_store
+from .online import OnlineForecaster
+
+ENGINES = ('batch', 'online')
+
+
+class BacktestResult(NamedTuple):
+    """Scored forecasts, per-horizon accuracy and throughput of one backtest run."""
+    scores: pd.DataFrame     # one row per (issue_time, site, horizon) with forecast and actual
+    summary: pd.DataFrame    # accuracy per horizon
+    throughput: dict         # wall time, forecasts/sec, training and prediction ms per site
+
+
+def _site_subcube(cube, site_positions):
+    """Cube restricted to a set of sites (copied into memory)."""
+    return WeatherCube(cube.data[site_positions], cube.site_ids[site_positions], cube.start_ns, cube.variables)
+
+
+def _forecast_batch(cube, site_positions, hour_positions, window, days_ahead, min_rows):
+    """Refit the batched linear models on the trailing window at every issue hour."""
+    forecasts = np.full((len(hour_positions), len(site_positions), days_ahead), np.nan)
+    train_s = predict_s = 0.0
+    for i, h in enumerate(hour_positions):
+        started = time.perf_counter()
+        windows = stack_site_windows(cube, site_positions, window=window, stop=int(h) + 1)
+        models = fit_models(windows.X, windows.y, windows.mask, min_rows)
+        trained = time.perf_counter()
+        forecasts[i] = predict_models(models, days_ahead)
+        predict_s += time.perf_counter() - trained
+        train_s += trained - started
+    return forecasts, train_s, predict_s
+
+
+def _forecast_online(cube, site_positions, hour_positions, window, days_ahead, min_rows):
+    """Advance one recursive-least-squares forecaster through the history."""
+    sub = _site_subcube(cube, site_positions)
+    forecaster = OnlineForecaster()
+    forecasts = np.full((len(hour_positions), len(site_positions), days_ahead), np.nan)
+    train_s = predict_s = 0.0
+    absorbed = 0
+    for i, h in enumerate(hour_positions):
+        started = time.perf_counter()
+        forecaster.update_cube(sub, absorbed, int(h) + 1)
+        absorbed = int(h) + 1
+        trained = time.perf_counter()
+        forecasts[i] = forecaster.forecast(sub.site_ids, days_ahead, min_obs=min_rows)
+        predict_s += time.perf_counter() - trained
+        train_s += trained - started
+    return forecasts, train_s, predict_s
+
+
+_ENGINE_FUNCS = {
+    'batch': _forecast_batch,
+    'online': _forecast_online,
+}
+
+
+def backtest_sites(cube, site_positions, hour_positions, engine='batch',
+                   window=WINDOW, days_ahead=DAYS_AHEAD, min_rows=MIN_ROWS):
+    """
+    Backtest one chunk of sites at the given (ascending) issue hour positions.
+
+    Returns (scores, timings): scores has one row per forecast that has an
+    observed actual; timings holds the training and prediction seconds and
+    the number of site forecasts attempted.
+    """
+    if engine not in _ENGINE_FUNCS:
+        raise ValueError(f"unknown engine {engine!r}; expected one of {ENGINES}")
+    site_positions = np.asarray(site_positions, dtype=np.intp)
+    hour_positions = np.asarray(hour_positions, dtype=np.intp)
+
+    forecasts, train_s, predict_s = _ENGINE_FUNCS[engine](
+        cube, site_positions, hour_positions, window, days_ahead, min_rows)
+
+    # Actual HSRI at issue hour + 24 * day, as [issue, site, horizon]
+    horizons = np.arange(1, days_ahead + 1)
+    target_hours = hour_positions[:, None] + 24 * horizons[None, :]
+    in_range = target_hours < cube.data.shape[1]
+    actual = cube.data[site_positions[:, None, None], np.where(in_range, target_hours, 0)[None],
+                       cube.variable_position(TARGET_COL)].astype(np.float64).transpose(1, 0, 2)
+    actual[~np.broadcast_to(in_range[:, None, :], actual.shape)] = np.nan
+
+    i_idx, s_idx, d_idx = np.nonzero(~np.isnan(forecasts) & ~np.isnan(actual))
+    scores = pd.DataFrame({
+        'issue_time': pd.to_datetime(cube.times[hour_positions[i_idx]], utc=True),
+        'aqs_id_full': cube.site_ids[site_positions[s_idx]],
+        'horizon_days': (d_idx + 1).astype(np.int8),
+        'forecast': forecasts[i_idx, s_idx, d_idx],
+        'actual': actual[i_idx, s_idx, d_idx],
+    })
+    timings = {
+        'train_s': train_s,
+        'predict_s': predict_s,
+        'site_forecasts': len(hour_positions) * len(site_positions),
+        'fitted': int((~np.isnan(forecasts).any(axis=2)).sum()),
+    }
+    return scores, timings
+
+
+def score_forecasts(scores):
+    """Accuracy per horizon: count, RMSE, MAE, bias (forecast - actual) and R²."""
+    rows = []
+    for horizon, group in scores.groupby('horizon_days'):
+        error = group['forecast'] - group['actual']
+        ss_tot = ((group['actual'] - group['actual'].mean()) ** 2).sum()
+        rows.append({
+            'horizon_days': int(horizon),
+            'n': len(group),
+            'rmse': float(np.sqrt((error ** 2).mean())),
+            'mae': float(error.abs().mean()),
+            'bias': float(error.mean()),
+            'r2': float(1 - (error ** 2).sum() / ss_tot) if ss_tot > 0 else np.nan,
+        })
+    return pd.DataFrame(rows, columns=['horizon_days', 'n', 'rmse', 'mae', 'bias', 'r2'])
+
+
+# Per-worker state: each process memory-maps the shared weather store once
+_worker_cube = None
+
+
+def _worker_init(filepath, cache_dir):
+    global _worker_cube
+    _worker_cube = load_store_cube(load_weather_store(filepath, cache_dir), cache_dir)
+
+
+def _worker_run(args):
+    site_positions, hour_positions, engine, window, days_ahead, min_rows = args
+    return backtest_sites(_worker_cube, site_positions, hour_positions, engine, window, days_ahead, min_rows)
+
+
+def run_backtest(start=None, end=None, freq_hours=24, engine='batch', workers=None,
+                 window=WINDOW, days_ahead=DAYS_AHEAD, min_rows=MIN_ROWS,
+                 filepath=WEATHER_CSV, cache_dir=WEATHER_CACHE_DIR):
+    """
+    Backtest an engine over issue times in [start, end] (whole history by default).
+
+    Sites are split into chunks spread over `workers` processes. Returns a
+    BacktestResult.
+    """
+    cube = load_store_cube(load_weather_store(filepath, cache_dir), cache_dir)
+    if len(cube.times) and start is None:
+        start = cube.timestamp(0)
+    hours = issue_hour_positions(cube, start, end, freq_hours)
+
+    workers = workers or os.cpu_count() or 1
+    n_sites = len(cube.site_ids)
+    chunks = [chunk for chunk in np.array_split(np.arange(n_sites), max(1, min(n_sites, workers * 4))) if len(chunk)]
+    tasks = [(chunk, hours, engine, window, days_ahead, min_rows) for chunk in chunks]
+
+    started = time.perf_counter()
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(workers, initializer=_worker_init, initargs=(filepath, cache_dir)) as pool:
+            results = list(pool.map(_worker_run, tasks))
+    else:
+        results = [backtest_sites(cube, *task) for task in tasks]
+    wall_s = time.perf_counter() - started
+
+    parts = [scores for scores, _ in results if len(scores)]
+    scores = pd.concat(parts, ignore_index=True) if parts else backtest_sites(cube, [], [], engine)[0]
+    train_s = sum(timings['train_s'] for _, timings in results)
+    predict_s = sum(timings['predict_s'] for _, timings in results)
+    site_forecasts = sum(timings['site_forecasts'] for _, timings in results)
+    fitted = sum(timings['fitted'] for _, timings in results)
+
+    throughput = {
+        'engine': engine,
+        'workers': workers,
+        'issue_times': len(hours),
+        'sites': n_sites,
+        'site_forecasts': site_forecasts,
+        'fitted': fitted,
+        'wall_s': wall_s,
+        'forecasts_per_s': site_forecasts / wall_s if wall_s > 0 else np.nan,
+        'train_ms_per_site': 1000 * train_s / site_forecasts if site_forecasts else np.nan,
+        'predict_ms_per_site': 1000 * predict_s / site_forecasts if site_forecasts else np.nan,
+    }
+    return BacktestResult(scores, score_forecasts(scores), throughput)
+
+
+def format_report(result):
+    """Plain-text accuracy and throughput report for one backtest run."""
+    t = result.throughput
+    lines = [
+        f"Engine: {t['engine']}  ({t['sites']} sites x {t['issue_times']} issue times, "
+        f"{t['fitted']}/{t['site_forecasts']} fitted, {t['workers']} workers)",
+        f"  wall {t['wall_s']:.2f}s  |  {t['forecasts_per_s']:.1f} forecasts/s  |  "
+        f"train {t['train_ms_per_site']:.3f} ms/site  |  predict {t['predict_ms_per_site']:.3f} ms/site",
+    ]
+    if result.summary.empty:
+        lines.append("  no forecasts could be scored")
+    for row in result.summary.itertuples(index=False):
+        lines.append(
+            f"  +{row.horizon_days}d  n={row.n:<7d} RMSE={row.rmse:6.2f}  MAE={row.mae:6.2f}  "
+            f"bias={row.bias:+6.2f}  R²={row.r2:6.3f}"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the HSRI forecasters.")
+    parser.add_argument('--start', help="first issue time (UTC); default: start of the data")
+    parser.add_argument('--end', help="last issue time (UTC); default: end of the data")
+    parser.add_argument('--freq-hours', type=int, default=24, help="hours between issue times (default 24)")
+    parser.add_argument('--engine', choices=ENGINES + ('all',), default='batch', help="forecasting engine")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--window', type=int, default=WINDOW, help="training window in observations")
+    parser.add_argument('--scores', help="also write the scored forecasts to this CSV file")
+    parser.add_argument('--weather-csv', default=WEATHER_CSV, help="weather CSV path")
+    args = parser.parse_args(argv)
+
+    engines = ENGINES if args.engine == 'all' else (args.engine,)
+    all_scores = []
+    for engine in engines:
+        result = run_backtest(
+            start=args.start,
+            end=args.end,
+            freq_hours=args.freq_hours,
+            engine=engine,
+            workers=args.workers,
+            window=args.window,
+            filepath=args.weather_csv,
+        )
+        print(format_report(result))
+        all_scores.append(result.scores.assign(engine=engine))
+
+    if args.scores:
+        pd.concat(all_scores, ignore_index=True).to_csv(args.scores, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""
+Area boundaries for choropleth maps.
+
+Metro county polygons (config/counties.rds) and the metro CSA outline
+(config/csa.rds) are read once, simplified with Douglas-Peucker at a few
+zoom-dependent tolerances, and kept as ready-to-ship GeoJSON per tolerance;
+levels a page does not start at can be written out as static files for the
+browser to fetch on zoom.
+Snapshot values are joined per area id with a bincount over integer codes,
+so a redraw never touches the geometry. Point-in-polygon tests place
+points (sites, addresses) in areas.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .ingest import BASE_DIR
+from .rds import read_rds_frame
+
+CONFIG_DIR = os.path.join(BASE_DIR, 'config')
+COUNTIES_RDS = os.path.join(CONFIG_DIR, 'counties.rds')
+CSA_RDS = os.path.join(CONFIG_DIR, 'csa.rds')
+
+# New York-Newark, NY-NJ-CT-PA combined statistical area
+METRO_CSA = '408'
+
+# (minimum zoom, tolerance in degrees): about one screen pixel at that zoom
+DETAIL_LEVELS = ((0, 0.005), (10, 0.0015), (12, 0.0004))
+
+# Coordinate decimals in the GeoJSON (~1 m)
+COORD_DECIMALS = 5
+
+
+def simplify_ring(ring, tolerance):
+    """Douglas-Peucker simplification of an (n, 2) ring; endpoints are kept."""
+    ring = np.asarray(ring, dtype=np.float64)
+    n = len(ring)
+    if n <= 4 or tolerance <= 0:
+        return ring
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        inner = ring[i + 1:j]
+        start, end = ring[i], ring[j]
+        dx, dy = end - start
+        length = np.hypot(dx, dy)
+        if length == 0:
+            dist = np.hypot(inner[:, 0] - start[0], inner[:, 1] - start[1])
+        else:
+            dist = np.abs(dx * (inner[:, 1] - start[1]) - dy * (inner[:, 0] - start[0])) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            keep[i + 1 + k] = True
+            stack.append((i, i + 1 + k))
+            stack.append((i + 1 + k, j))
+    return ring[keep]
+
+
+def simplify_multipolygon(polygons, tolerance):
+    """
+    Simplified polygons (lists of rings). Rings that collapse below four
+    points are dropped, and a polygon with them; if nothing survives the
+    largest polygon is kept as is.
+    """
+    simplified = []
+    for polygon in polygons:
+        rings = [simplify_ring(ring, tolerance) for ring in polygon]
+        if len(rings[0]) < 4:
+            continue
+        simplified.append([rings[0]] + [ring for ring in rings[1:] if len(ring) >= 4])
+    if not simplified:
+        largest = max(polygons, key=lambda polygon: abs(_ring_centroid(np.asarray(polygon[0]))[0]))
+        simplified = [[np.asarray(ring) for ring in largest]]
+    return simplified
+
+
+def _ring_centroid(ring):
+    """Signed area and centroid of a closed (n, 2) lon/lat ring (shoelace)."""
+    x, y = ring[:, 0], ring[:, 1]
+    cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+    area = cross.sum() / 2
+    if area == 0:
+        return 0.0, x.mean(), y.mean()
+    return area, ((x[:-1] + x[1:]) * cross).sum() / (6 * area), ((y[:-1] + y[1:]) * cross).sum() / (6 * area)
+
+
+def _multipolygon_centroid(polygons):
+    """Area-weighted centroid of the outer rings, as (lat, lon)."""
+    parts = np.array([_ring_centroid(np.asarray(polygon[0])) for polygon in polygons])
+    weights = np.abs(parts[:, 0])
+    if weights.sum() == 0:
+        weights = np.ones(len(parts))
+    return float(np.average(parts[:, 2], weights=weights)), float(np.average(parts[:, 1], weights=weights))
+
+
+def contains_points(polygons, latitude, longitude):
+    """
+    Mask of the points inside a multipolygon (even-odd rule per polygon, so
+    holes are excluded). Vectorized over points and ring edges.
+    """
+    lat = np.asarray(latitude, dtype=np.float64)
+    lon = np.asarray(longitude, dtype=np.float64)
+    inside = np.zeros(lat.shape, dtype=bool)
+    for polygon in polygons:
+        ring = np.asarray(polygon[0])
+        candidates = np.flatnonzero(
+            (lon >= ring[:, 0].min()) & (lon <= ring[:, 0].max()) & (lat >= ring[:, 1].min()) & (lat <= ring[:, 1].max())
+        )
+        if len(candidates) == 0:
+            continue
+        x, y = lon[candidates, None], lat[candidates, None]
+        odd = np.zeros(len(candidates), dtype=bool)
+        for ring in polygon:
+            ring = np.asarray(ring)
+            x0, y0 = ring[:-1, 0], ring[:-1, 1]
+            x1, y1 = ring[1:, 0], ring[1:, 1]
+            crosses = (y0 > y) != (y1 > y)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+            odd ^= (crosses & (x < x_cross)).sum(axis=1) % 2 == 1
+        inside[candidates] |= odd
+    return inside
+
+
+class Boundaries:
+    """
+    Named areas with multipolygon geometry, indexed by area id.
+
+    table holds 'name' and 'geometry' (lists of polygons, each a list of
+    (n, 2) lon/lat rings) plus any other attributes.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._geojson = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def ids(self):
+        return self.table.index
+
+    @property
+    def names(self):
+        return self.table['name']
+
+    def centroids(self):
+        """(n, 2) array of area centroids as (lat, lon)."""
+        return np.array([_multipolygon_centroid(geometry) for geometry in self.table['geometry']]).reshape(-1, 2)
+
+    def locate(self, latitude, longitude):
+        """Id of the area containing each point (None outside every area)."""
+        lat = np.asarray(latitude, dtype=np.float64)
+        located = np.full(lat.shape, None, dtype=object)
+        free = np.ones(lat.shape, dtype=bool)
+        for area_id, geometry in zip(self.table.index, self.table['geometry']):
+            hit = free & contains_points(geometry, latitude, longitude)
+            located[hit] = area_id
+            free &= ~hit
+        return located
+
+    def feature_collection(self, tolerance):
+        """
+        GeoJSON FeatureCollection simplified to tolerance (degrees), built
+        once per tolerance. Features carry their area id and name.
+        """
+        with self._lock:
+            cached = self._geojson.get(tolerance)
+        if cached is not None:
+            return cached
+
+        features = []
+        for area_id, name, geometry in zip(self.table.index, self.table['name'], self.table['geometry']):
+            polygons = simplify_multipolygon(geometry, tolerance)
+            features.append({
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'MultiPolygon',
+                    'coordinates': [
+                        [np.round(ring, COORD_DECIMALS).tolist() for ring in polygon] for polygon in polygons
+                    ],
+                },
+                'properties': {'id': str(area_id), 'name': str(name)},
+            })
+        collection = {'type': 'FeatureCollection', 'features': features}
+        with self._lock:
+            return self._geojson.setdefault(tolerance, collection)
+
+    def detail_levels(self, levels=DETAIL_LEVELS, inline_zoom=None, directory=None, url_prefix=''):
+        """
+        [(minimum zoom, FeatureCollection or URL)] for each of the detail levels.
+
+        With a directory, only the level drawn at inline_zoom is returned
+        inline; the others are written there once as GeoJSON files (named by
+        content hash) and returned as url_prefix + file name, for the browser
+        to fetch when the zoom reaches them. Levels that cannot be written
+        are returned inline.
+        """
+        inline = level_at(levels, inline_zoom) if inline_zoom is not None else None
+        result = []
+        for i, (min_zoom, tolerance) in enumerate(levels):
+            collection = self.feature_collection(tolerance)
+            if directory is not None and i != inline:
+                name = _write_geojson(collection, directory)
+                if name is not None:
+                    collection = url_prefix + name
+            result.append((min_zoom, collection))
+        return result
+
+
+def level_at(levels, zoom):
+    """Index of the detail level drawn at zoom (the last one whose minimum zoom it reaches)."""
+    index = 0
+    for i, (min_zoom, _) in enumerate(levels):
+        if zoom >= min_zoom:
+            index = i
+    return index
+
+
+def _write_geojson(collection, directory):
+    """Write a FeatureCollection as <content hash>.json under directory; its file name, or None."""
+    text = json.dumps(collection, separators=(',', ':'))
+    name = hashlib.sha256(text.encode()).hexdigest()[:16] + '.json'
+    path = os.path.join(directory, name)
+    if os.path.exists(path):
+        return name
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    return name
+
+
+def load_boundaries(filepath, id_column, name_column, ids=None):
+    """
+    Boundaries from an sf data frame in an .rds file, optionally restricted
+    to the given ids. None if the file is missing or unreadable.
+    """
+    try:
+        df = read_rds_frame(filepath)
+    except (OSError, ValueError):
+        return None
+
+    df = df.rename(columns={name_column: 'name', df.attrs.get('sf_column', 'geometry'): 'geometry'})
+    df = df.set_index(pd.Index(df.pop(id_column).astype(str), name='id'))
+    if ids is not None:
+        df = df[df.index.isin([str(area_id) for area_id in ids])]
+    return Boundaries(df)
+
+
+def load_county_boundaries(filepath=COUNTIES_RDS):
+    """Metro counties by geoid, named like metro.csv ('Kings County')."""
+    counties = load_boundaries(filepath, 'geoid', 'name')
+    if counties is not None:
+        counties.table['name'] = counties.table['name'] + ' County'
+    return counties
+
+
+def load_metro_outline(filepath=CSA_RDS, csa_id=METRO_CSA):
+    """Outline of the metro combined statistical area."""
+    return load_boundaries(filepath, 'GEOID', 'NAME', ids=[csa_id])
+
+
+def aggregate_by_area(area_ids, values, ids):
+    """
+    Mean and count of values per area, aligned to ids.
+
+    area_ids gives each value's area; values outside ids or not finite are
+    ignored, and areas without values get a NaN mean.
+    """
+    codes = pd.Index(ids).get_indexer(np.asarray(area_ids, dtype=object))
+    values = np.asarray(values, dtype=np.float64)
+    valid = (codes >= 0) & np.isfinite(values)
+    counts = np.bincount(codes[valid], minlength=len(ids))
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=len(ids))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    return means, counts
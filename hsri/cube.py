@@ -0,0 +1,170 @@
+"""
+Dense weather cube storage engine.
+
+Holds the hourly weather history as one float32 array indexed
+[site, hour, variable] on a regular hourly grid, with NaN for hours a site
+did not report. Snapshot, per-site history and multi-site window queries
+become array slices instead of DataFrame filters.
+
+The cube sits beside the long weather frame rather than replacing it:
+snapshot views, day slices and the site tables still need the frame's rows.
+Both are memory-mapped read-only from the weather store (hsri.ingest), so
+the cube costs its own file pages once per machine, not a heap copy per
+process or session.
+"""
+
+import numpy as np
+import pandas as pd
+
+HOUR_NS = 3600 * 10**9
+
+# Variables stored in the cube, in axis-2 order
+CUBE_VARIABLES = (
+    'temp', 'humidity', 'windspeed',
+    'solarradiation', 'uvindex', 'cloudcover',
+    'hi_base', 'hsri',
+)
+
+
+def datetime_to_ns(values):
+    """Convert a datetime column (naive = UTC) to int64 UTC nanoseconds."""
+    dt = pd.to_datetime(pd.Series(values), utc=True)
+    return dt.dt.as_unit('ns').array.asi8
+
+
+def _utc_ns(ts):
+    """UTC nanoseconds of a timestamp (naive = UTC)."""
+    ts = pd.Timestamp(ts)
+    return (ts.tz_localize('UTC') if ts.tz is None else ts).as_unit('ns').value
+
+
+class WeatherCube:
+    """
+    Hourly weather history as a [site, hour, variable] float32 array.
+
+    site_ids[i] is the AQS id of site i and times[h] the UTC timestamp
+    (int64 ns) of hour h. Hours where a site has no observation are NaN.
+    """
+
+    def __init__(self, data, site_ids, start_ns, variables=CUBE_VARIABLES):
+        self.data = data
+        self.site_ids = np.asarray(site_ids)
+        self.start_ns = int(start_ns)
+        self.variables = tuple(variables)
+        self.times = self.start_ns + HOUR_NS * np.arange(data.shape[1], dtype=np.int64)
+        self._site_lookup = {site_id: i for i, site_id in enumerate(self.site_ids.tolist())}
+        self._variable_lookup = {name: i for i, name in enumerate(self.variables)}
+
+    @classmethod
+    def from_frame(cls, df, variables=CUBE_VARIABLES):
+        """
+        Build a cube from a long weather frame.
+
+        Timestamps are floored to the hour; if a site reports twice in the
+        same hour the later row wins. Variables missing from df stay NaN.
+        """
+        variables = tuple(variables)
+        if df.empty:
+            data = np.empty((0, 0, len(variables)), dtype=np.float32)
+            return cls(data, np.empty(0, dtype=np.int64), 0, variables)
+
+        times_ns = datetime_to_ns(df['datetime']) // HOUR_NS * HOUR_NS
+        start_ns = times_ns.min()
+        hour_pos = (times_ns - start_ns) // HOUR_NS
+        n_hours = int(hour_pos.max()) + 1
+
+        site_ids, site_pos = np.unique(np.asarray(df['aqs_id_full']), return_inverse=True)
+
+        # One row per (site, hour), the last; fancy assignment with repeated indices keeps no defined one
+        cell = site_pos * n_hours + hour_pos
+        last = ~pd.Series(cell).duplicated(keep='last').to_numpy()
+        site_pos, hour_pos = site_pos[last], hour_pos[last]
+
+        data = np.full((len(site_ids), n_hours, len(variables)), np.nan, dtype=np.float32)
+        for k, name in enumerate(variables):
+            if name in df.columns:
+                data[site_pos, hour_pos, k] = df[name].to_numpy(dtype=np.float32, na_value=np.nan)[last]
+
+        return cls(data, site_ids, start_ns, variables)
+
+    @classmethod
+    def from_arrays(cls, data, site_ids, times, variables=CUBE_VARIABLES):
+        """Rebuild a cube from saved arrays (e.g. memory-mapped store files)."""
+        start_ns = times[0] if len(times) else 0
+        return cls(data, site_ids, start_ns, variables)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.times.nbytes + self.site_ids.nbytes
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def site_position(self, aqs_id):
+        """Axis-0 position of an AQS id, or None if the site is not stored."""
+        return self._site_lookup.get(aqs_id)
+
+    def variable_position(self, name):
+        """Axis-2 position of a variable name."""
+        return self._variable_lookup[name]
+
+    def hour_position(self, ts):
+        """Axis-1 position of the hour containing ts, or None if off the grid."""
+        pos = (_utc_ns(ts) - self.start_ns) // HOUR_NS
+        if 0 <= pos < len(self.times):
+            return int(pos)
+        return None
+
+    def hour_range(self, start=None, end=None, freq_hours=1):
+        """
+        Hour positions from start through end (naive = UTC), every
+        freq_hours; the last hour if neither bound is given.
+        """
+        n_hours = len(self.times)
+        if n_hours == 0:
+            return np.empty(0, dtype=np.int64)
+        if start is None and end is None:
+            return np.array([n_hours - 1])
+
+        first = 0 if start is None else -(-(_utc_ns(start) - self.start_ns) // HOUR_NS)
+        last = n_hours - 1 if end is None else (_utc_ns(end) - self.start_ns) // HOUR_NS
+        return np.arange(max(int(first), 0), min(int(last), n_hours - 1) + 1, freq_hours)
+
+    def timestamp(self, hour_pos):
+        """UTC timestamp of an hour position."""
+        return pd.Timestamp(self.times[hour_pos], tz='UTC')
+
+    # ------------------------------------------------------------------
+    # Queries (views into the cube wherever the indexing allows)
+    # ------------------------------------------------------------------
+    def snapshot(self, hour_pos):
+        """All sites at one hour: a [site, variable] view."""
+        return self.data[:, hour_pos, :]
+
+    def site_history(self, site_pos, start=None, stop=None):
+        """One site over an hour range: an [hour, variable] view."""
+        return self.data[site_pos, start:stop, :]
+
+    def window(self, sites, start=None, stop=None):
+        """
+        Several sites over an hour range: a [site, hour, variable] array.
+
+        `sites` may be a slice (returns a view) or a sequence of positions.
+        """
+        return self.data[sites, start:stop, :]
+
+    def valid_mask(self, values):
+        """Rows of a [..., variable] array that hold an observation."""
+        if 'temp' in self._variable_lookup:
+            return ~np.isnan(values[..., self._variable_lookup['temp']])
+        return ~np.isnan(values).all(axis=-1)
+
+    def last_observations(self, site_pos, n, stop=None):
+        """The last n observed hours of a site before stop, oldest first."""
+        history = self.site_history(site_pos, stop=stop)
+        rows = np.flatnonzero(self.valid_mask(history))[-n:]
+        return history[rows]
+
+    def to_frame(self, values):
+        """Wrap a [row, variable] array as a DataFrame with variable columns."""
+        return pd.DataFrame(values, columns=list(self.variables))
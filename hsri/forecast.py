@@ -0,0 +1,227 @@
+"""
+Batched HSRI forecasting engine.
+
+Fits the dashboard's per-site linear regression for every site at once:
+the trailing windows of all sites are stacked into one [site, row, feature]
+array and solved with a single batched least-squares operation, producing a
+sites x horizons forecast matrix. forecast_hsri is the single-frame
+entry point; results match a scikit-learn LinearRegression fit site by
+site, without depending on scikit-learn.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from .models import LinearModel, window_fingerprint
+
+FEATURE_COLS = ('temp', 'humidity', 'windspeed', 'solarradiation', 'uvindex', 'cloudcover')
+
+# Features whose gaps are filled with the window's column mean
+MEAN_FILL_COLS = ('solarradiation', 'uvindex', 'cloudcover')
+
+TARGET_COL = 'hsri'
+
+
+class SiteWindows(NamedTuple):
+    """Stacked, right-aligned training windows for a batch of sites."""
+    X: np.ndarray          # [site, row, feature]
+    y: np.ndarray          # [site, row]
+    mask: np.ndarray       # [site, row], True where the row holds an observation
+    end_times: np.ndarray  # [site] int64 ns of the last observation (-1 if none)
+
+
+def stack_site_windows(cube, site_positions, window=50, stop=None, features=FEATURE_COLS):
+    """
+    Stack each site's last `window` observations before hour `stop`.
+
+    Windows are right-aligned: sites with fewer observations have their
+    leading rows masked out.
+    """
+    site_positions = np.asarray(site_positions, dtype=np.intp)
+    n_sites = len(site_positions)
+    columns = [cube.variable_position(name) for name in features] + [cube.variable_position(TARGET_COL)]
+
+    out = np.full((n_sites, window, len(columns)), np.nan, dtype=np.float64)
+    mask = np.zeros((n_sites, window), dtype=bool)
+
+    n_hours = cube.data.shape[1] if stop is None else stop
+    # Look back only as far as needed, doubling until every site is full
+    lookback = min(n_hours, 2 * window)
+    while True:
+        block = cube.window(site_positions, n_hours - lookback, n_hours)
+        valid = cube.valid_mask(block)
+        total = valid.sum(axis=1)
+        if lookback >= n_hours or (total >= window).all():
+            break
+        lookback = min(n_hours, 2 * lookback)
+
+    slot = np.cumsum(valid, axis=1) - 1 - (total - window)[:, None]
+    keep = valid & (slot >= 0)
+    s_idx, h_idx = np.nonzero(keep)
+    out[s_idx, slot[s_idx, h_idx]] = block[s_idx, h_idx][:, columns]
+    mask[s_idx, slot[s_idx, h_idx]] = True
+
+    # Time of each site's most recent observation
+    end_times = np.full(n_sites, -1, dtype=np.int64)
+    has_obs = total > 0
+    if has_obs.any():
+        last = valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        end_times[has_obs] = cube.times[n_hours - lookback + last[has_obs]]
+
+    return SiteWindows(out[..., :-1], out[..., -1], mask, end_times)
+
+
+def forecast_hsri(historical_data, days_ahead=3):
+    """
+    Forecast HSRI for next 1-3 days using Linear Regression.
+
+    Based on project findings: Linear Regression (R² = 0.965) recommended
+    for operational deployment due to interpretability and accuracy.
+    Returns a list of days_ahead values, or None with fewer than 10 rows or
+    when the frame cannot be fitted.
+    """
+    if len(historical_data) < 10:
+        return None
+
+    X, y, mask = frame_window(historical_data)
+    model = fit_models(X, y, mask, min_rows=10)[0]
+    if model is None:
+        return None
+    return model.forecast(days_ahead).tolist()
+
+
+def frame_window(df, features=FEATURE_COLS):
+    """A single [1, row, feature] window from the rows of a DataFrame."""
+    X = df[list(features)].to_numpy(dtype=np.float64, na_value=np.nan)[None]
+    y = df[TARGET_COL].to_numpy(dtype=np.float64, na_value=np.nan)[None]
+    return X, y, np.ones(y.shape, dtype=bool)
+
+
+def _masked_mean(values, mask):
+    """Mean over axis 1 of [site, row, ...] values, ignoring masked rows and NaN."""
+    expand = mask.reshape(mask.shape + (1,) * (values.ndim - 2))
+    present = expand & ~np.isnan(values)
+    total = np.where(present, values, 0.0).sum(axis=1)
+    count = present.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count
+
+
+def fill_feature_gaps(X, mask, features=FEATURE_COLS, fill_cols=MEAN_FILL_COLS):
+    """Fill NaN in the mean-fill features with each site's window mean."""
+    X = X.copy()
+    means = _masked_mean(X, mask)
+    for name in fill_cols:
+        k = features.index(name)
+        X[..., k] = np.where(np.isnan(X[..., k]), means[:, k][:, None], X[..., k])
+    return X
+
+
+def fit_linear_batch(X, y, mask):
+    """
+    Ordinary least squares with intercept for every site at once.
+
+    X is [site, row, feature], y [site, row] and mask [site, row]; rows
+    outside the mask are ignored. Uses the minimum-norm solution on centered
+    data (as LinearRegression does), so collinear windows still fit.
+    Returns (coef [site, feature], intercept [site], x_mean [site, feature]).
+    """
+    w = mask.astype(np.float64)
+    count = w.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.einsum('sr,srf->sf', w, np.nan_to_num(X)) / count[:, None]
+        y_mean = np.einsum('sr,sr->s', w, np.nan_to_num(y)) / count
+
+    # Masked rows become zero rows, which do not change the lstsq solution
+    Xc = np.where(mask[..., None], X - x_mean[:, None, :], 0.0)
+    yc = np.where(mask, y - y_mean[:, None], 0.0)
+
+    coef = np.einsum('sfr,sr->sf', np.linalg.pinv(Xc), yc)
+    intercept = y_mean - np.einsum('sf,sf->s', x_mean, coef)
+    return coef, intercept, x_mean
+
+
+def fit_models(X, y, mask, min_rows=10, features=FEATURE_COLS):
+    """
+    Fit one LinearModel per site in a single batched solve.
+
+    Mirrors forecast_hsri's training: solar/UV/cloud gaps are mean-filled
+    first. Sites with fewer than min_rows observations, or a feature with no
+    values at all in their window, get None.
+    """
+    models = [None] * X.shape[0]
+
+    X = fill_feature_gaps(X, mask, features)
+    ok = mask.sum(axis=1) >= min_rows
+    ok &= ~(np.isnan(X) & mask[..., None]).any(axis=(1, 2))
+    ok &= ~(np.isnan(y) & mask).any(axis=1)
+    if not ok.any():
+        return models
+
+    coef, intercept, x_mean = fit_linear_batch(X[ok], y[ok], mask[ok])
+    for j, i in enumerate(np.flatnonzero(ok)):
+        models[i] = LinearModel(coef[j], float(intercept[j]), x_mean[j])
+    return models
+
+
+def predict_models(models, days_ahead=3):
+    """Stack model forecasts into a [site, days_ahead] array (NaN rows for None)."""
+    forecasts = np.full((len(models), days_ahead), np.nan)
+    for i, model in enumerate(models):
+        if model is not None:
+            forecasts[i] = model.forecast(days_ahead)
+    return forecasts
+
+
+def forecast_hsri_batch(X, y, mask, days_ahead=3, min_rows=10, features=FEATURE_COLS):
+    """
+    Forecast HSRI for 1..days_ahead days for every site in one call.
+
+    Mirrors forecast_hsri: mean-fill solar/UV/cloud gaps, fit a linear
+    model per site, then predict from the window's mean features scaled by
+    (1 + 0.02 * day). Returns a [site, days_ahead] array clipped to
+    [-100, 100], with NaN rows for sites that could not be fitted.
+    """
+    return predict_models(fit_models(X, y, mask, min_rows, features), days_ahead)
+
+
+def fit_models_cached(X, y, mask, keys, registry, min_rows=10, features=FEATURE_COLS):
+    """
+    fit_models through a ModelRegistry.
+
+    keys[i] is the window fingerprint of site i (see window_fingerprint);
+    only sites whose key is not cached are fitted, in one batched solve.
+    Models are cached regardless of min_rows, which is applied on the way out.
+    """
+    missing = object()
+    models = [registry.get(key, missing) for key in keys]
+    todo = [i for i, model in enumerate(models) if model is missing]
+    if todo:
+        fitted = fit_models(X[todo], y[todo], mask[todo], min_rows=1, features=features)
+        for i, model in zip(todo, fitted):
+            registry.put(keys[i], model)
+            models[i] = model
+
+    counts = mask.sum(axis=1)
+    return [model if count >= min_rows else None for model, count in zip(models, counts)]
+
+
+def site_window_keys(windows, site_ids, data_version, features=FEATURE_COLS):
+    """Registry keys for stacked site windows."""
+    counts = windows.mask.sum(axis=1)
+    return [
+        window_fingerprint(data_version, site_id, end, count, features)
+        for site_id, end, count in zip(site_ids, windows.end_times, counts)
+    ]
+
+
+def snapshot_forecast(df, time_ns, registry, data_version, days_ahead=3, features=FEATURE_COLS):
+    """
+    Dashboard forecast from all rows of one timestamp, fitted through a
+    ModelRegistry. None if the rows cannot be fitted.
+    """
+    X, y, mask = frame_window(df, features)
+    key = window_fingerprint(data_version, 'snapshot', time_ns, len(df), features)
+    model = fit_models_cached(X, y, mask, [key], registry, features=features)[0]
+    return model.forecast(days_ahead=days_ahead).tolist() if model is not None else None
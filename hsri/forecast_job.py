@@ -0,0 +1,214 @@
+"""
+Offline batch forecast job.
+
+Computes HSRI forecasts for every site and issue time in a date range, in
+parallel across processes, and writes them to a compact Parquet forecast
+table that the dashboard reads instead of fitting models per request.
+
+Each issue time T uses the same model as the dashboard's live fits: a
+linear regression on the site's last WINDOW (50) observations at or before
+T, fitted only with at least MIN_ROWS (11) of them, forecasting 1-3 days
+ahead. The dashboard imports these constants, so the two cannot drift.
+
+Usage:
+    python -m hsri.forecast_job                     # latest hour in the data
+    python -m hsri.forecast_job --start 2024-06-01 --end 2024-09-01 --workers 8
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .forecast import fit_models, predict_models, stack_site_windows
+from .ingest import DATA_DIR, WEATHER_CACHE_DIR, WEATHER_CSV, load_store_cube, load_weather_store
+
+FORECAST_TABLE = os.path.join(DATA_DIR, 'forecasts.parquet')
+
+WINDOW = 50
+DAYS_AHEAD = 3
+# More than 10 observations, as the dashboard has always required
+MIN_ROWS = 11
+
+
+def forecast_issue_hours(cube, hour_positions, window=WINDOW, days_ahead=DAYS_AHEAD, min_rows=MIN_ROWS):
+    """
+    Forecast every site of the cube at each issue hour position.
+
+    Returns a long frame with one row per (issue_time, site, horizon) for
+    sites that could be fitted.
+    """
+    site_positions = np.arange(len(cube.site_ids))
+    horizons = np.arange(1, days_ahead + 1, dtype=np.int8)
+    parts = []
+
+    for h in hour_positions:
+        windows = stack_site_windows(cube, site_positions, window=window, stop=int(h) + 1)
+        forecasts = predict_models(fit_models(windows.X, windows.y, windows.mask, min_rows), days_ahead)
+        fitted = ~np.isnan(forecasts).any(axis=1)
+        if not fitted.any():
+            continue
+        n_fitted = int(fitted.sum())
+        parts.append(pd.DataFrame({
+            'issue_time': np.full(n_fitted * days_ahead, cube.times[h], dtype=np.int64),
+            'aqs_id_full': np.repeat(cube.site_ids[fitted], days_ahead),
+            'horizon_days': np.tile(horizons, n_fitted),
+            'hsri_forecast': forecasts[fitted].ravel().astype(np.float32),
+            'n_obs': np.repeat(windows.mask[fitted].sum(axis=1), days_ahead).astype(np.int16),
+        }))
+
+    if not parts:
+        return _empty_table()
+    df = pd.concat(parts, ignore_index=True)
+    df['issue_time'] = pd.to_datetime(df['issue_time'], utc=True)
+    return df
+
+
+def _empty_table():
+    return pd.DataFrame({
+        'issue_time': pd.Series(dtype='datetime64[ns, UTC]'),
+        'aqs_id_full': pd.Series(dtype=np.int64),
+        'horizon_days': pd.Series(dtype=np.int8),
+        'hsri_forecast': pd.Series(dtype=np.float32),
+        'n_obs': pd.Series(dtype=np.int16),
+    })
+
+
+# Per-worker state: each process memory-maps the shared weather store once
+_worker_cube = None
+
+
+def _worker_init(filepath, cache_dir):
+    global _worker_cube
+    _worker_cube = load_store_cube(load_weather_store(filepath, cache_dir), cache_dir)
+
+
+def _worker_run(hour_positions):
+    return forecast_issue_hours(_worker_cube, hour_positions)
+
+
+def issue_hour_positions(cube, start=None, end=None, freq_hours=1):
+    """Hour positions of issue times in [start, end]; the last hour if neither is given."""
+    return cube.hour_range(start, end, freq_hours)
+
+
+def _to_utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tz is None else ts.tz_convert('UTC')
+
+
+def run_forecast_job(start=None, end=None, freq_hours=1, workers=None,
+                     output=FORECAST_TABLE, filepath=WEATHER_CSV, cache_dir=WEATHER_CACHE_DIR):
+    """
+    Compute forecasts for all sites over [start, end] and write the table.
+
+    Issue times are spread over a process pool; every worker maps the same
+    on-disk weather store. Rows already in `output` for the same data
+    version are kept unless the new run recomputes their issue time.
+    Returns the new forecast rows.
+    """
+    weather_df = load_weather_store(filepath, cache_dir)
+    data_version = weather_df.attrs.get('data_version')
+    cube = load_store_cube(weather_df, cache_dir)
+    hours = issue_hour_positions(cube, start, end, freq_hours)
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(hours) > 1:
+        chunks = [chunk for chunk in np.array_split(hours, workers * 4) if len(chunk)]
+        with ProcessPoolExecutor(workers, initializer=_worker_init, initargs=(filepath, cache_dir)) as pool:
+            parts = list(pool.map(_worker_run, chunks))
+        forecasts = pd.concat(parts, ignore_index=True) if parts else _empty_table()
+    else:
+        forecasts = forecast_issue_hours(cube, hours)
+
+    forecasts['data_version'] = pd.Categorical([data_version] * len(forecasts))
+    if output is not None:
+        write_forecast_table(forecasts, data_version, output)
+    return forecasts
+
+
+def write_forecast_table(forecasts, data_version, path=FORECAST_TABLE):
+    """
+    Merge new forecasts into the table at path and write it atomically.
+
+    Existing rows from other data versions, or for issue times present in
+    `forecasts`, are dropped.
+    """
+    existing = read_forecast_table(path)
+    if existing is not None:
+        existing = existing[existing['data_version'] == data_version]
+        existing = existing[~existing['issue_time'].isin(forecasts['issue_time'].unique())]
+        if len(existing):
+            forecasts = pd.concat([existing, forecasts], ignore_index=True)
+            forecasts['data_version'] = forecasts['data_version'].astype(str).astype('category')
+
+    forecasts = forecasts.sort_values(['issue_time', 'aqs_id_full', 'horizon_days'], kind='stable')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    forecasts.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def read_forecast_table(path=FORECAST_TABLE):
+    """Read the forecast table (sorted by issue_time), or None if it does not exist."""
+    try:
+        return pd.read_parquet(path)
+    except (FileNotFoundError, ImportError):
+        return None
+
+
+def lookup_forecasts(table, issue_time, aqs_ids, data_version, min_rows=MIN_ROWS):
+    """
+    Forecasts issued at issue_time for aqs_ids, as {aqs_id: [day1, day2, ...]}.
+
+    Only rows of the given data version with at least min_rows training
+    observations are used; sites without such rows are left out.
+    """
+    if table is None or table.empty:
+        return {}
+
+    issue_ns = _to_utc(issue_time).as_unit('ns').value
+    issue_values = table['issue_time'].dt.as_unit('ns').array.asi8
+    lo, hi = np.searchsorted(issue_values, [issue_ns, issue_ns + 1])
+    rows = table.iloc[lo:hi]
+    rows = rows[
+        (rows['data_version'] == data_version)
+        & (rows['n_obs'] >= min_rows)
+        & rows['aqs_id_full'].isin(list(aqs_ids))
+    ]
+
+    forecasts = {}
+    for aqs_id, site_rows in rows.groupby('aqs_id_full', sort=False):
+        forecasts[aqs_id] = site_rows.sort_values('horizon_days')['hsri_forecast'].astype(float).tolist()
+    return forecasts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute HSRI forecasts for every site and issue time.")
+    parser.add_argument('--start', help="first issue time (UTC), e.g. 2024-06-01")
+    parser.add_argument('--end', help="last issue time (UTC), e.g. 2024-09-01T23:00")
+    parser.add_argument('--freq-hours', type=int, default=1, help="hours between issue times (default 1)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--output', default=FORECAST_TABLE, help="forecast table path (Parquet)")
+    parser.add_argument('--weather-csv', default=WEATHER_CSV, help="weather CSV path")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    forecasts = run_forecast_job(
+        start=args.start,
+        end=args.end,
+        freq_hours=args.freq_hours,
+        workers=args.workers,
+        output=args.output,
+        filepath=args.weather_csv,
+    )
+    elapsed = time.perf_counter() - started
+    n_issues = forecasts['issue_time'].nunique()
+    print(f"Wrote {len(forecasts)} forecasts for {n_issues} issue times to {args.output} in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+HSRI formula.
+
+Heat Stress Risk Index calculation and risk categorization (scalar
+reference versions and their array-native counterparts), shared by the
+dashboard, the ingestion pipeline and the batch jobs:
+
+    HSRI = HI_base + 0.3·UV + 8·SR_eff − 4·WS − 0.05·CC
+
+where HI_base is the NWS Heat Index (Rothfusz regression).
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+def compute_hsri(temp_f, humidity, wind_speed, solar_radiation, uv_index, cloud_cover):
+    """
+    Compute Heat Stress Risk Index (HSRI).
+
+    Formula: HSRI = HI_base + α·UV + β·SR_eff − γ·WS [− δ·CC]
+
+    where:
+    - HI_base: NWS Heat Index computed from temperature and humidity
+    - UV: UV index (0-10+), higher increases radiant heat load
+    - SR_eff: Effective solar radiation (W/m²), scaled to ~0-1
+    - WS: Wind speed (mph), cooling effect reduces HSRI
+    - CC: Cloud cover (%), shading effect
+
+    Calibrated weights: α=0.3, β=8, γ=4, δ=0.05
+    Missing values for solar, UV, and cloud cover are treated as 0
+    """
+    # NWS Heat Index (Rothfusz regression)
+    hi_base = compute_hi_nws(temp_f, humidity)
+
+    # Handle missing values for solar radiation, UV, and cloud cover
+    sr_eff = 0 if pd.isna(solar_radiation) else max(0, solar_radiation / 1000.0)
+    uv_val = 0 if pd.isna(uv_index) else uv_index
+    cc_val = 0 if pd.isna(cloud_cover) else cloud_cover
+
+    # HSRI components with empirically calibrated weights
+    alpha, beta, gamma, delta = 0.3, 8.0, 4.0, 0.05
+    hsri = hi_base + alpha * uv_val + beta * sr_eff - gamma * wind_speed - delta * cc_val
+
+    return np.clip(hsri, -100, 100)  # Reasonable bounds for human comfort index
+
+
+def compute_hi_nws(temp_f, humidity):
+    """NWS Heat Index (Rothfusz regression)."""
+    T = temp_f
+    RH = humidity
+
+    if T < 80:
+        return T
+
+    # Coefficients
+    c1, c2, c3 = -42.379, 2.04901523, 10.14333127
+    c4, c5, c6 = -0.22475541, -0.00683783, -0.05481717
+    c7, c8, c9 = 0.00122874, 0.00085282, -0.00000199
+
+    HI = (c1 + c2*T + c3*RH + c4*T*RH + c5*T**2 + c6*RH**2 +
+          c7*T**2*RH + c8*T*RH**2 + c9*T**2*RH**2)
+    return HI
+
+
+def compute_hi_nws_batch(temp_f, humidity):
+    """
+    Array version of compute_hi_nws.
+
+    Accepts NumPy arrays or DataFrame columns and returns a float64 array.
+    Temperatures below 80°F pass through unchanged, as in the scalar version.
+    """
+    T = np.asarray(temp_f, dtype=np.float64)
+    RH = np.asarray(humidity, dtype=np.float64)
+
+    # Coefficients
+    c1, c2, c3 = -42.379, 2.04901523, 10.14333127
+    c4, c5, c6 = -0.22475541, -0.00683783, -0.05481717
+    c7, c8, c9 = 0.00122874, 0.00085282, -0.00000199
+
+    T2 = T * T
+    RH2 = RH * RH
+    HI = (c1 + c2*T + c3*RH + c4*T*RH + c5*T2 + c6*RH2 +
+          c7*T2*RH + c8*T*RH2 + c9*T2*RH2)
+    return np.where(T < 80, T, HI)
+
+
+def compute_hsri_batch(temp_f, humidity, wind_speed, solar_radiation, uv_index, cloud_cover):
+    """
+    Array version of compute_hsri.
+
+    Accepts NumPy arrays or DataFrame columns (scalars broadcast) and returns
+    a float64 array matching compute_hsri element-wise. Missing solar, UV and
+    cloud cover values are masked to 0, as in the scalar version.
+    """
+    hi_base = compute_hi_nws_batch(temp_f, humidity)
+
+    ws = np.asarray(wind_speed, dtype=np.float64)
+    sr = np.asarray(solar_radiation, dtype=np.float64)
+    uv = np.asarray(uv_index, dtype=np.float64)
+    cc = np.asarray(cloud_cover, dtype=np.float64)
+
+    # Handle missing values for solar radiation, UV, and cloud cover
+    sr_eff = np.where(np.isnan(sr), 0.0, np.maximum(sr / 1000.0, 0.0))
+    uv_val = np.where(np.isnan(uv), 0.0, uv)
+    cc_val = np.where(np.isnan(cc), 0.0, cc)
+
+    alpha, beta, gamma, delta = 0.3, 8.0, 4.0, 0.05
+    hsri = hi_base + alpha * uv_val + beta * sr_eff - gamma * ws - delta * cc_val
+
+    return np.clip(hsri, -100, 100)
+
+
+def compute_hsri_frame(df):
+    """
+    Compute HSRI for every row of a weather DataFrame in one vectorized pass.
+
+    Missing columns fall back to the same defaults the per-row apply used.
+    """
+    def column(name, default):
+        return df[name].to_numpy(dtype=np.float64, na_value=np.nan) if name in df.columns else default
+
+    return compute_hsri_batch(
+        column('temp', 70),
+        column('humidity', 50),
+        column('windspeed', 5),
+        column('solarradiation', 500),
+        column('uvindex', 5),
+        column('cloudcover', 50)
+    )
+
+
+class RiskLevel(NamedTuple):
+    """One risk category: HSRI lower bound (°F), labels, map colors and clothing advice."""
+    lower: float
+    emoji: str
+    text: str
+    color: str
+    background: str
+    dark_label: bool
+    clothing_emoji: str
+    clothing: str
+
+    @property
+    def legend_label(self):
+        return self.emoji.title()
+
+
+# Risk categories, coolest first; risk_code i is RISK_LEVELS[i]. The first
+# level has no lower bound. Label text is dark on the light fills.
+RISK_LEVELS = (
+    RiskLevel(-np.inf, "🟣 FREEZING", "Freezing", '#6a0dad', '#f3e6ff', False, "🧤", "Winter Coat"),
+    RiskLevel(30, "🔵 COOL", "Cool", '#1f77b4', '#f0f8ff', False, "🧥", "Light Jacket"),
+    RiskLevel(50, "🟢 LOW", "Mild", '#2ca02c', '#f0fff0', True, "👗", "Light Layers"),
+    RiskLevel(65, "🟡 MODERATE", "Moderate Heat", '#ffbb78', '#fffef0', True, "👔", "Short Sleeves"),
+    RiskLevel(75, "🟠 HIGH", "High Heat", '#ff7f0e', '#fff0e6', False, "👕", "Shorts + T-Shirt"),
+    RiskLevel(85, "🔴 CRITICAL", "Critical Heat", '#d62728', '#ffe6e6', False, "🩳", "Shorts + Tank"),
+)
+
+# Lower bounds of every level but the first, ascending
+RISK_THRESHOLDS = np.array([level.lower for level in RISK_LEVELS[1:]], dtype=np.float64)
+RISK_CATEGORIES = [(level.emoji, level.text) for level in RISK_LEVELS]
+RISK_COLORS = tuple(level.color for level in RISK_LEVELS)
+RISK_LABEL_DARK = tuple(level.dark_label for level in RISK_LEVELS)
+
+# HSRI range of each level as shown in the legend ('<30', '30-49', ..., '85+')
+RISK_RANGES = tuple(
+    [f"<{RISK_THRESHOLDS[0]:.0f}"]
+    + [f"{lower:.0f}-{upper - 1:.0f}" for lower, upper in zip(RISK_THRESHOLDS[:-1], RISK_THRESHOLDS[1:])]
+    + [f"{RISK_THRESHOLDS[-1]:.0f}+"]
+)
+
+# Object arrays per RiskLevel field, indexed by risk code
+_RISK_FIELDS = {
+    field: np.array([getattr(level, field) for level in RISK_LEVELS], dtype=object) for field in RiskLevel._fields
+}
+
+
+def get_risk_category(hsri):
+    """Categorize heat risk based on HSRI threshold."""
+    level = RISK_LEVELS[int(compute_risk_code(hsri))]
+    return level.emoji, level.text
+
+
+def compute_risk_code(hsri):
+    """Array version of get_risk_category, returning the int8 band index."""
+    values = np.asarray(hsri, dtype=np.float64)
+    codes = np.searchsorted(RISK_THRESHOLDS, values, side='right')
+    # NaN sorts past every bound; treat it as the coolest level
+    codes = np.where(np.isnan(values), 0, codes)
+    return codes.astype(np.int8)
+
+
+def risk_labels(codes, field):
+    """Values of a RiskLevel field (e.g. 'emoji', 'color') for an array of risk codes."""
+    return _RISK_FIELDS[field][np.asarray(codes, dtype=np.intp)]
+
+
+def add_hsri_columns(df):
+    """Add hi_base, hsri and risk_code columns computed for every row."""
+    df['hi_base'] = compute_hi_nws_batch(df['temp'], df['humidity'])
+    df['hsri'] = compute_hsri_frame(df)
+    df['risk_code'] = compute_risk_code(df['hsri'])
+    return df
@@ -0,0 +1,226 @@
+"""
+Weather data ingestion pipeline.
+
+Reads data/weather.csv through a Parquet sidecar cache, cleans it, sorts it
+by time and precomputes the HSRI columns, then publishes the result (plus
+the dense weather cube) as a versioned memory-mapped store. The dashboard
+and the batch jobs all load weather data through load_weather_store, so
+they share one on-disk copy.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from .cube import WeatherCube
+from .formula import add_hsri_columns
+from .store import open_frame_store, open_store_array, prune_stores, write_frame_store
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+WEATHER_CSV = os.path.join(DATA_DIR, 'weather.csv')
+
+# Columnar sidecar cache for weather.csv (rebuilt whenever the CSV changes)
+WEATHER_CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+
+# Memory-mapped store of the processed weather data, shared by all sessions
+# and processes; bump WEATHER_PIPELINE_VERSION when processing changes
+WEATHER_STORE_DIR = os.path.join(WEATHER_CACHE_DIR, 'weather_store')
+WEATHER_PIPELINE_VERSION = 1
+
+WEATHER_DTYPES = {
+    'temp': 'float64',
+    'humidity': 'float64',
+    'windspeed': 'float64',
+    'solarradiation': 'float64',
+    'uvindex': 'float64',
+    'cloudcover': 'float64',
+}
+
+
+def _file_hash(filepath, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_meta(meta_path, meta):
+    """Write sidecar metadata atomically, so readers never see a partial file."""
+    tmp_path = f'{meta_path}.tmp-{os.getpid()}'
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _cache_is_fresh(filepath, meta_path):
+    """
+    Check the sidecar metadata against the CSV.
+
+    Size and mtime are compared first; if only the mtime moved (fresh clone,
+    copied file) the content hash decides, and the metadata is refreshed.
+    """
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return False
+
+    stat = os.stat(filepath)
+    if meta.get('size') != stat.st_size:
+        return False
+    if meta.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+    if meta.get('sha256') != _file_hash(filepath):
+        return False
+
+    meta['mtime_ns'] = stat.st_mtime_ns
+    try:
+        _write_meta(meta_path, meta)
+    except OSError:
+        pass
+    return True
+
+
+def _parse_weather_csv(filepath):
+    """Parse weather CSV text into typed columns."""
+    df = pd.read_csv(filepath, dtype=WEATHER_DTYPES)
+    df['datetime'] = pd.to_datetime(df['datetime'], utc=True)
+    df['aqs_id_full'] = df['aqs_id_full'].astype('category')
+    return df
+
+
+def read_weather_csv(filepath=WEATHER_CSV, columns=None, cache_dir=WEATHER_CACHE_DIR):
+    """
+    Read weather CSV through a Parquet sidecar cache.
+
+    The first read parses the CSV and writes <name>.parquet plus a metadata
+    file (size, mtime, SHA-256) into cache_dir. Later reads load the Parquet
+    file while the CSV is unchanged. `columns` optionally projects the read.
+    Falls back to plain CSV parsing when pyarrow is unavailable or the cache
+    directory is not writable, and re-parses the CSV (rewriting the sidecar)
+    when the Parquet file cannot be read.
+    """
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    parquet_path = os.path.join(cache_dir, f'{name}.parquet')
+    meta_path = os.path.join(cache_dir, f'{name}.meta.json')
+
+    try:
+        if os.path.exists(parquet_path) and _cache_is_fresh(filepath, meta_path):
+            df = pd.read_parquet(parquet_path, columns=columns)
+            # Parquet stores the integer-keyed category as plain int64
+            if 'aqs_id_full' in df.columns:
+                df['aqs_id_full'] = df['aqs_id_full'].astype('category')
+            return df
+    except (ImportError, OSError, ValueError):
+        # No pyarrow, or a truncated/corrupt sidecar (ArrowInvalid is a ValueError)
+        pass
+
+    df = _parse_weather_csv(filepath)
+
+    # Per-process temp name: concurrent misses must not replace each other's half-written file
+    tmp_path = f'{parquet_path}.tmp-{os.getpid()}'
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+        stat = os.stat(filepath)
+        _write_meta(meta_path, {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': _file_hash(filepath),
+        })
+    except (ImportError, OSError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+
+def weather_data_version(filepath=WEATHER_CSV, cache_dir=WEATHER_CACHE_DIR):
+    """Version key of the processed data: CSV content hash + pipeline version."""
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    meta_path = os.path.join(cache_dir, f'{name}.meta.json')
+    if _cache_is_fresh(filepath, meta_path):
+        with open(meta_path) as f:
+            sha256 = json.load(f)['sha256']
+    else:
+        sha256 = _file_hash(filepath)
+    return f'{sha256[:16]}-p{WEATHER_PIPELINE_VERSION}'
+
+
+def prepare_weather_data(filepath=WEATHER_CSV, cache_dir=WEATHER_CACHE_DIR):
+    """Load and preprocess weather CSV, filtering for core meteorological data."""
+    df = read_weather_csv(filepath, cache_dir=cache_dir)
+
+    # Filter for rows with core meteorological parameters only
+    required_cols = ['temp', 'humidity', 'windspeed']
+    df = df.dropna(subset=required_cols)
+
+    # Keep solar radiation, UV index, and cloud cover as-is (with NaN for missing values)
+    # These will be handled as "N/A" in display
+
+    # Sort by time (stable, so rows within an hour keep file order) so every
+    # timestamp occupies one contiguous row range for the time index
+    df = df.sort_values('datetime', kind='stable').reset_index(drop=True)
+
+    # Precompute HSRI once for the whole history so reruns only look it up
+    df = add_hsri_columns(df)
+
+    return df
+
+
+def load_weather_store(filepath=WEATHER_CSV, cache_dir=WEATHER_CACHE_DIR):
+    """
+    Load the processed weather data as a read-only, memory-mapped frame.
+
+    The columns map files under <cache_dir>/weather_store, so every process
+    on the machine shares the same pages. The store is built from the CSV on
+    first use and rebuilt whenever the CSV changes. df.attrs['data_version']
+    identifies the store version.
+    """
+    store_dir = os.path.join(cache_dir, 'weather_store')
+    version = weather_data_version(filepath, cache_dir)
+    df = open_frame_store(store_dir, version)
+    if df is not None:
+        return df
+
+    df = prepare_weather_data(filepath, cache_dir)
+    cube = WeatherCube.from_frame(df)
+    try:
+        write_frame_store(df, store_dir, version, arrays={
+            'cube': cube.data,
+            'cube_site_ids': cube.site_ids,
+            'cube_times': cube.times,
+        })
+        prune_stores(store_dir, version)
+    except OSError:
+        # Read-only filesystem: keep the in-memory copy for this process
+        df.attrs['data_version'] = version
+        return df
+
+    return open_frame_store(store_dir, version)
+
+
+def load_store_cube(weather_df, cache_dir=WEATHER_CACHE_DIR):
+    """Dense [site, hour, variable] cube, memory-mapped from the weather store."""
+    store_dir = os.path.join(cache_dir, 'weather_store')
+    version = weather_df.attrs.get('data_version')
+    data = open_store_array(store_dir, version, 'cube')
+    if data is None:
+        return WeatherCube.from_frame(weather_df)
+    return WeatherCube.from_arrays(
+        data,
+        open_store_array(store_dir, version, 'cube_site_ids'),
+        open_store_array(store_dir, version, 'cube_times'),
+    )
@@ -0,0 +1,450 @@
+"""
+Folium map builder for site HSRI markers.
+
+A whole snapshot is shipped to the browser as one GeoJSON FeatureCollection
+whose features carry only the site's name, county, HSRI value and risk code
+(plus optional weather details). A single Leaflet GeoJSON layer draws each
+site as one labelled circle and builds its tooltip and popup client-side,
+instead of two Folium objects with inline HTML per site.
+
+The county choropleth ships pre-simplified county GeoJSON at the detail
+level of its starting zoom plus one HSRI value per county; finer levels are
+fetched from static files when the zoom reaches them. An
+interpolated HSRI grid (hsri.surface) is drawn as one PNG image overlay.
+Playback maps carry every frame of a time range and animate client-side.
+"""
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.element import MacroElement
+from folium.raster_layers import ImageOverlay
+from jinja2 import Template
+
+from .formula import RISK_CATEGORIES, RISK_COLORS, RISK_LABEL_DARK, RISK_THRESHOLDS, compute_risk_code
+
+DEFAULT_CENTER = (40.7128, -74.0060)
+
+# Starting zoom of the county choropleth (the metro area fits the map)
+COUNTY_ZOOM = 9
+
+# Weather details shown in the Dashboard popup: (label, property, decimals, unit)
+WEATHER_DETAILS = (
+    ('🌡️ Temperature', 'temp', 1, '°F'),
+    ('💧 Humidity', 'humidity', 0, '%'),
+    ('💨 Wind Speed', 'windspeed', 1, ' mph'),
+)
+
+
+def _json_number(value, decimals):
+    """Rounded float for GeoJSON, None for missing values."""
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), decimals)
+
+
+def site_feature_collection(latitude, longitude, hsri, names, counties, details=None):
+    """
+    GeoJSON FeatureCollection of site points.
+
+    All arguments are equal-length sequences; `details` optionally maps a
+    property name (e.g. 'temp') to a sequence of values. Sites without
+    coordinates are left out.
+    """
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    hsri = np.asarray(hsri, dtype=np.float64)
+    risk = compute_risk_code(hsri)
+    details = {key: np.asarray(values, dtype=np.float64) for key, values in (details or {}).items()}
+
+    features = []
+    for i in np.flatnonzero(np.isfinite(latitude) & np.isfinite(longitude)):
+        properties = {
+            'name': str(names[i]),
+            'county': str(counties[i]),
+            'hsri': _json_number(hsri[i], 1),
+            'risk': int(risk[i]),
+        }
+        for key, values in details.items():
+            properties[key] = _json_number(values[i], 1)
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [round(float(longitude[i]), 6), round(float(latitude[i]), 6)]},
+            'properties': properties,
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+class SiteMarkerLayer(MacroElement):
+    """
+    One Leaflet GeoJSON layer drawing every site as a labelled risk circle.
+
+    Colors, risk labels and popup layout are sent once per layer; popups
+    and tooltips are built in the browser from each feature's properties.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function() {
+            var opts = {{ this.options|tojson }};
+            function esc(s) {
+                return String(s).replace(/[&<>"']/g, function(c) {
+                    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+                });
+            }
+            function fmt(v, d) { return v === null || v === undefined ? 'N/A' : v.toFixed(d); }
+            return L.geoJson({{ this.data|tojson }}, {
+                pointToLayer: function(feature, latlng) {
+                    var p = feature.properties;
+                    var color = opts.colors[p.risk];
+                    var dark = opts.dark[p.risk];
+                    var html = '<div style="width: 32px; height: 32px; box-sizing: border-box; border-radius: 50%;'
+                        + ' border: 2px solid ' + color + '; background: ' + color + 'b3;'
+                        + ' display: flex; align-items: center; justify-content: center;'
+                        + ' font-size: 13px; font-weight: bold; color: ' + (dark ? '#333333' : 'white') + ';'
+                        + ' text-shadow: ' + (dark ? '1px 1px 2px rgba(255,255,255,0.8)' : '1px 1px 2px rgba(0,0,0,0.8)') + ';">'
+                        + (p.hsri === null ? '' : Math.round(p.hsri)) + '</div>';
+                    return L.marker(latlng, {icon: L.divIcon({html: html, className: '', iconSize: [32, 32], iconAnchor: [16, 16]})});
+                },
+                onEachFeature: function(feature, layer) {
+                    var p = feature.properties;
+                    var category = opts.categories[p.risk];
+                    var rows = '<b>County:</b> ' + esc(p.county) + '<br/>';
+                    if (opts.date) { rows += '<b>📅 Date:</b> ' + esc(opts.date) + '<br/>'; }
+                    opts.details.forEach(function(d) {
+                        rows += '<b>' + d[0] + ':</b> ' + fmt(p[d[1]], d[2]) + (p[d[1]] === null ? '' : d[3]) + '<br/>';
+                    });
+                    layer.bindPopup(
+                        '<div style="font-family: Arial; width: 300px;">'
+                        + '<b style="font-size: 14px;">' + esc(p.name) + '</b><br/><hr style="margin: 5px 0;">' + rows
+                        + '<hr style="margin: 5px 0;"><b style="font-size: 13px;">' + opts.value_label + ': ' + fmt(p.hsri, 1) + '</b><br/>'
+                        + '<b>' + category[0] + ' ' + category[1] + '</b></div>',
+                        {maxWidth: 300}
+                    );
+                    layer.bindTooltip(esc(p.name) + ': ' + opts.value_label + ' ' + fmt(p.hsri, 1));
+                }
+            }).addTo({{ this._parent.get_name() }});
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, data, value_label='HSRI', date=None, details=()):
+        super().__init__()
+        self._name = 'SiteMarkerLayer'
+        self.data = data
+        self.options = {
+            'colors': list(RISK_COLORS),
+            'dark': list(RISK_LABEL_DARK),
+            'categories': [list(category) for category in RISK_CATEGORIES],
+            'value_label': value_label,
+            'date': date,
+            'details': [list(detail) for detail in details],
+        }
+
+
+class CountyChoroplethLayer(MacroElement):
+    """
+    County polygons filled by risk color of their mean HSRI.
+
+    levels is [(minimum zoom, FeatureCollection or URL)] from
+    Boundaries.detail_levels; the layer redraws from the matching level when
+    the zoom crosses one, fetching URL levels the first time they are needed
+    (and keeping the current outlines if the fetch fails).
+    values maps county id to (mean HSRI, risk code, site count). An optional
+    outline FeatureCollection is drawn as a dashed boundary.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function() {
+            var map = {{ this._parent.get_name() }};
+            var opts = {{ this.options|tojson }};
+            var levels = {{ this.levels|tojson }};
+            var values = {{ this.values|tojson }};
+            function esc(s) {
+                return String(s).replace(/[&<>"']/g, function(c) {
+                    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+                });
+            }
+            var fetched = {};
+            function levelFor(zoom) {
+                var index = 0;
+                levels.forEach(function(level, i) { if (zoom >= level[0]) { index = i; } });
+                return index;
+            }
+            function levelData(i) {
+                var data = levels[i][1];
+                if (typeof data !== 'string') {
+                    return Promise.resolve(data);
+                }
+                if (!fetched[i]) {
+                    fetched[i] = fetch(new URL(data, document.baseURI)).then(function(response) {
+                        if (!response.ok) { throw new Error(response.status); }
+                        return response.json();
+                    });
+                    fetched[i].catch(function() { delete fetched[i]; });
+                }
+                return fetched[i];
+            }
+            function draw(i) {
+                levelData(i).then(function(data) {
+                    if (i === current) {
+                        layer.clearLayers();
+                        layer.addData(data);
+                    }
+                }, function() {});
+            }
+            if (opts.outline) {
+                L.geoJson(opts.outline, {
+                    interactive: false,
+                    style: {color: '#333333', weight: 2, dashArray: '6 4', fill: false}
+                }).addTo(map);
+            }
+            var layer = L.geoJson(null, {
+                style: function(feature) {
+                    var v = values[feature.properties.id];
+                    return {
+                        color: '#555555', weight: 1, fillOpacity: v ? 0.6 : 0.15,
+                        fillColor: v ? opts.colors[v[1]] : '#cccccc'
+                    };
+                },
+                onEachFeature: function(feature, layer) {
+                    var p = feature.properties;
+                    var v = values[p.id];
+                    if (!v) {
+                        layer.bindTooltip(esc(p.name) + ': no sites reporting');
+                        return;
+                    }
+                    var category = opts.categories[v[1]];
+                    layer.bindTooltip(
+                        '<b>' + esc(p.name) + '</b><br/>' + opts.value_label + ': ' + v[0].toFixed(1)
+                        + '<br/>' + category[0] + ' ' + category[1]
+                        + '<br/>' + v[2] + (v[2] === 1 ? ' site' : ' sites'),
+                        {sticky: true}
+                    );
+                }
+            }).addTo(map);
+            var current = levelFor(map.getZoom());
+            draw(current);
+            map.on('zoomend', function() {
+                var next = levelFor(map.getZoom());
+                if (next !== current) {
+                    current = next;
+                    draw(current);
+                }
+            });
+            return layer;
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, levels, values, value_label='HSRI', outline=None):
+        super().__init__()
+        self._name = 'CountyChoroplethLayer'
+        self.levels = [[min_zoom, collection] for min_zoom, collection in levels]
+        self.values = values
+        self.options = {
+            'colors': list(RISK_COLORS),
+            'categories': [list(category) for category in RISK_CATEGORIES],
+            'value_label': value_label,
+            'outline': outline,
+        }
+
+
+def county_values(ids, means, counts):
+    """{county id: [mean HSRI, risk code, site count]} for counties with data."""
+    means = np.asarray(means, dtype=np.float64)
+    risk = compute_risk_code(means)
+    return {
+        str(ids[i]): [round(float(means[i]), 1), int(risk[i]), int(counts[i])]
+        for i in np.flatnonzero(np.isfinite(means))
+    }
+
+
+class PlaybackLayer(MacroElement):
+    """
+    Site markers animated over hourly frames, with a play/pause button and
+    a time slider.
+
+    features are the sites (GeoJSON points with name and county) and
+    values[h][s] the value of site s at frame h (None = no report). Every
+    frame ships with the page, so scrubbing needs no server round-trip.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function() {
+            var map = {{ this._parent.get_name() }};
+            var opts = {{ this.options|tojson }};
+            var sites = {{ this.data|tojson }}.features;
+            var frames = {{ this.frames|tojson }};
+            function esc(s) {
+                return String(s).replace(/[&<>"']/g, function(c) {
+                    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+                });
+            }
+            function risk(v) {
+                var code = 0;
+                opts.thresholds.forEach(function(t, i) { if (v >= t) { code = i + 1; } });
+                return code;
+            }
+            function icon(v) {
+                var missing = v === null;
+                var code = missing ? 0 : risk(v);
+                var color = missing ? '#999999' : opts.colors[code];
+                var dark = !missing && opts.dark[code];
+                var html = '<div style="width: 32px; height: 32px; box-sizing: border-box; border-radius: 50%;'
+                    + ' border: 2px solid ' + color + '; background: ' + color + (missing ? '4d' : 'b3') + ';'
+                    + ' display: flex; align-items: center; justify-content: center;'
+                    + ' font-size: 13px; font-weight: bold; color: ' + (dark ? '#333333' : 'white') + ';'
+                    + ' text-shadow: ' + (dark ? '1px 1px 2px rgba(255,255,255,0.8)' : '1px 1px 2px rgba(0,0,0,0.8)') + ';">'
+                    + (missing ? '–' : Math.round(v)) + '</div>';
+                return L.divIcon({html: html, className: '', iconSize: [32, 32], iconAnchor: [16, 16]});
+            }
+            var markers = sites.map(function(feature) {
+                var c = feature.geometry.coordinates;
+                return L.marker([c[1], c[0]], {icon: icon(null)}).bindTooltip('').addTo(map);
+            });
+
+            var control = L.control({position: 'bottomleft'});
+            var button, slider, label;
+            control.onAdd = function() {
+                var div = L.DomUtil.create('div', 'leaflet-bar');
+                div.style.cssText = 'background: white; padding: 6px 10px; display: flex; align-items: center; gap: 8px; font: 13px Arial;';
+                div.innerHTML = '<button style="width: 32px;">▶</button>'
+                    + '<input type="range" min="0" max="' + (frames.times.length - 1) + '" value="0" style="width: 320px;">'
+                    + '<span style="min-width: 140px;"></span>';
+                button = div.querySelector('button');
+                slider = div.querySelector('input');
+                label = div.querySelector('span');
+                L.DomEvent.disableClickPropagation(div);
+                L.DomEvent.disableScrollPropagation(div);
+                return div;
+            };
+            control.addTo(map);
+
+            var current = -1;
+            function show(i) {
+                if (i === current) { return; }
+                current = i;
+                var frame = frames.values[i];
+                markers.forEach(function(marker, s) {
+                    var v = frame[s];
+                    var p = sites[s].properties;
+                    marker.setIcon(icon(v));
+                    marker.setTooltipContent(
+                        esc(p.name) + ' (' + esc(p.county) + '): ' + opts.value_label + ' ' + (v === null ? 'N/A' : v.toFixed(1))
+                    );
+                });
+                slider.value = i;
+                label.textContent = frames.times[i];
+            }
+            var timer = null;
+            function stop() { clearInterval(timer); timer = null; button.textContent = '▶'; }
+            button.onclick = function() {
+                if (timer !== null) { stop(); return; }
+                if (current >= frames.times.length - 1) { show(0); }
+                button.textContent = '⏸';
+                timer = setInterval(function() {
+                    if (current >= frames.times.length - 1) { stop(); return; }
+                    show(current + 1);
+                }, opts.interval_ms);
+            };
+            slider.oninput = function() { stop(); show(parseInt(slider.value, 10)); };
+            show(0);
+            return markers;
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, features, times, values, value_label='HSRI', interval_ms=400):
+        super().__init__()
+        self._name = 'PlaybackLayer'
+        self.data = features
+        self.frames = {'times': list(times), 'values': values}
+        self.options = {
+            'colors': list(RISK_COLORS),
+            'dark': list(RISK_LABEL_DARK),
+            'thresholds': list(RISK_THRESHOLDS),
+            'value_label': value_label,
+            'interval_ms': interval_ms,
+        }
+
+
+def map_center(latitude, longitude, default=DEFAULT_CENTER):
+    """Mean position of the sites, or the NYC default when there is none."""
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    located = np.isfinite(latitude) & np.isfinite(longitude)
+    if not located.any():
+        return default
+    return float(latitude[located].mean()), float(longitude[located].mean())
+
+
+def surface_image(grid, alpha=140):
+    """RGBA uint8 image of an HSRI grid in risk colors; NaN cells are transparent."""
+    grid = np.asarray(grid, dtype=np.float64)
+    palette = np.array(
+        [[int(color[i:i + 2], 16) for i in (1, 3, 5)] + [alpha] for color in RISK_COLORS], dtype=np.uint8
+    )
+    image = palette[compute_risk_code(grid)]
+    image[~np.isfinite(grid)] = 0
+    return image
+
+
+def build_site_map(features, center, value_label='HSRI', date=None, details=(), zoom_start=11, surface=None):
+    """
+    Folium map with every site drawn by one SiteMarkerLayer, optionally over
+    an interpolated surface given as (HSRI grid, ((south, west), (north, east))).
+    """
+    m = folium.Map(location=list(center), zoom_start=zoom_start, tiles='OpenStreetMap')
+    if surface is not None:
+        grid, bounds = surface
+        ImageOverlay(
+            surface_image(grid), bounds=[list(bounds[0]), list(bounds[1])], mercator_project=True, interactive=False
+        ).add_to(m)
+    SiteMarkerLayer(features, value_label=value_label, date=date, details=details).add_to(m)
+    return m
+
+
+def render_map_html(m):
+    """Standalone HTML document for a Folium map."""
+    return m.get_root().render()
+
+
+def build_county_map(levels, values, center, value_label='HSRI', outline=None, zoom_start=COUNTY_ZOOM):
+    """
+    Folium map with counties drawn by one CountyChoroplethLayer.
+
+    levels should inline only the level drawn at zoom_start (see
+    Boundaries.detail_levels); the finer ones are fetched on zoom.
+    """
+    m = folium.Map(location=list(center), zoom_start=zoom_start, tiles='OpenStreetMap')
+    CountyChoroplethLayer(levels, values, value_label=value_label, outline=outline).add_to(m)
+    return m
+
+
+def build_playback_map(times, latitude, longitude, names, counties, values, center,
+                       value_label='HSRI', interval_ms=400, zoom_start=10):
+    """
+    Folium map animating site values over frames.
+
+    times are UTC int64 ns per frame and values a (frame, site) array
+    aligned with the site sequences; sites without coordinates are left out.
+    """
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    located = np.flatnonzero(np.isfinite(latitude) & np.isfinite(longitude))
+    features = {'type': 'FeatureCollection', 'features': [{
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [round(float(longitude[i]), 6), round(float(latitude[i]), 6)]},
+        'properties': {'name': str(names[i]), 'county': str(counties[i])},
+    } for i in located]}
+
+    frames = np.round(np.asarray(values, dtype=np.float64)[:, located], 1)
+    frame_values = np.where(np.isfinite(frames), frames, None).tolist()
+    labels = [f'{ts:%Y-%m-%d %H:00} UTC' for ts in pd.to_datetime(np.asarray(times, dtype=np.int64), utc=True)]
+
+    m = folium.Map(location=list(center), zoom_start=zoom_start, tiles='OpenStreetMap')
+    PlaybackLayer(features, labels, frame_values, value_label=value_label, interval_ms=interval_ms).add_to(m)
+    return m
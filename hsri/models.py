@@ -0,0 +1,125 @@
+"""
+Trained-model registry.
+
+Caches fitted linear HSRI models keyed by a fingerprint of their training
+window (data version, site, window end, row count, feature set), so reruns
+that do not change the window reuse the fitted coefficients instead of
+training again. Entries are held in memory with LRU eviction and can
+optionally be persisted to a JSON file.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+
+class LinearModel(NamedTuple):
+    """Fitted coefficients of one site's linear HSRI model."""
+    coef: np.ndarray
+    intercept: float
+    x_mean: np.ndarray
+
+    def forecast(self, days_ahead=3):
+        """Trend forecast from the window's mean features, clipped to [-100, 100]."""
+        scale = 1 + 0.02 * np.arange(1, days_ahead + 1)
+        base = float(np.dot(self.x_mean, self.coef))
+        return np.clip(self.intercept + base * scale, -100, 100)
+
+
+def window_fingerprint(data_version, site, window_end, n_rows, features):
+    """Registry key for a model trained on one site's window."""
+    return (str(data_version), str(site), int(window_end), int(n_rows), tuple(features))
+
+
+class ModelRegistry:
+    """
+    Thread-safe LRU cache of fitted models keyed by window fingerprint.
+
+    A cached value of None records that the window could not be fitted,
+    so it is not retried. If `path` is given, existing entries are loaded
+    from it and save() writes the current entries back.
+    """
+
+    def __init__(self, max_entries=4096, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path is not None:
+            self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        """Cached model for key (marking it most recently used), or default."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, model):
+        """Store a model (or None for an unfittable window)."""
+        with self._lock:
+            self._entries[key] = model
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Disk persistence
+    # ------------------------------------------------------------------
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                records = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        for record in records[-self.max_entries:]:
+            key = tuple(record['key'][:4]) + (tuple(record['key'][4]),)
+            model = record['model']
+            if model is not None:
+                model = LinearModel(np.array(model['coef']), model['intercept'], np.array(model['x_mean']))
+            self._entries[key] = model
+
+    def save(self):
+        """Write entries to `path` if anything changed since the last save."""
+        if self.path is None or not self._dirty:
+            return
+        with self._lock:
+            records = []
+            for key, model in self._entries.items():
+                if model is not None:
+                    model = {
+                        'coef': model.coef.tolist(),
+                        'intercept': float(model.intercept),
+                        'x_mean': model.x_mean.tolist(),
+                    }
+                records.append({'key': list(key[:4]) + [list(key[4])], 'model': model})
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.tmp-{os.getpid()}-{threading.get_ident()}'
+        with open(tmp_path, 'w') as f:
+            json.dump(records, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,161 @@
+"""
+Online recursive-least-squares HSRI forecaster.
+
+Keeps a per-site RLS state (coefficients and inverse-covariance matrix) that
+absorbs each new hourly observation in O(features²), so forecasts are
+available at any time without refitting a trailing window. An optional
+forgetting factor discounts old observations exponentially; the default of
+0.98 gives an effective memory of about 50 hours, matching the 50-row window
+the batch forecaster trains on.
+"""
+
+import numpy as np
+
+from .forecast import FEATURE_COLS, MEAN_FILL_COLS, TARGET_COL
+
+
+class OnlineForecaster:
+    """
+    Recursive least squares (with intercept) for many sites at once.
+
+    State per site: theta [F+1] (intercept first), P [F+1, F+1], and
+    forgetting-weighted feature means used both to fill solar/UV/cloud gaps
+    and as the base for the trend forecast, as in forecast_hsri.
+    """
+
+    def __init__(self, forgetting=0.98, delta=1e6, features=FEATURE_COLS, fill_cols=MEAN_FILL_COLS):
+        if not 0 < forgetting <= 1:
+            raise ValueError("forgetting must be in (0, 1]")
+        self.forgetting = forgetting
+        self.delta = delta
+        self.features = tuple(features)
+        self._fill = np.array([name in fill_cols for name in self.features])
+
+        n_params = len(self.features) + 1
+        self.site_ids = []
+        self._site_lookup = {}
+        self.theta = np.zeros((0, n_params))
+        self.P = np.zeros((0, n_params, n_params))
+        self.n_obs = np.zeros(0, dtype=np.int64)
+        self._mean = np.zeros((0, len(self.features)))
+        self._mean_weight = np.zeros((0, len(self.features)))
+
+    # ------------------------------------------------------------------
+    # Site bookkeeping
+    # ------------------------------------------------------------------
+    def site_positions(self, site_ids, create=False):
+        """State rows for site ids; unknown sites are added when create=True, else -1."""
+        positions = []
+        new_ids = []
+        for site_id in site_ids:
+            pos = self._site_lookup.get(site_id)
+            if pos is None and create:
+                pos = len(self.site_ids) + len(new_ids)
+                self._site_lookup[site_id] = pos
+                new_ids.append(site_id)
+            positions.append(-1 if pos is None else pos)
+        if new_ids:
+            self._grow(new_ids)
+        return np.array(positions, dtype=np.intp)
+
+    def _grow(self, new_ids):
+        n_new = len(new_ids)
+        n_params = self.theta.shape[1]
+        self.site_ids.extend(new_ids)
+        self.theta = np.concatenate([self.theta, np.zeros((n_new, n_params))])
+        self.P = np.concatenate([self.P, np.broadcast_to(self.delta * np.eye(n_params), (n_new, n_params, n_params))])
+        self.n_obs = np.concatenate([self.n_obs, np.zeros(n_new, dtype=np.int64)])
+        self._mean = np.concatenate([self._mean, np.zeros((n_new, len(self.features)))])
+        self._mean_weight = np.concatenate([self._mean_weight, np.zeros((n_new, len(self.features)))])
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def update(self, site_ids, X, y):
+        """
+        Absorb one observation per site (site_ids must be distinct).
+
+        X is [n, feature] and y [n]. Rows with a missing target or a missing
+        non-fillable feature are skipped; missing solar/UV/cloud values are
+        filled with the site's running mean (0 before any value is seen).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        pos = self.site_positions(site_ids, create=True)
+
+        missing = np.isnan(X)
+        usable = ~np.isnan(y) & ~(missing & ~self._fill).any(axis=1)
+        if not usable.any():
+            return
+        pos, X, y, missing = pos[usable], X[usable], y[usable], missing[usable]
+        lam = self.forgetting
+
+        # Forgetting-weighted feature means, over observed values only
+        weight = lam * self._mean_weight[pos] + ~missing
+        mean = self._mean[pos]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(missing, mean, mean + (np.nan_to_num(X) - mean) / weight)
+        self._mean_weight[pos] = weight
+        self._mean[pos] = mean
+        X = np.where(missing, mean, X)
+
+        # RLS step: k = P x / (lam + x'P x); theta += k e; P = (P - k x'P) / lam
+        x = np.concatenate([np.ones((len(y), 1)), X], axis=1)
+        P = self.P[pos]
+        Px = np.einsum('nij,nj->ni', P, x)
+        gain = Px / (lam + np.einsum('ni,ni->n', x, Px))[:, None]
+        error = y - np.einsum('ni,ni->n', x, self.theta[pos])
+        self.theta[pos] += gain * error[:, None]
+        P = (P - np.einsum('ni,nj->nij', gain, Px)) / lam
+        self.P[pos] = 0.5 * (P + P.transpose(0, 2, 1))
+        self.n_obs[pos] += 1
+
+    def update_frame(self, df, site_col='aqs_id_full'):
+        """Absorb a frame of observations in time order, one hour at a time."""
+        df = df.sort_values('datetime', kind='stable')
+        for _, hour in df.groupby('datetime', sort=False):
+            hour = hour.drop_duplicates(site_col, keep='last')
+            self.update(hour[site_col].tolist(), hour[list(self.features)].to_numpy(dtype=np.float64), hour[TARGET_COL].to_numpy(dtype=np.float64))
+
+    def update_cube(self, cube, start=None, stop=None):
+        """Absorb the cube's hours [start, stop) for every site, hour by hour."""
+        columns = [cube.variable_position(name) for name in self.features]
+        target = cube.variable_position(TARGET_COL)
+        site_ids = cube.site_ids
+        for h in range(*slice(start, stop).indices(cube.data.shape[1])):
+            snapshot = cube.snapshot(h)
+            present = cube.valid_mask(snapshot)
+            if present.any():
+                rows = snapshot[present]
+                self.update(site_ids[present].tolist(), rows[:, columns], rows[:, target])
+
+    @classmethod
+    def from_cube(cls, cube, start=None, stop=None, **kwargs):
+        """Forecaster warmed up on a span of the weather cube."""
+        forecaster = cls(**kwargs)
+        forecaster.update_cube(cube, start, stop)
+        return forecaster
+
+    # ------------------------------------------------------------------
+    # Forecasts
+    # ------------------------------------------------------------------
+    def forecast(self, site_ids, days_ahead=3, min_obs=10):
+        """
+        Trend forecast for each site id as a [site, days_ahead] array.
+
+        Uses the running feature means scaled by (1 + 0.02 * day), as
+        forecast_hsri does, clipped to [-100, 100]. Rows are NaN for unknown
+        sites or sites with fewer than min_obs observations.
+        """
+        pos = self.site_positions(site_ids)
+        forecasts = np.full((len(pos), days_ahead), np.nan)
+        ok = pos >= 0
+        ok[ok] = self.n_obs[pos[ok]] >= min_obs
+        if not ok.any():
+            return forecasts
+
+        theta = self.theta[pos[ok]]
+        base = np.einsum('nf,nf->n', self._mean[pos[ok]], theta[:, 1:])
+        scale = 1 + 0.02 * np.arange(1, days_ahead + 1)
+        forecasts[ok] = np.clip(theta[:, :1] + base[:, None] * scale[None, :], -100, 100)
+        return forecasts
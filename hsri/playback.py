@@ -0,0 +1,57 @@
+"""
+Map playback frames.
+
+A playback range is cut from the weather cube in one slice: HSRI for every
+site and hour of the range as an [hour, site] array, precomputed in bulk at
+ingest. The browser receives the site positions once and this array, and
+steps through the hours itself.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Longest range the dashboard plays back (~200 KB of frames for the metro sites)
+PLAYBACK_MAX_DAYS = 31
+
+
+class PlaybackFrames(NamedTuple):
+    """Hourly values for a set of sites: values[h, s] at times[h] (UTC ns) for site_ids[s]."""
+    times: np.ndarray
+    site_ids: np.ndarray
+    values: np.ndarray
+
+
+def playback_range(start, end, max_days=PLAYBACK_MAX_DAYS):
+    """
+    First and last hour played back for a start/end pair: an end at
+    midnight (e.g. a date) covers that whole day, and a range longer than
+    max_days keeps its last max_days days.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if end == end.normalize():
+        end += pd.Timedelta(days=1) - pd.Timedelta(hours=1)
+    return max(start, end.normalize() - pd.Timedelta(days=max_days - 1)), end
+
+
+def playback_frames(cube, start, end, site_ids=None, variable='hsri'):
+    """
+    Frames for every hour of playback_range(start, end) (naive = UTC) for
+    the given sites in the order given, all cube sites by default. Hours
+    at which none of the sites reported are left out.
+    """
+    hours = cube.hour_range(*playback_range(start, end))
+
+    if site_ids is None:
+        positions = np.arange(len(cube.site_ids))
+    else:
+        positions = np.array([pos for pos in map(cube.site_position, site_ids) if pos is not None], dtype=np.int64)
+
+    if len(hours) == 0 or len(positions) == 0:
+        empty = np.empty((0, len(positions)), dtype=np.float32)
+        return PlaybackFrames(np.empty(0, dtype=np.int64), cube.site_ids[positions], empty)
+
+    values = cube.data[positions, hours[0]:hours[-1] + 1, cube.variable_position(variable)].T
+    reported = np.isfinite(values).any(axis=1)
+    return PlaybackFrames(cube.times[hours][reported], cube.site_ids[positions], values[reported])
@@ -0,0 +1,216 @@
+"""
+Minimal reader for R's .rds serialization format.
+
+Decodes the subset that the files under config/ use: XDR (binary)
+serialization versions 2 and 3, gzip/bzip2/xz compressed or not, holding
+data frames (including sf frames) of logical, integer, double and character
+columns. R is not needed, and neither is pyreadr, which rejects sf
+geometry columns.
+"""
+
+import bz2
+import gzip
+import lzma
+import struct
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# SEXP type codes
+NILSXP, SYMSXP, LISTSXP, CHARSXP = 0, 1, 2, 9
+LGLSXP, INTSXP, REALSXP, STRSXP, VECSXP, EXPRSXP = 10, 13, 14, 16, 19, 20
+ALTREP_SXP = 238
+EMPTYENV_SXP, BASEENV_SXP, GLOBALENV_SXP, UNBOUNDVALUE_SXP = 242, 241, 253, 252
+MISSINGARG_SXP, BASENAMESPACE_SXP, NILVALUE_SXP, REFSXP = 251, 247, 254, 255
+
+NA_INTEGER = -2**31
+
+_SPECIAL = (EMPTYENV_SXP, BASEENV_SXP, GLOBALENV_SXP, UNBOUNDVALUE_SXP, MISSINGARG_SXP, BASENAMESPACE_SXP)
+
+
+class RObject(NamedTuple):
+    """
+    A decoded R value.
+
+    value is an ndarray for logical/integer/double vectors (NA_INTEGER marks
+    missing integers), a list of str (None for NA) for character vectors, a
+    list of RObject for lists, and a str for symbols.
+    """
+    type: int
+    value: object
+    attributes: dict
+
+    def attr(self, name, default=None):
+        """Plain value of an attribute, or default if it is not set."""
+        obj = self.attributes.get(name)
+        return default if obj is None else obj.value
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.refs = []
+
+    def int(self):
+        value, = struct.unpack_from('>i', self.data, self.pos)
+        self.pos += 4
+        return value
+
+    def array(self, dtype, itemsize, n):
+        values = np.frombuffer(self.data, dtype=dtype, count=n, offset=self.pos)
+        self.pos += itemsize * n
+        return values.astype(dtype[1:])
+
+    def item(self):
+        flags = self.int()
+        sxp = flags & 0xff
+        has_attr = flags & (1 << 9)
+
+        if sxp in (NILVALUE_SXP, NILSXP):
+            return None
+        if sxp in _SPECIAL:
+            return RObject(sxp, None, {})
+        if sxp == REFSXP:
+            return self.refs[(flags >> 8) - 1]
+        if sxp == SYMSXP:
+            symbol = RObject(SYMSXP, self.item(), {})
+            self.refs.append(symbol)
+            return symbol
+        if sxp == LISTSXP:
+            return self.pairlist(flags)
+        if sxp == ALTREP_SXP:
+            return self.altrep()
+        if sxp == CHARSXP:
+            n = self.int()
+            if n == -1:
+                return None
+            value = self.data[self.pos:self.pos + n].decode('utf-8', errors='replace')
+            self.pos += n
+            return value
+
+        if sxp in (LGLSXP, INTSXP):
+            value = self.array('>i4', 4, self.int())
+        elif sxp == REALSXP:
+            value = self.array('>f8', 8, self.int())
+        elif sxp in (STRSXP, VECSXP, EXPRSXP):
+            value = [self.item() for _ in range(self.int())]
+        else:
+            raise ValueError(f"unsupported R object type {sxp} at byte {self.pos - 4}")
+
+        attributes = self.item().value if has_attr else {}
+        return RObject(sxp, value, attributes)
+
+    def pairlist(self, flags):
+        """Tagged pairlist (attributes) as a dict; untagged items get positional keys."""
+        items = {}
+        while flags & 0xff == LISTSXP:
+            if flags & (1 << 9):
+                self.item()
+            tag = self.item() if flags & (1 << 10) else None
+            items[tag.value if tag is not None else len(items)] = self.item()
+            flags = self.int()
+        return RObject(LISTSXP, items, {})
+
+    def altrep(self):
+        """Compact sequences and wrapper objects, expanded to plain vectors."""
+        info = self.item()
+        state = self.item()
+        attributes = self.item()
+        attributes = attributes.value if attributes is not None else {}
+        kind = info.value[0].value
+
+        if kind in ('compact_intseq', 'compact_realseq'):
+            n, start, step = state.value[:3]
+            values = start + step * np.arange(int(n))
+            sxp = INTSXP if kind == 'compact_intseq' else REALSXP
+            return RObject(sxp, values.astype(np.int32 if sxp == INTSXP else np.float64), attributes)
+        if kind.startswith('wrap_'):
+            wrapped = state.value[0]
+            return RObject(wrapped.type, wrapped.value, {**wrapped.attributes, **attributes})
+        if kind == 'deferred_string':
+            values = state.value[0]
+            return RObject(STRSXP, [str(v) for v in values.value], attributes)
+        raise ValueError(f"unsupported ALTREP class {kind!r}")
+
+
+def _decompress(raw):
+    if raw[:2] == b'\x1f\x8b':
+        return gzip.decompress(raw)
+    if raw[:3] == b'BZh':
+        return bz2.decompress(raw)
+    if raw[:6] == b'\xfd7zXZ\x00':
+        return lzma.decompress(raw)
+    return raw
+
+
+def read_rds(filepath):
+    """Decode an .rds file into an RObject tree."""
+    with open(filepath, 'rb') as f:
+        data = _decompress(f.read())
+
+    if data[:2] != b'X\n':
+        raise ValueError(f"{filepath}: only XDR (binary) .rds files are supported")
+    reader = _Reader(data)
+    reader.pos = 2
+    version = reader.int()
+    reader.int()  # R version that wrote the file
+    reader.int()  # minimal R version to read it
+    if version == 3:
+        n = reader.int()
+        reader.pos += n  # native encoding name
+    elif version != 2:
+        raise ValueError(f"{filepath}: unsupported serialization version {version}")
+    return reader.item()
+
+
+def _geometry(obj):
+    """sf geometry as NumPy: (2,) point, (n, 2) ring, or nested lists of rings."""
+    if obj.type == VECSXP:
+        return [_geometry(part) for part in obj.value]
+    dim = obj.attr('dim')
+    if dim is not None:
+        return obj.value.reshape(int(dim[1]), int(dim[0])).T
+    return obj.value
+
+
+def _column(obj):
+    values = obj.value
+    if obj.type == STRSXP:
+        return np.array(values, dtype=object)
+    if obj.type == VECSXP:
+        return [_geometry(item) for item in values]
+    levels = obj.attr('levels')
+    if levels is not None:
+        return pd.Categorical.from_codes(np.where(values == NA_INTEGER, -1, values - 1), categories=levels)
+    if obj.type == LGLSXP:
+        return pd.array(np.where(values == NA_INTEGER, None, values != 0), dtype='boolean')
+    if obj.type == INTSXP and (values == NA_INTEGER).any():
+        return pd.array(np.where(values == NA_INTEGER, None, values), dtype='Int64')
+    return values
+
+
+def rds_frame(obj):
+    """
+    pandas DataFrame from a decoded data frame.
+
+    sf geometry columns become object columns of NumPy coordinates (see
+    _geometry); the geometry column name and CRS are kept in df.attrs.
+    """
+    if obj.type != VECSXP or 'data.frame' not in (obj.attr('class') or ()):
+        raise ValueError("RDS object is not a data frame")
+
+    df = pd.DataFrame({name: _column(col) for name, col in zip(obj.attr('names'), obj.value)})
+    sf_column = obj.attr('sf_column')
+    if sf_column:
+        df.attrs['sf_column'] = sf_column[0]
+        crs = obj.value[list(obj.attr('names')).index(sf_column[0])].attr('crs')
+        if crs:
+            df.attrs['crs'] = crs[0].value[0]
+    return df
+
+
+def read_rds_frame(filepath):
+    """Read an .rds file holding a data frame (see rds_frame)."""
+    return rds_frame(read_rds(filepath))
@@ -0,0 +1,85 @@
+"""
+Rendered-output cache.
+
+Holds rendered map HTML keyed by the inputs that determine it (data
+version, view, timestamp, area, forecast day), so a view that any session
+has already drawn is served as a string instead of being rebuilt and
+re-serialized. Concurrent misses on one key render once (see
+hsri.result_cache.SingleFlight). Entries are evicted least-recently-used
+once either the entry count or the total size bound is exceeded.
+"""
+
+import threading
+from collections import OrderedDict
+
+from .result_cache import SingleFlight
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered strings, bounded by entries and bytes."""
+
+    def __init__(self, max_bytes=64 * 2**20, max_entries=256):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        """Cached value for key (marking it most recently used), or default."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """Store a rendered string; values larger than max_bytes are not kept."""
+        size = len(value.encode('utf-8'))
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                self.nbytes -= self._entries.popitem(last=False)[1][1]
+
+    def get_or_render(self, key, render):
+        """
+        Cached value for key, calling render() and caching its result on a
+        miss; concurrent misses on key wait for a single render.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        def render_and_put():
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            rendered = render()
+            self.put(key, rendered)
+            return rendered
+
+        return self._flight.do(key, render_and_put)[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
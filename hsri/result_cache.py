@@ -0,0 +1,125 @@
+"""
+Process-wide result cache with request coalescing.
+
+Snapshots and forecasts are keyed by the inputs that determine them (data
+version, timestamp, site set), so every session asking for the same hour
+shares one result. Concurrent misses on one key are coalesced: the first
+caller computes, the others wait for it and get the same object, so a
+burst of sessions at the latest hour costs one computation. Entries are
+evicted least-recently-used beyond max_entries.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """At most one computation per key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, compute):
+        """
+        compute() for key, or the result of the call already in flight for
+        it (exceptions are raised in every waiting caller). Returns
+        (value, shared), shared being True for callers that waited.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = compute()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+
+class ResultCache:
+    """Thread-safe LRU cache of computed objects, bounded by entries, with coalesced misses."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        """Cached value for key (marking it most recently used), or default."""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """
+        Cached value for key; on a miss compute() runs once however many
+        callers ask concurrently, and its result is cached for all of them.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        def compute_and_put():
+            # A caller that missed just as the previous flight finished finds it here
+            cached = self.get(key, missing)
+            if cached is not missing:
+                return cached
+            with self._lock:
+                self.misses += 1
+            result = compute()
+            self.put(key, result)
+            return result
+
+        value, shared = self._flight.do(key, compute_and_put)
+        if shared:
+            with self._lock:
+                self.coalesced += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,288 @@
+"""
+Monitoring-site metadata.
+
+The site registry is built once from the curated AQS_SITES table and
+config/sites.rds (station points of every other station), with county
+names and shapes from config/counties.rds. It is an id-indexed table: lookups are a hash probe,
+and the weather frame joins to it through its categorical site codes.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .boundaries import CONFIG_DIR, COUNTIES_RDS, load_county_boundaries
+from .ingest import DATA_DIR
+from .rds import read_rds_frame
+
+METRO_CSV = os.path.join(DATA_DIR, 'metro.csv')
+SITES_RDS = os.path.join(CONFIG_DIR, 'sites.rds')
+
+# Columns joined onto observations, in order
+SITE_COLUMNS = ['site_name', 'county', 'latitude', 'longitude']
+
+# Curated AQS sites: (site name, county, latitude, longitude)
+AQS_SITES = {
+    # NYC (5 Boroughs)
+    840421010055: ('Manhattan-Midtown', 'New York County', 40.7614, -73.9776),
+    840421010075: ('Manhattan-Upper West', 'New York County', 40.7831, -73.9712),
+    840421010048: ('Manhattan-Upper East', 'New York County', 40.7688, -73.9519),
+    840090010010: ('Brooklyn-Downtown', 'Kings County', 40.6501, -73.9496),
+
+    # Queens
+    840360470052: ('Queens-Astoria', 'Queens County', 40.7673, -73.9302),
+    840360470118: ('Queens-Jamaica', 'Queens County', 40.7014, -73.8156),
+
+    # Bronx
+    840360610135: ('Bronx-SW', 'Bronx County', 40.8298, -73.8850),
+    840360610115: ('Bronx-Pelham', 'Bronx County', 40.8648, -73.8276),
+
+    # Staten Island
+    840360850055: ('Staten Island-Fresh Kills', 'Richmond County', 40.5834, -74.1677),
+    840360850111: ('Staten Island-Coney Island', 'Richmond County', 40.5755, -74.1333),
+
+    # Westchester County
+    840360050080: ('Westchester-Yonkers', 'Westchester County', 40.9230, -73.8987),
+    840360050110: ('Westchester-Mamaroneck', 'Westchester County', 40.9450, -73.7350),
+    840360050112: ('Westchester-Croton', 'Westchester County', 41.1833, -73.8667),
+
+    # New Jersey - Bergen & Hudson
+    840360710002: ('NJ-Hudson', 'Hudson County', 40.7178, -74.0569),
+
+    # Connecticut
+    840090090027: ('CT-New Haven', 'New Haven County', 41.3083, -72.9279),
+    840090110124: ('CT-Bridgeport', 'Fairfield County', 41.1833, -73.1833),
+    840090011123: ('CT-Stamford', 'Fairfield County', 41.0534, -73.5387),
+
+    # Long Island - Nassau & Suffolk
+    840340030010: ('Nassau-NW', 'Nassau County', 40.8333, -73.6667),
+    840340070010: ('Nassau-Central', 'Nassau County', 40.8500, -73.5000),
+    840340170008: ('Suffolk-E', 'Suffolk County', 40.9500, -72.8000),
+    840340171003: ('Suffolk-SE', 'Suffolk County', 40.8667, -72.7333),
+    840340210005: ('Suffolk-Central', 'Suffolk County', 40.9000, -72.9000),
+    840340210008: ('Suffolk-NE', 'Suffolk County', 41.0500, -72.7500),
+    840340390004: ('Nassau-SW', 'Nassau County', 40.6833, -73.5000),
+    840340392003: ('Nassau-S', 'Nassau County', 40.6500, -73.6667),
+    840340190001: ('Hempstead', 'Nassau County', 40.7550, -73.6219),
+    840340273001: ('Freeport', 'Nassau County', 40.6575, -73.5819),
+    840340230011: ('Rockville Centre', 'Nassau County', 40.6667, -73.6500),
+    840340410007: ('Valley Stream', 'Nassau County', 40.6650, -73.7100),
+
+    # Rockland County, NY
+    840360810120: ('Rockland-W', 'Rockland County', 41.0880, -74.2435),
+    840360810124: ('Rockland-S', 'Rockland County', 41.1333, -74.0333),
+
+    # Orange County, NY
+    840360870005: ('Orange County', 'Orange County', 41.3333, -74.2667),
+
+    # Dutchess & Putnam Counties, NY
+    840361030009: ('Dutchess County', 'Dutchess County', 41.6333, -73.7000),
+    840361192004: ('Putnam County', 'Putnam County', 41.4667, -73.8667),
+}
+
+
+def load_metro_data(filepath=METRO_CSV):
+    """Load metro area county data (None if the file is missing)."""
+    try:
+        return pd.read_csv(filepath)
+    except FileNotFoundError:
+        return None
+
+
+def aqs_county_geoids(aqs_ids):
+    """County FIPS geoid ('SSCCC') embedded in 12-digit AQS ids (840 SS CCC NNNN)."""
+    ids = np.asarray(aqs_ids, dtype=np.int64)
+    return np.char.zfill(((ids // 10**4) % 10**5).astype(str), 5).astype(object)
+
+
+def load_county_table(filepath=COUNTIES_RDS):
+    """
+    Metro counties indexed by geoid: county name ('Kings County'), state and
+    centroid. None if the file is missing or unreadable.
+    """
+    counties = load_county_boundaries(filepath)
+    if counties is None:
+        return None
+
+    centroids = counties.centroids()
+    return pd.DataFrame({
+        'county': counties.names.to_numpy(),
+        'state': counties.table['state'].to_numpy(),
+        'latitude': centroids[:, 0],
+        'longitude': centroids[:, 1],
+    }, index=pd.Index(counties.ids, name='geoid'))
+
+
+def _config_sites(filepath, counties):
+    """Station rows from sites.rds, or None if the file is missing or unreadable."""
+    try:
+        sites = read_rds_frame(filepath)
+    except (OSError, ValueError):
+        return None
+
+    ids = sites['aqs_id_full'].to_numpy().astype(np.int64)
+    points = np.array([np.asarray(point, dtype=np.float64)[:2] for point in sites['geometry']]).reshape(-1, 2)
+
+    # County from the id's FIPS code, else (NYC DOT sensors) from the nyc_id prefix
+    geoids = pd.Series(aqs_county_geoids(ids))
+    known = set(counties.index) if counties is not None else set()
+    nyc_geoids = sites['nyc_id'].str[:5] if 'nyc_id' in sites else pd.Series(None, index=sites.index)
+    geoids = geoids.where(geoids.isin(known), nyc_geoids.where(nyc_geoids.isin(known)))
+
+    return pd.DataFrame({
+        'site_name': sites['site_name'].to_numpy(),
+        'geoid': geoids.to_numpy(),
+        'latitude': points[:, 1],
+        'longitude': points[:, 0],
+    }, index=pd.Index(ids, name='aqs_id_full'))
+
+
+class SiteRegistry:
+    """
+    Site metadata indexed by AQS id (int64), with metro county centroids
+    for placing stations the registry does not know.
+    """
+
+    def __init__(self, table, counties=None):
+        self.table = table
+        self.counties = counties
+        self._positions = {aqs_id: i for i, aqs_id in enumerate(table.index.tolist())}
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, aqs_id):
+        return aqs_id in self._positions
+
+    def position(self, aqs_id):
+        """Row of aqs_id in the registry table, or None."""
+        return self._positions.get(aqs_id)
+
+    def positions(self, aqs_ids):
+        """Rows of many ids at once, -1 where unknown."""
+        return self.table.index.get_indexer(np.asarray(aqs_ids, dtype=np.int64))
+
+    def lookup(self, aqs_ids):
+        """
+        Metadata for any ids, one row each, in order.
+
+        Unknown stations are named Location-<id> and placed at the centroid
+        of the metro county in their id, or left without coordinates (and so
+        off the maps) when the county is not a metro county.
+        """
+        ids = np.asarray(aqs_ids, dtype=np.int64)
+        rows = self.positions(ids)
+        known = rows >= 0
+        table = self.table.iloc[np.where(known, rows, 0)].reset_index(drop=True)
+        table.index = pd.Index(ids, name='aqs_id_full')
+        if known.all() or len(ids) == 0:
+            return table
+
+        unknown = np.flatnonzero(~known)
+        geoids = aqs_county_geoids(ids[unknown])
+        table.loc[table.index[unknown], 'site_name'] = [f'Location-{aqs_id}' for aqs_id in ids[unknown]]
+        table.loc[table.index[unknown], 'geoid'] = None
+        table.loc[table.index[unknown], 'county'] = 'Other'
+        table.loc[table.index[unknown], ['latitude', 'longitude']] = np.nan
+        if self.counties is not None:
+            county_rows = self.counties.index.get_indexer(geoids)
+            located = county_rows >= 0
+            county = self.counties.iloc[county_rows[located]]
+            target = table.index[unknown[located]]
+            table.loc[target, 'geoid'] = county.index.to_numpy()
+            table.loc[target, 'county'] = county['county'].to_numpy()
+            table.loc[target, 'latitude'] = county['latitude'].to_numpy()
+            table.loc[target, 'longitude'] = county['longitude'].to_numpy()
+        return table
+
+    def surveyed_coordinates(self, aqs_ids):
+        """
+        (latitude, longitude) arrays for ids, NaN for stations the registry
+        does not know, so the ones lookup() puts at a county centroid are
+        left off surfaces instead of weighing in from the wrong place.
+        """
+        rows = self.positions(aqs_ids)
+        surveyed = rows >= 0
+        table = self.table.iloc[np.where(surveyed, rows, 0)]
+        latitude = np.where(surveyed, table['latitude'].to_numpy(dtype=np.float64), np.nan)
+        longitude = np.where(surveyed, table['longitude'].to_numpy(dtype=np.float64), np.nan)
+        return latitude, longitude
+
+
+def load_site_registry(sites_path=SITES_RDS, counties_path=COUNTIES_RDS):
+    """
+    Build the site registry from the config files.
+
+    AQS_SITES is authoritative for its ids (name, county and position
+    together, so the borough groups keyed on those names draw the places
+    they name). Other stations come from sites.rds, with the county taken
+    from the metro county in the site id (counties.rds).
+    """
+    counties = load_county_table(counties_path)
+    curated = pd.DataFrame.from_dict(
+        AQS_SITES, orient='index', columns=['site_name', 'county', 'latitude', 'longitude']
+    )
+    curated.index = pd.Index(curated.index.astype(np.int64), name='aqs_id_full')
+
+    table = _config_sites(sites_path, counties)
+    if table is None:
+        table = curated.iloc[:0].assign(geoid=None)
+    table = table[~table.index.duplicated() & ~table.index.isin(curated.index)]
+
+    # Config rows: county from the geoid
+    county_names = counties['county'] if counties is not None else pd.Series(dtype=object)
+    table['county'] = table['geoid'].map(county_names)
+
+    # Curated rows: geoid from the county name
+    county_geoids = pd.Series(county_names.index, index=county_names.to_numpy())
+    curated['geoid'] = curated['county'].map(county_geoids[~county_geoids.index.duplicated()])
+
+    table = pd.concat([curated, table]) if len(table) else curated
+    table['site_name'] = table['site_name'].fillna(pd.Series(
+        [f'Location-{aqs_id}' for aqs_id in table.index], index=table.index
+    ))
+    table['county'] = table['county'].fillna('Other')
+    return SiteRegistry(table[['site_name', 'county', 'geoid', 'latitude', 'longitude']], counties)
+
+
+def load_site_data(weather_df, registry=None):
+    """
+    Site metadata (SITE_COLUMNS and geoid) for every AQS id in the weather
+    data, known or not.
+
+    One row per id, in the order of the frame's aqs_id_full categories, so
+    category code i is row i (see join_sites).
+    """
+    if registry is None:
+        registry = load_site_registry()
+    ids = weather_df['aqs_id_full']
+    categories = ids.cat.categories if isinstance(ids.dtype, pd.CategoricalDtype) else pd.unique(ids)
+    return registry.lookup(categories)[SITE_COLUMNS + ['geoid']].reset_index()
+
+
+def join_sites(df, sites_df, columns=SITE_COLUMNS):
+    """
+    df with the given columns of its sites appended (left join on aqs_id_full).
+
+    Rows are matched through integer codes: the frame's category codes are
+    remapped to sites_df rows once per category, then every column is a
+    positional take.
+    """
+    ids = df['aqs_id_full']
+    site_rows = pd.Index(sites_df['aqs_id_full'].to_numpy())
+    if isinstance(ids.dtype, pd.CategoricalDtype):
+        codes = ids.cat.codes.to_numpy()
+        rows = site_rows.get_indexer(ids.cat.categories)[codes]
+        rows[codes < 0] = -1
+    else:
+        rows = site_rows.get_indexer(ids.to_numpy())
+
+    out = df.reset_index(drop=True)
+    missing = rows < 0
+    for column in columns:
+        values = sites_df[column].to_numpy()[np.where(missing, 0, rows)]
+        if missing.any():
+            values = pd.Series(values).where(~missing).to_numpy()
+        out[column] = values
+    return out
@@ -0,0 +1,119 @@
+"""
+Per-timestamp snapshots of the weather data.
+
+A snapshot is one hour's rows joined with site and metro metadata and risk
+labels, built once per timestamp and shared read-only by every session.
+Area and threshold filters are row positions into it, kept for the most
+recent filters; the filtered frames are taken from them on demand, so no
+copy of the rows outlives the rerun that asked for it.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .formula import risk_labels
+from .sites import join_sites
+from .timeindex import get_time_slice
+
+# Filters whose row positions are kept per snapshot (threshold slider positions x areas)
+MAX_VIEWS = 16
+
+
+class Snapshot:
+    """
+    Enriched rows stamped with one timestamp.
+
+    rows must not be modified: it is shared between sessions.
+    """
+
+    def __init__(self, time, rows):
+        self.time = time
+        self.rows = rows
+        self.hsri = rows['hsri'].to_numpy(dtype=np.float64, na_value=np.nan)
+        self._site_names = rows['site_name'].to_numpy()
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def area_mask(self, site_names):
+        """Rows of the given sites; every row if none of them reported."""
+        mask = np.isin(self._site_names, list(site_names))
+        if not mask.any():
+            mask[:] = True
+        return mask
+
+    def threshold_mask(self, threshold):
+        """Rows with HSRI >= threshold."""
+        return self.hsri >= threshold
+
+    def view(self, mask):
+        """Rows under a mask (rows itself when the mask selects every row)."""
+        return self.rows if mask.all() else self.rows[mask]
+
+    def take(self, positions):
+        """Rows at positions (rows itself for None, meaning every row)."""
+        return self.rows if positions is None else self.rows.iloc[positions]
+
+    def _positions(self, mask):
+        return None if mask.all() else np.flatnonzero(mask)
+
+    def views(self, site_names, threshold):
+        """
+        (current, area, high_risk): all rows, the rows of the selected sites
+        (all if none match) and those of them with HSRI >= threshold.
+
+        Only the row positions of the last MAX_VIEWS distinct filters are
+        cached; area and high_risk are taken from them on each call (current
+        and an all-rows area are rows itself).
+        """
+        key = (tuple(site_names), float(threshold))
+        with self._lock:
+            positions = self._views.get(key)
+            if positions is not None:
+                self._views.move_to_end(key)
+
+        if positions is None:
+            area = self.area_mask(site_names)
+            positions = (self._positions(area), self._positions(area & self.threshold_mask(threshold)))
+            with self._lock:
+                self._views[key] = positions
+                self._views.move_to_end(key)
+                while len(self._views) > MAX_VIEWS:
+                    self._views.popitem(last=False)
+
+        area, high_risk = positions
+        return self.rows, self.take(area), self.take(high_risk)
+
+
+def _append_lookup(df, key_column, table):
+    """Append table's other columns to df, matched on key_column (left join, unique keys)."""
+    rows = pd.Index(table[key_column].to_numpy()).get_indexer(df[key_column].to_numpy())
+    missing = rows < 0
+    for column in table.columns.drop(key_column):
+        values = table[column].to_numpy()[np.where(missing, 0, rows)]
+        if missing.any():
+            values = pd.Series(values).where(~missing).to_numpy()
+        df[column] = values
+
+
+def build_snapshot(weather_df, time_index, pos, sites_df, metro_df=None):
+    """
+    Snapshot of the rows stamped time_index.times[pos]: site metadata (see
+    join_sites), metro county attributes where available (the first row of
+    a county listed twice), and the risk
+    emoji and text of each row's risk_code.
+    """
+    rows = join_sites(get_time_slice(weather_df, time_index, pos), sites_df)
+    if metro_df is not None:
+        # One row per county (the first), so a repeated county cannot break the lookup
+        _append_lookup(rows, 'county', metro_df.drop_duplicates('county', keep='first'))
+
+    risk_codes = rows['risk_code'].to_numpy()
+    rows['risk_emoji'] = risk_labels(risk_codes, 'emoji')
+    rows['risk_text'] = risk_labels(risk_codes, 'text')
+    return Snapshot(pd.Timestamp(time_index.times[pos], tz='UTC'), rows)
@@ -0,0 +1,213 @@
+"""
+Spatial index over monitoring sites.
+
+Sites are placed on the unit sphere (x, y, z) and indexed by a static k-d
+tree, so chord length orders points exactly as great-circle distance does.
+Nearest-k and radius queries visit only the leaves that can still hold an
+answer; area queries combine a radius query around the area with a
+point-in-polygon test of the candidates.
+"""
+
+import numpy as np
+
+from .boundaries import contains_points
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_xyz(latitude, longitude):
+    """(n, 3) unit-sphere coordinates of lat/lon degrees."""
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    """Great-circle distance (km) for a unit-sphere chord length (inf stays inf)."""
+    chord = np.asarray(chord, dtype=np.float64)
+    return np.where(np.isfinite(chord), 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0)), np.inf)
+
+
+def km_to_chord(km):
+    """Unit-sphere chord length for a great-circle distance (km)."""
+    return 2 * np.sin(np.minimum(np.asarray(km, dtype=np.float64) / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class KDTree:
+    """
+    Static k-d tree over an (n, d) point array.
+
+    Nodes live in flat arrays; leaf i covers points[order[start[i]:stop[i]]].
+    Internal nodes split on the widest dimension at the median.
+    """
+
+    def __init__(self, points, leaf_size=8):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(self.points))
+        self._start, self._stop, self._dim, self._split, self._left, self._right = [], [], [], [], [], []
+        if len(self.points):
+            self._build(0, len(self.points))
+        self._sorted = self.points[self.order]
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, start, stop):
+        node = len(self._start)
+        self._start.append(start)
+        self._stop.append(stop)
+        self._dim.append(-1)
+        self._split.append(0.0)
+        self._left.append(-1)
+        self._right.append(-1)
+        if stop - start <= self.leaf_size:
+            return node
+
+        idx = self.order[start:stop]
+        values = self.points[idx]
+        dim = int(np.argmax(values.max(axis=0) - values.min(axis=0)))
+        mid = (stop - start) // 2
+        part = np.argpartition(values[:, dim], mid)
+        self.order[start:stop] = idx[part]
+        self._dim[node] = dim
+        self._split[node] = float(self.points[self.order[start + mid], dim])
+        self._left[node] = self._build(start, start + mid)
+        self._right[node] = self._build(start + mid, stop)
+        return node
+
+    def query(self, point, k=1):
+        """Distances and indices of the k points nearest to point, nearest first."""
+        point = np.asarray(point, dtype=np.float64)
+        k = min(k, len(self))
+        best_d = np.full(k, np.inf)
+        best_i = np.full(k, -1, dtype=np.int64)
+        if k == 0:
+            return best_d, best_i
+
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound > best_d[-1]:
+                continue
+            dim = self._dim[node]
+            if dim < 0:
+                start, stop = self._start[node], self._stop[node]
+                d = ((self._sorted[start:stop] - point) ** 2).sum(axis=1)
+                all_d = np.concatenate([best_d, d])
+                all_i = np.concatenate([best_i, self.order[start:stop]])
+                keep = np.argsort(all_d, kind='stable')[:k]
+                best_d, best_i = all_d[keep], all_i[keep]
+                continue
+            diff = point[dim] - self._split[node]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            stack.append((far, max(bound, diff * diff)))
+            stack.append((near, bound))
+        return np.sqrt(best_d), best_i
+
+    def query_radius(self, point, radius):
+        """Distances and indices of the points within radius of point, nearest first."""
+        point = np.asarray(point, dtype=np.float64)
+        r2 = radius * radius
+        found_d, found_i = [], []
+        stack = [0] if len(self) else []
+        while stack:
+            node = stack.pop()
+            dim = self._dim[node]
+            if dim < 0:
+                start, stop = self._start[node], self._stop[node]
+                d = ((self._sorted[start:stop] - point) ** 2).sum(axis=1)
+                hit = d <= r2
+                found_d.append(d[hit])
+                found_i.append(self.order[start:stop][hit])
+                continue
+            diff = point[dim] - self._split[node]
+            stack.append(self._left[node] if diff < 0 else self._right[node])
+            if diff * diff <= r2:
+                stack.append(self._right[node] if diff < 0 else self._left[node])
+
+        if not found_d:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        d = np.concatenate(found_d)
+        i = np.concatenate(found_i)
+        order = np.argsort(d, kind='stable')
+        return np.sqrt(d[order]), i[order]
+
+
+class SiteIndex:
+    """
+    Nearest-site, radius and area queries over site coordinates.
+
+    ids, latitude and longitude are equal-length sequences; sites without
+    coordinates are not indexed. Distances are great-circle kilometres and
+    results are ids from `ids`.
+    """
+
+    def __init__(self, ids, latitude, longitude, leaf_size=8):
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        located = np.isfinite(latitude) & np.isfinite(longitude)
+        self.ids = np.asarray(ids)[located]
+        self.latitude = latitude[located]
+        self.longitude = longitude[located]
+        self.tree = KDTree(unit_xyz(self.latitude, self.longitude), leaf_size=leaf_size)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def nearest(self, latitude, longitude, k=1):
+        """Ids and distances (km) of the k sites nearest to a point, nearest first."""
+        chord, idx = self.tree.query(unit_xyz([latitude], [longitude])[0], k)
+        return self.ids[idx], chord_to_km(chord)
+
+    def nearest_many(self, latitude, longitude, k=1):
+        """
+        Batch nearest-k: (m, k) arrays of ids and distances for m points.
+        Rows are padded with distance inf (and the first id) when k exceeds
+        the number of sites.
+        """
+        points = unit_xyz(latitude, longitude)
+        kk = min(k, len(self))
+        idx = np.zeros((len(points), k), dtype=np.int64)
+        chord = np.full((len(points), k), np.inf)
+        for row, point in enumerate(points):
+            chord[row, :kk], idx[row, :kk] = self.tree.query(point, kk)
+        if len(self) == 0:
+            return np.zeros((len(points), k), dtype=self.ids.dtype), chord
+        return self.ids[idx], chord_to_km(chord)
+
+    def within(self, latitude, longitude, radius_km):
+        """Ids and distances (km) of the sites within radius_km of a point, nearest first."""
+        chord, idx = self.tree.query_radius(unit_xyz([latitude], [longitude])[0], float(km_to_chord(radius_km)))
+        return self.ids[idx], chord_to_km(chord)
+
+    def within_many(self, latitude, longitude, radius_km):
+        """Batch radius query: one (ids, distances) pair per point."""
+        radius = float(km_to_chord(radius_km))
+        results = []
+        for point in unit_xyz(latitude, longitude):
+            chord, idx = self.tree.query_radius(point, radius)
+            results.append((self.ids[idx], chord_to_km(chord)))
+        return results
+
+    def in_area(self, boundaries, area_id):
+        """
+        Ids of the sites inside one area of a Boundaries set.
+
+        Candidates come from a radius query around the area's mean vertex
+        that reaches every vertex; only those are tested against the polygons.
+        """
+        polygons = boundaries.table['geometry'].loc[str(area_id)]
+        vertices = np.concatenate([np.asarray(polygon[0]) for polygon in polygons])
+        xyz = unit_xyz(vertices[:, 1], vertices[:, 0])
+        center = xyz.mean(axis=0)
+        center /= np.linalg.norm(center)
+        reach = np.sqrt(((xyz - center) ** 2).sum(axis=1)).max()
+        _, idx = self.tree.query_radius(center, float(reach))
+        inside = contains_points(polygons, self.latitude[idx], self.longitude[idx])
+        return self.ids[idx[inside]]
+
+    def areas(self, boundaries):
+        """Area id containing each indexed site (None outside every area)."""
+        return boundaries.locate(self.latitude, self.longitude)
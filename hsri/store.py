@@ -0,0 +1,160 @@
+"""
+Memory-mapped on-disk column store.
+
+A store is a directory holding one .npy file per column plus a manifest.
+Opening it memory-maps every column read-only, so all Streamlit sessions
+and server processes on a machine share one page-cache copy of the data
+instead of each holding a private DataFrame.
+
+Stores are versioned: <root>/<version>/ is written once (to a temporary
+directory, then renamed into place) and never modified, so readers in other
+processes are never exposed to a half-written store.
+"""
+
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+STORE_FORMAT = 1
+MANIFEST_NAME = 'manifest.json'
+
+
+def store_path(root, version):
+    """Directory of one store version."""
+    return os.path.join(root, str(version))
+
+
+def write_frame_store(df, root, version, arrays=None):
+    """
+    Write df (plus optional extra named ndarrays) as store `version`.
+
+    Numeric and boolean columns are saved as-is, tz-aware datetimes as int64
+    UTC nanoseconds and categoricals as integer codes with their categories
+    in the manifest. Other column types are not supported. Returns the
+    store directory; if another process already wrote the same version,
+    that copy is kept.
+    """
+    final_path = store_path(root, version)
+    if os.path.exists(os.path.join(final_path, MANIFEST_NAME)):
+        return final_path
+
+    os.makedirs(root, exist_ok=True)
+    tmp_path = f'{final_path}.tmp-{uuid.uuid4().hex}'
+    os.makedirs(tmp_path)
+
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            col = df[name]
+            filename = f'col{i}.npy'
+            entry = {'name': name, 'file': filename}
+
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                entry['kind'] = 'category'
+                entry['categories'] = col.cat.categories.tolist()
+                values = col.cat.codes.to_numpy()
+            elif isinstance(col.dtype, pd.DatetimeTZDtype):
+                entry['kind'] = 'datetime'
+                values = col.dt.tz_convert('UTC').dt.as_unit('ns').array.asi8
+            elif pd.api.types.is_numeric_dtype(col.dtype) or pd.api.types.is_bool_dtype(col.dtype):
+                entry['kind'] = 'array'
+                values = col.to_numpy()
+            else:
+                raise TypeError(f"Column '{name}' has unsupported dtype {col.dtype}")
+
+            np.save(os.path.join(tmp_path, filename), np.ascontiguousarray(values))
+            columns.append(entry)
+
+        extra = {}
+        for name, values in (arrays or {}).items():
+            filename = f'array_{name}.npy'
+            np.save(os.path.join(tmp_path, filename), np.ascontiguousarray(values))
+            extra[name] = filename
+
+        manifest = {
+            'format': STORE_FORMAT,
+            'version': str(version),
+            'n_rows': len(df),
+            'columns': columns,
+            'arrays': extra,
+        }
+        with open(os.path.join(tmp_path, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f)
+
+        try:
+            os.rename(tmp_path, final_path)
+        except OSError:
+            # Another process won the race; its copy is identical
+            shutil.rmtree(tmp_path, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    return final_path
+
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if manifest.get('format') != STORE_FORMAT:
+        return None
+    return manifest
+
+
+def open_frame_store(root, version, columns=None):
+    """
+    Open store `version` as a DataFrame backed by read-only memory maps.
+
+    Returns None if the store does not exist. Numeric and categorical columns
+    are zero-copy views of the mapped files; the datetime column is rebuilt
+    as a tz-aware array (one int64 copy). `columns` optionally projects the
+    read, skipping the unused files entirely.
+    """
+    path = store_path(root, version)
+    manifest = _read_manifest(path)
+    if manifest is None:
+        return None
+
+    data = {}
+    for entry in manifest['columns']:
+        name = entry['name']
+        if columns is not None and name not in columns:
+            continue
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+
+        if entry['kind'] == 'category':
+            data[name] = pd.Categorical.from_codes(values, categories=entry['categories'])
+        elif entry['kind'] == 'datetime':
+            data[name] = pd.Series(values.view('M8[ns]'), copy=False).dt.tz_localize('UTC')
+        else:
+            data[name] = values
+
+    df = pd.DataFrame(data, copy=False)
+    df.attrs['data_version'] = manifest['version']
+    return df
+
+
+def open_store_array(root, version, name):
+    """Memory-map an extra array saved alongside the frame, or None."""
+    path = store_path(root, version)
+    manifest = _read_manifest(path)
+    if manifest is None or name not in manifest.get('arrays', {}):
+        return None
+    return np.load(os.path.join(path, manifest['arrays'][name]), mmap_mode='r')
+
+
+def prune_stores(root, keep_version):
+    """Delete every store version under root except keep_version."""
+    if not os.path.isdir(root):
+        return
+    for entry in os.listdir(root):
+        # Leave other processes' in-progress writes alone
+        if entry != str(keep_version) and '.tmp-' not in entry:
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
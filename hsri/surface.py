@@ -0,0 +1,103 @@
+"""
+Gridded HSRI surface by inverse-distance weighting.
+
+The weight of every site at every cell of a regular lat/lon grid over the
+metro counties is computed once. Interpolating an hour (or a forecast
+day) is then a matrix-vector product, and a whole range of hours one
+matrix-matrix product. Sites that did not report drop out of a cell's
+weighted mean instead of pulling it to zero.
+"""
+
+import numpy as np
+
+from .boundaries import contains_points
+from .spatial import chord_to_km, unit_xyz
+
+# Grid spacing in degrees (~2 km) and the inverse-distance power
+GRID_CELL_DEG = 0.02
+IDW_POWER = 2.0
+
+# Distance floor (km) so a cell on top of a site stays finite
+MIN_DISTANCE_KM = 0.05
+
+
+def grid_axes(bounds, cell_deg=GRID_CELL_DEG):
+    """Cell-centre latitudes (north to south) and longitudes (west to east) over bounds."""
+    (south, west), (north, east) = bounds
+    return np.arange(north - cell_deg / 2, south, -cell_deg), np.arange(west + cell_deg / 2, east, cell_deg)
+
+
+class HsriSurface:
+    """
+    Inverse-distance weights from sites to grid cells.
+
+    Cell (i, j) is centred at (latitudes[i], longitudes[j]) from grid_axes,
+    north row first, so grids are image-ordered. Cells outside `mask` (if
+    given) are always NaN and cost nothing. Site values are passed in the
+    order of the latitude/longitude arrays given here; sites without
+    coordinates get no weight.
+    """
+
+    def __init__(self, latitude, longitude, bounds, cell_deg=GRID_CELL_DEG, power=IDW_POWER, mask=None):
+        (south, west), (north, east) = bounds
+        self.bounds = ((float(south), float(west)), (float(north), float(east)))
+        self.cell_deg = cell_deg
+        self.latitudes, self.longitudes = grid_axes(self.bounds, cell_deg)
+        self.shape = (len(self.latitudes), len(self.longitudes))
+        self.mask = np.ones(self.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool).reshape(self.shape)
+        self._cells = np.flatnonzero(self.mask.ravel())
+
+        cell_lat, cell_lon = np.meshgrid(self.latitudes, self.longitudes, indexing='ij')
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        located = np.isfinite(latitude) & np.isfinite(longitude)
+        cells = unit_xyz(cell_lat.ravel()[self._cells], cell_lon.ravel()[self._cells])
+        sites = unit_xyz(latitude[located], longitude[located])
+        chord = np.sqrt(((cells[:, None, :] - sites[None, :, :]) ** 2).sum(axis=2))
+        distance = np.maximum(chord_to_km(chord), MIN_DISTANCE_KM)
+
+        self.weights = np.zeros((len(self._cells), len(latitude)), dtype=np.float32)
+        self.weights[:, located] = distance ** -power
+
+    @property
+    def image_bounds(self):
+        """((south, west), (north, east)) edges of the grid cells."""
+        (_, west), (north, _) = self.bounds
+        return (north - self.shape[0] * self.cell_deg, west), (north, west + self.shape[1] * self.cell_deg)
+
+    @property
+    def nbytes(self):
+        return self.weights.nbytes
+
+    def interpolate(self, values):
+        """(rows, cols) grid for one value per site (NaN = no report)."""
+        return self.interpolate_many(np.asarray(values)[:, None])[0]
+
+    def interpolate_many(self, values):
+        """(frames, rows, cols) grids for a (site, frame) value array."""
+        values = np.asarray(values, dtype=np.float32)
+        reported = np.isfinite(values)
+        numerator = self.weights @ np.where(reported, values, 0)
+        denominator = self.weights @ reported.astype(np.float32)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cells = numerator / denominator
+
+        grids = np.full((values.shape[1], self.shape[0] * self.shape[1]), np.nan, dtype=np.float32)
+        grids[:, self._cells] = cells.T
+        return grids.reshape(values.shape[1], *self.shape)
+
+
+def metro_surface(latitude, longitude, counties, cell_deg=GRID_CELL_DEG, power=IDW_POWER):
+    """HsriSurface over the bounding box of a Boundaries set, masked to its areas."""
+    vertices = np.concatenate([
+        np.asarray(polygon[0]) for geometry in counties.table['geometry'] for polygon in geometry
+    ])
+    (west, south), (east, north) = vertices.min(axis=0), vertices.max(axis=0)
+    bounds = ((south, west), (north, east))
+
+    latitudes, longitudes = grid_axes(bounds, cell_deg)
+    cell_lat, cell_lon = np.meshgrid(latitudes, longitudes, indexing='ij')
+    mask = np.zeros(cell_lat.size, dtype=bool)
+    for geometry in counties.table['geometry']:
+        mask |= contains_points(geometry, cell_lat.ravel(), cell_lon.ravel())
+    return HsriSurface(latitude, longitude, bounds, cell_deg, power, mask=mask)
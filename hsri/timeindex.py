@@ -0,0 +1,91 @@
+"""
+Time index over the time-sorted weather frame.
+
+Every distinct timestamp occupies one contiguous row range of the frame, so
+a snapshot lookup is a binary search plus a positional slice instead of a
+boolean filter over the whole history. Whole UTC days are contiguous too,
+so the day index maps each date to its row range in the same way.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400 * 10**9
+
+
+class TimeIndex(NamedTuple):
+    """Sorted unique timestamps (int64 ns, UTC) and their row ranges."""
+    times: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+
+
+class DayIndex(NamedTuple):
+    """UTC dates with data, their row ranges, and each date's position."""
+    days: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+    positions: dict
+
+
+def build_time_index(df):
+    """
+    Build a TimeIndex over a frame already sorted by datetime.
+
+    Row range i is df.iloc[starts[i]:stops[i]], every row stamped times[i].
+    """
+    values = df['datetime'].dt.tz_convert('UTC').dt.as_unit('ns').array.asi8
+    if len(values) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return TimeIndex(empty, empty, empty)
+
+    starts = np.flatnonzero(values[1:] != values[:-1]) + 1
+    starts = np.concatenate(([0], starts))
+    stops = np.append(starts[1:], len(values))
+    return TimeIndex(values[starts], starts, stops)
+
+
+def find_closest_time(time_index, ts):
+    """Position of the indexed timestamp nearest to ts (earlier wins ties)."""
+    target = pd.Timestamp(ts)
+    if target.tz is None:
+        target = target.tz_localize('UTC')
+    target = target.as_unit('ns').value
+
+    times = time_index.times
+    pos = int(np.searchsorted(times, target))
+    if pos == len(times):
+        return pos - 1
+    if pos > 0 and target - times[pos - 1] <= times[pos] - target:
+        return pos - 1
+    return pos
+
+
+def get_time_slice(df, time_index, pos):
+    """Rows of df stamped with time_index.times[pos], as a positional slice."""
+    return df.iloc[time_index.starts[pos]:time_index.stops[pos]]
+
+
+def build_day_index(time_index):
+    """
+    Build a DayIndex from a TimeIndex: row range i covers every row on
+    UTC date days[i] (datetime64[D]).
+    """
+    day_of = time_index.times // NS_PER_DAY
+    firsts = np.flatnonzero(np.diff(day_of, prepend=day_of[:1] - 1))
+    lasts = np.append(firsts[1:], len(day_of))[:len(firsts)] - 1
+    days = day_of[firsts].astype('datetime64[D]')
+    positions = {day.item(): i for i, day in enumerate(days)}
+    return DayIndex(days, time_index.starts[firsts], time_index.stops[lasts], positions)
+
+
+def find_day(day_index, date):
+    """Position of a date (datetime.date or anything Timestamp accepts, UTC) in the index, or None."""
+    return day_index.positions.get(pd.Timestamp(date).date())
+
+
+def get_day_slice(df, day_index, pos):
+    """Rows of df on UTC date day_index.days[pos], as a positional slice."""
+    return df.iloc[day_index.starts[pos]:day_index.stops[pos]]
@@ -0,0 +1,86 @@
+"""
+Cache warm-up.
+
+Does ahead of time what the first visitor after a deploy or restart would
+otherwise pay for: building the memory-mapped weather store from the CSV
+(parsing and HSRI), the forecast table for the latest issue hour, and the
+snapshot models of the latest hours in the persisted model registry. The
+dashboard warms its in-process caches (snapshots, forecasts, map HTML) for
+the same hours in a background thread when the process starts.
+
+Usage:
+    python -m hsri.warmup                # latest 24 hours
+    python -m hsri.warmup --hours 72
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from .forecast import snapshot_forecast
+from .forecast_job import FORECAST_TABLE, run_forecast_job
+from .ingest import WEATHER_CACHE_DIR, WEATHER_CSV, load_weather_store
+from .models import ModelRegistry
+from .timeindex import build_time_index, get_time_slice
+
+# Hours before the latest timestamp that are warmed
+WARM_HOURS = 24
+
+MODEL_REGISTRY = os.path.join(WEATHER_CACHE_DIR, 'models.json')
+MODEL_REGISTRY_ENTRIES = 4096
+
+
+def warm_positions(time_index, hours=WARM_HOURS, default_pos=0):
+    """
+    Time index positions to warm: the dashboard's default view (the first
+    timestamp) followed by the latest `hours` timestamps, newest first.
+    """
+    n = len(time_index.times)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    latest = np.arange(n - 1, max(n - hours, 0) - 1, -1)
+    return np.concatenate(([default_pos], latest[latest != default_pos]))
+
+
+def warm_up(hours=WARM_HOURS, filepath=WEATHER_CSV, cache_dir=WEATHER_CACHE_DIR,
+            registry_path=MODEL_REGISTRY, forecast_table=FORECAST_TABLE):
+    """
+    Build the weather store, the latest-hour forecast table (unless
+    forecast_table is None) and the snapshot models of the warmed hours.
+    Returns the number of snapshot models warmed.
+    """
+    weather_df = load_weather_store(filepath, cache_dir)
+    data_version = weather_df.attrs.get('data_version')
+    if forecast_table is not None:
+        run_forecast_job(workers=1, output=forecast_table, filepath=filepath, cache_dir=cache_dir)
+
+    registry = ModelRegistry(max_entries=MODEL_REGISTRY_ENTRIES, path=registry_path)
+    time_index = build_time_index(weather_df)
+    positions = warm_positions(time_index, hours)
+    for pos in positions:
+        snapshot_forecast(get_time_slice(weather_df, time_index, pos), time_index.times[pos], registry, data_version)
+    registry.save()
+    return len(positions)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm the dashboard's on-disk caches before the first visitor.")
+    parser.add_argument('--hours', type=int, default=WARM_HOURS, help=f"latest hours to warm (default {WARM_HOURS})")
+    parser.add_argument('--weather-csv', default=WEATHER_CSV, help="weather CSV path")
+    parser.add_argument('--no-forecast-table', action='store_true', help="skip the latest-hour forecast table")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    n_hours = warm_up(
+        hours=args.hours,
+        filepath=args.weather_csv,
+        forecast_table=None if args.no_forecast_table else FORECAST_TABLE,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"Warmed the weather store and {n_hours} snapshot hours in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hsri.backtest import backtest_sites, score_forecasts
+from hsri.cube import CUBE_VARIABLES, WeatherCube
+
+N_HOURS = 200
+STEP_HOUR = 150
+OFFSET = 5.0
+
+
+@pytest.fixture
+def cube():
+    """Two sites with steady weather; HSRI is a linear function of it, raised by OFFSET from STEP_HOUR on."""
+    data = np.full((2, N_HOURS, len(CUBE_VARIABLES)), np.nan, dtype=np.float32)
+    weather = {'temp': (85.0, 70.0), 'humidity': (60.0, 40.0), 'windspeed': (5.0, 2.0),
+               'solarradiation': (300.0, 100.0), 'uvindex': (6.0, 2.0), 'cloudcover': (20.0, 50.0)}
+    for k, name in enumerate(CUBE_VARIABLES):
+        if name in weather:
+            data[:, :, k] = np.array(weather[name])[:, None]
+    hsri = 0.8 * data[:, :, 0] - 0.1 * data[:, :, 1] + 2.0
+    hsri[:, STEP_HOUR:] += OFFSET
+    data[:, :, CUBE_VARIABLES.index('hsri')] = hsri
+    return WeatherCube(data, np.array([11, 22]), pd.Timestamp('2024-07-01', tz='UTC').value, CUBE_VARIABLES)
+
+
+def test_linear_series_scores_zero_error(cube):
+    hours = [60, 70, STEP_HOUR - 73]
+    scores, timings = backtest_sites(cube, [0, 1], hours)
+
+    assert len(scores) == len(hours) * 2 * 3
+    np.testing.assert_allclose(scores['forecast'], scores['actual'], atol=1e-4)
+    summary = score_forecasts(scores)
+    assert summary['horizon_days'].tolist() == [1, 2, 3]
+    assert summary['n'].tolist() == [6, 6, 6]
+    np.testing.assert_allclose(summary[['rmse', 'mae', 'bias']].to_numpy(), 0, atol=1e-4)
+    assert timings['site_forecasts'] == 6 and timings['fitted'] == 6
+
+
+def test_known_offset_gives_expected_mae(cube):
+    # Trained entirely before the step, every target after it
+    hours = np.arange(STEP_HOUR - 24, STEP_HOUR)
+    scores, _ = backtest_sites(cube, [0, 1], hours)
+    summary = score_forecasts(scores).set_index('horizon_days')
+
+    np.testing.assert_allclose(summary['mae'], OFFSET, rtol=1e-5)
+    np.testing.assert_allclose(summary['rmse'], OFFSET, rtol=1e-5)
+    np.testing.assert_allclose(summary['bias'], -OFFSET, rtol=1e-5)
+
+
+def test_targets_past_the_data_and_unfitted_sites_are_not_scored(cube):
+    scores, timings = backtest_sites(cube, [0, 1], [N_HOURS - 30, 5])
+    # Only day 1 of the late issue hour lands inside the data; hour 5 has too few rows to fit
+    assert scores['horizon_days'].tolist() == [1, 1]
+    assert timings['fitted'] == 2
+    with pytest.raises(ValueError):
+        backtest_sites(cube, [0], [60], engine='nope')
+
+
+def test_score_forecasts_per_horizon():
+    scores = pd.DataFrame({
+        'horizon_days': [1, 1, 1, 2, 2],
+        'forecast': [10.0, 20.0, 30.0, 5.0, 5.0],
+        'actual': [12.0, 18.0, 30.0, 1.0, 5.0],
+    })
+    summary = score_forecasts(scores).set_index('horizon_days')
+    assert summary.loc[1, 'n'] == 3
+    assert summary.loc[1, 'mae'] == pytest.approx(4 / 3)
+    assert summary.loc[1, 'rmse'] == pytest.approx(np.sqrt(8 / 3))
+    assert summary.loc[1, 'bias'] == pytest.approx(0.0)
+    assert summary.loc[1, 'r2'] == pytest.approx(1 - 8 / ((12 - 20) ** 2 + (18 - 20) ** 2 + (30 - 20) ** 2))
+    assert summary.loc[2, 'mae'] == pytest.approx(2.0)
+    assert summary.loc[2, 'bias'] == pytest.approx(2.0)
+    assert summary.loc[2, 'r2'] == pytest.approx(1 - 16 / 8)
@@ -0,0 +1,47 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from hsri.boundaries import Boundaries, level_at
+
+LEVELS = ((0, 0.01), (10, 0.001), (12, 0.0))
+
+
+def _boundaries():
+    angle = np.linspace(0, 2 * np.pi, 200)
+    ring = np.column_stack([-74 + 0.1 * np.cos(angle), 40.7 + 0.1 * np.sin(angle)])
+    table = pd.DataFrame({'name': ['Kings County'], 'geometry': [[[ring]]]}, index=pd.Index(['36047'], name='id'))
+    return Boundaries(table)
+
+
+def test_level_at():
+    assert [level_at(LEVELS, zoom) for zoom in (0, 9, 10, 11.5, 12, 18)] == [0, 0, 1, 1, 2, 2]
+
+
+def test_detail_levels_inline_start_and_write_the_rest(tmp_path):
+    counties = _boundaries()
+    directory = tmp_path / 'geo'
+    levels = counties.detail_levels(LEVELS, inline_zoom=9, directory=str(directory), url_prefix='app/static/geo/')
+
+    assert [min_zoom for min_zoom, _ in levels] == [0, 10, 12]
+    assert levels[0][1] is counties.feature_collection(0.01)
+    for (_, url), tolerance in zip(levels[1:], (0.001, 0.0)):
+        assert url.startswith('app/static/geo/')
+        with open(directory / url.rsplit('/', 1)[1]) as f:
+            assert json.load(f) == counties.feature_collection(tolerance)
+    assert len(os.listdir(directory)) == 2
+
+    # Same content, same files
+    assert counties.detail_levels(LEVELS, inline_zoom=9, directory=str(directory), url_prefix='app/static/geo/') == levels
+    assert len(os.listdir(directory)) == 2
+
+
+def test_detail_levels_inline_when_not_writable(tmp_path):
+    counties = _boundaries()
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    levels = counties.detail_levels(LEVELS, inline_zoom=12, directory=str(blocker / 'geo'))
+    assert all(isinstance(collection, dict) for _, collection in levels)
+    assert counties.detail_levels(LEVELS) == levels
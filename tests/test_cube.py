@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from hsri.cube import WeatherCube
+
+
+def test_from_frame_keeps_last_row_per_site_hour():
+    df = pd.DataFrame({
+        'aqs_id_full': [2, 1, 2, 1, 2],
+        'datetime': pd.to_datetime([
+            '2024-07-01 00:10', '2024-07-01 00:00', '2024-07-01 00:50', '2024-07-01 02:00', '2024-07-01 00:30',
+        ]),
+        'temp': [80.0, 70.0, 81.0, 72.0, 82.0],
+    })
+
+    cube = WeatherCube.from_frame(df, variables=('temp', 'hsri'))
+
+    np.testing.assert_array_equal(cube.site_ids, [1, 2])
+    assert cube.data.shape == (2, 3, 2)
+    temp = cube.data[:, :, 0]
+    np.testing.assert_array_equal(temp[0], [70.0, np.nan, 72.0])
+    np.testing.assert_array_equal(temp[1], [82.0, np.nan, np.nan])
+    assert np.isnan(cube.data[:, :, 1]).all()
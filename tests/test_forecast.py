@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hsri.cube import WeatherCube
+from hsri.forecast import (
+    FEATURE_COLS, MEAN_FILL_COLS, TARGET_COL, fit_models, forecast_hsri, predict_models, stack_site_windows,
+)
+from hsri.forecast_job import MIN_ROWS, WINDOW
+
+
+def _site_rows(site, n_rows, rng, start='2024-07-01', every=1):
+    times = pd.date_range(start, periods=n_rows * every, freq='h', tz='UTC')[::every]
+    X = rng.normal([80, 60, 8, 400, 5, 40], [8, 15, 3, 200, 2, 25], (n_rows, len(FEATURE_COLS)))
+    coef = rng.normal(0, 0.5, len(FEATURE_COLS))
+    df = pd.DataFrame(X, columns=list(FEATURE_COLS))
+    df[TARGET_COL] = 3.0 + X @ coef + rng.normal(0, 0.3, n_rows)
+    df['aqs_id_full'] = site
+    df['datetime'] = times
+    return df
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(5)
+    full = _site_rows(1, 80, rng, every=2)                 # longer than WINDOW, with gap hours
+    short = _site_rows(2, 20, rng, start='2024-07-05')     # shorter than WINDOW: right-aligned
+    gaps = _site_rows(3, 40, rng)
+    gaps.loc[::3, 'uvindex'] = np.nan                      # mean-filled
+    gaps.loc[::4, 'solarradiation'] = np.nan
+    few = _site_rows(4, MIN_ROWS - 1, rng)                  # below min_rows
+    empty_col = _site_rows(5, 30, rng)
+    empty_col['cloudcover'] = np.nan                       # nothing to fill from
+    df = pd.concat([full, short, gaps, few, empty_col], ignore_index=True)
+    # The cube stores float32; compare on the values it holds
+    columns = list(FEATURE_COLS) + [TARGET_COL]
+    df[columns] = df[columns].astype(np.float32).astype(np.float64)
+    return df
+
+
+def _reference(site_df):
+    """forecast_hsri's training on one site's last WINDOW rows, solved with lstsq."""
+    rows = site_df.sort_values('datetime').tail(WINDOW)
+    if len(rows) < MIN_ROWS:
+        return None
+    X = rows[list(FEATURE_COLS)].copy()
+    for name in MEAN_FILL_COLS:
+        X[name] = X[name].fillna(X[name].mean())
+    X = X.to_numpy()
+    if np.isnan(X).any():
+        return None
+    design = np.column_stack([np.ones(len(X)), X])
+    solution = np.linalg.lstsq(design, rows[TARGET_COL].to_numpy(), rcond=None)[0]
+    return solution[0], solution[1:], X.mean(axis=0)
+
+
+def test_batch_fit_matches_lstsq_per_site(frame):
+    cube = WeatherCube.from_frame(frame)
+    windows = stack_site_windows(cube, np.arange(len(cube.site_ids)), window=WINDOW)
+    assert windows.mask.sum(axis=1).tolist() == [50, 20, 40, MIN_ROWS - 1, 30]
+    # Short windows are right-aligned: the leading rows are padding
+    assert not windows.mask[1, :30].any() and windows.mask[1, 30:].all()
+
+    models = fit_models(windows.X, windows.y, windows.mask, MIN_ROWS)
+    forecasts = predict_models(models)
+    for i, site in enumerate(cube.site_ids):
+        expected = _reference(frame[frame['aqs_id_full'] == site])
+        if expected is None:
+            assert models[i] is None and np.isnan(forecasts[i]).all()
+            continue
+        intercept, coef, x_mean = expected
+        np.testing.assert_allclose(models[i].coef, coef, rtol=1e-6, atol=1e-8)
+        np.testing.assert_allclose(models[i].intercept, intercept, rtol=1e-6)
+        np.testing.assert_allclose(models[i].x_mean, x_mean, rtol=1e-10)
+        scale = 1 + 0.02 * np.arange(1, 4)
+        np.testing.assert_allclose(forecasts[i], np.clip(intercept + (x_mean @ coef) * scale, -100, 100), rtol=1e-6)
+
+    assert [model is None for model in models] == [False, False, False, True, True]
+
+
+def test_forecast_hsri_matches_batch(frame):
+    site_df = frame[frame['aqs_id_full'] == 3].reset_index(drop=True)
+    cube = WeatherCube.from_frame(site_df)
+    windows = stack_site_windows(cube, [0], window=WINDOW)
+    np.testing.assert_allclose(forecast_hsri(site_df), predict_models(fit_models(windows.X, windows.y, windows.mask))[0])
+
+    assert forecast_hsri(site_df.head(9)) is None
+    assert forecast_hsri(frame[frame['aqs_id_full'] == 5]) is None
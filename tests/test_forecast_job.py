@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hsri.cube import WeatherCube
+from hsri.forecast import FEATURE_COLS, TARGET_COL
+from hsri.forecast_job import MIN_ROWS, forecast_issue_hours, lookup_forecasts, read_forecast_table, write_forecast_table
+
+
+@pytest.fixture
+def cube():
+    rng = np.random.default_rng(2)
+    parts = []
+    for site, n_hours, start in ((101, 90, 0), (102, 90, 0), (103, 8, 70)):
+        hours = np.arange(start, start + n_hours)
+        df = pd.DataFrame(rng.normal([80, 60, 8, 400, 5, 40], [8, 15, 3, 200, 2, 25], (n_hours, 6)),
+                          columns=list(FEATURE_COLS))
+        df[TARGET_COL] = df['temp'] * 0.9 + rng.normal(0, 1, n_hours)
+        df['aqs_id_full'] = site
+        df['datetime'] = pd.Timestamp('2024-07-01', tz='UTC') + pd.to_timedelta(hours, unit='h')
+        parts.append(df)
+    return WeatherCube.from_frame(pd.concat(parts, ignore_index=True))
+
+
+def _issue(cube, hours, data_version, min_rows=5):
+    forecasts = forecast_issue_hours(cube, hours, min_rows=min_rows)
+    forecasts['data_version'] = pd.Categorical([data_version] * len(forecasts))
+    return forecasts
+
+
+def test_table_merge_replaces_issue_times_and_versions(tmp_path, cube):
+    path = str(tmp_path / 'forecasts.parquet')
+    write_forecast_table(_issue(cube, [60, 80], 'v1'), 'v1', path)
+    write_forecast_table(_issue(cube, [80, 85], 'v1'), 'v1', path)
+
+    table = read_forecast_table(path)
+    assert not table.duplicated(['issue_time', 'aqs_id_full', 'horizon_days']).any()
+    assert sorted(table['issue_time'].unique()) == [cube.timestamp(h) for h in (60, 80, 85)]
+    assert table['issue_time'].is_monotonic_increasing
+
+    write_forecast_table(_issue(cube, [85], 'v2'), 'v2', path)
+    table = read_forecast_table(path)
+    assert set(table['data_version']) == {'v2'}
+    assert list(table['issue_time'].unique()) == [cube.timestamp(85)]
+
+
+def test_lookup_matches_direct_forecast(tmp_path, cube):
+    path = str(tmp_path / 'forecasts.parquet')
+    write_forecast_table(_issue(cube, [60, 80, 85], 'v1'), 'v1', path)
+    table = read_forecast_table(path)
+    site_ids = cube.site_ids.tolist()
+
+    for h in (60, 80, 85):
+        direct = forecast_issue_hours(cube, [h])
+        expected = {
+            aqs_id: rows.sort_values('horizon_days')['hsri_forecast'].astype(float).tolist()
+            for aqs_id, rows in direct.groupby('aqs_id_full')
+        }
+        assert lookup_forecasts(table, cube.timestamp(h), site_ids, 'v1') == expected
+
+    # Site 103 has fewer than MIN_ROWS observations at hour 75: in the table, filtered on lookup
+    write_forecast_table(_issue(cube, [75], 'v1'), 'v1', path)
+    table = read_forecast_table(path)
+    rows = table[(table['issue_time'] == cube.timestamp(75)) & (table['aqs_id_full'] == 103)]
+    assert len(rows) and (rows['n_obs'] < MIN_ROWS).all()
+    assert 103 not in lookup_forecasts(table, cube.timestamp(75), site_ids, 'v1')
+    assert 103 in lookup_forecasts(table, cube.timestamp(75), site_ids, 'v1', min_rows=5)
+
+    # Only the asked sites, version and exact issue time
+    assert set(lookup_forecasts(table, cube.timestamp(80), [102], 'v1')) == {102}
+    assert lookup_forecasts(table, cube.timestamp(80), site_ids, 'v0') == {}
+    assert lookup_forecasts(table, cube.timestamp(0), site_ids, 'v1') == {}
+    assert lookup_forecasts(table, cube.timestamp(70), site_ids, 'v1') == {}
+    assert lookup_forecasts(table, cube.timestamp(89) + pd.Timedelta(hours=5), site_ids, 'v1') == {}
+    assert lookup_forecasts(None, cube.timestamp(80), site_ids, 'v1') == {}
@@ -0,0 +1,82 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hsri.formula import (
+    RISK_LEVELS, RISK_THRESHOLDS, compute_hi_nws, compute_hi_nws_batch, compute_hsri, compute_hsri_batch,
+    compute_hsri_frame, compute_risk_code, get_risk_category,
+)
+
+# Below 80°F (pass-through), around 80, and the regions where the full NWS
+# procedure would adjust Rothfusz (RH < 13% at 80-112°F, RH > 85% at 80-87°F)
+TEMPS = [-10.0, 32.0, 79.9, 80.0, 80.1, 84.0, 87.0, 95.0, 112.0, 120.0, np.nan]
+HUMIDITIES = [0.0, 5.0, 12.9, 13.0, 50.0, 85.0, 86.0, 100.0, np.nan]
+
+
+def _assert_same(batch, scalar):
+    np.testing.assert_allclose(batch, np.array(scalar, dtype=np.float64), rtol=1e-12, atol=1e-9, equal_nan=True)
+
+
+def _baseline_risk(hsri):
+    """The dashboard's original if-chain (NaN falls through to FREEZING)."""
+    if hsri >= 85:
+        return "🔴 CRITICAL", "Critical Heat"
+    elif hsri >= 75:
+        return "🟠 HIGH", "High Heat"
+    elif hsri >= 65:
+        return "🟡 MODERATE", "Moderate Heat"
+    elif hsri >= 50:
+        return "🟢 LOW", "Mild"
+    elif hsri >= 30:
+        return "🔵 COOL", "Cool"
+    else:
+        return "🟣 FREEZING", "Freezing"
+
+
+def test_hi_batch_matches_scalar():
+    T, RH = (np.array(v) for v in zip(*itertools.product(TEMPS, HUMIDITIES)))
+    _assert_same(compute_hi_nws_batch(T, RH), [compute_hi_nws(t, rh) for t, rh in zip(T, RH)])
+    np.testing.assert_array_equal(compute_hi_nws_batch([70.0, 79.9], [90.0, 10.0]), [70.0, 79.9])
+
+
+def test_hsri_batch_matches_scalar():
+    grid = list(itertools.product(
+        [60.0, 80.0, 86.0, 100.0, np.nan],
+        [10.0, 50.0, 90.0],
+        [0.0, 12.5, np.nan],
+        [-50.0, 0.0, 800.0, np.nan],
+        [0.0, 11.0, np.nan],
+        [0.0, 100.0, np.nan],
+    ))
+    columns = [np.array(column) for column in zip(*grid)]
+    _assert_same(compute_hsri_batch(*columns), [compute_hsri(*row) for row in grid])
+
+    # Clipped to [-100, 100]
+    assert compute_hsri_batch([200.0], [50.0], [0.0], [0.0], [0.0], [0.0])[0] == 100
+    assert compute_hsri_batch([-200.0], [50.0], [0.0], [0.0], [0.0], [0.0])[0] == -100
+
+
+def test_hsri_frame_defaults_missing_columns():
+    df = pd.DataFrame({'temp': [90.0, 70.0], 'humidity': [60.0, 40.0], 'windspeed': [3.0, 0.0]})
+    expected = [compute_hsri(t, rh, ws, 500, 5, 50) for t, rh, ws in zip(df['temp'], df['humidity'], df['windspeed'])]
+    _assert_same(compute_hsri_frame(df), expected)
+
+
+@pytest.mark.parametrize('shift', [-1e-9, 0.0, 1e-9])
+def test_risk_code_at_every_threshold(shift):
+    values = RISK_THRESHOLDS + shift
+    codes = compute_risk_code(values)
+    for value, code in zip(values, codes):
+        assert RISK_LEVELS[code][1:3] == _baseline_risk(value)
+        assert get_risk_category(value) == _baseline_risk(value)
+
+
+def test_risk_code_extremes_and_nan():
+    values = np.array([-np.inf, -100.0, 29.99, 30.0, 100.0, np.inf, np.nan])
+    codes = compute_risk_code(values)
+    assert codes.dtype == np.int8
+    assert codes.tolist() == [0, 0, 0, 1, 5, 5, 0]
+    assert [RISK_LEVELS[c][1:3] for c in codes] == [_baseline_risk(v) for v in values]
+    assert get_risk_category(np.nan) == _baseline_risk(np.nan)
@@ -0,0 +1,38 @@
+import json
+import os
+
+import pandas as pd
+
+from hsri.ingest import read_weather_csv
+
+CSV = """aqs_id_full,datetime,temp,humidity,windspeed,solarradiation,uvindex,cloudcover
+840360610135,2024-07-01 00:00:00,80.0,60.0,5.0,,,
+840360610135,2024-07-01 01:00:00,79.5,62.0,4.0,10.0,1.0,20.0
+"""
+
+
+def _read(tmp_path):
+    csv_path = tmp_path / 'weather.csv'
+    if not csv_path.exists():
+        csv_path.write_text(CSV)
+    return read_weather_csv(str(csv_path), cache_dir=str(tmp_path / 'cache'))
+
+
+def test_sidecar_written_and_reused(tmp_path):
+    first = _read(tmp_path)
+    cache = tmp_path / 'cache'
+    assert (cache / 'weather.parquet').exists()
+    meta = json.loads((cache / 'weather.meta.json').read_text())
+    assert meta['size'] == os.path.getsize(tmp_path / 'weather.csv')
+    assert not [name for name in os.listdir(cache) if '.tmp' in name]
+
+    pd.testing.assert_frame_equal(_read(tmp_path), first)
+
+
+def test_corrupt_sidecar_falls_back_to_csv_and_is_rewritten(tmp_path):
+    expected = _read(tmp_path)
+    parquet_path = tmp_path / 'cache' / 'weather.parquet'
+    parquet_path.write_bytes(b'not parquet')
+
+    pd.testing.assert_frame_equal(_read(tmp_path), expected)
+    assert len(pd.read_parquet(parquet_path)) == len(expected)
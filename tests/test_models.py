@@ -0,0 +1,28 @@
+import numpy as np
+
+from hsri.models import LinearModel, ModelRegistry, window_fingerprint
+
+
+def test_save_round_trip_and_skips_unchanged(tmp_path):
+    path = tmp_path / 'models.json'
+    registry = ModelRegistry(path=str(path))
+    key = window_fingerprint('v1', 840360610135, 1_000, 50, ('temp', 'humidity'))
+    registry.put(key, LinearModel(np.array([0.5, -0.25]), 1.5, np.array([80.0, 60.0])))
+    registry.put(window_fingerprint('v1', 840360610135, 2_000, 3, ('temp', 'humidity')), None)
+
+    registry.save()
+    assert path.exists()
+
+    # Nothing changed since: no rewrite
+    path.unlink()
+    registry.save()
+    assert not path.exists()
+
+    registry.put(key, registry.get(key))
+    registry.save()
+    loaded = ModelRegistry(path=str(path))
+    assert len(loaded) == 2
+    model = loaded.get(key)
+    np.testing.assert_array_equal(model.coef, [0.5, -0.25])
+    assert model.intercept == 1.5
+    np.testing.assert_array_equal(model.forecast(), registry.get(key).forecast())
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from hsri.online import OnlineForecaster
+
+FEATURES = ('a', 'b', 'c')
+
+
+def _series(n_obs, n_sites=4, seed=3):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(50.0, 10.0, (n_sites, n_obs, len(FEATURES)))
+    coef = rng.normal(0.0, 1.0, (n_sites, len(FEATURES)))
+    intercept = rng.normal(0.0, 5.0, n_sites)
+    y = intercept[:, None] + np.einsum('sof,sf->so', X, coef) + rng.normal(0.0, 0.5, (n_sites, n_obs))
+    return X, y
+
+
+def _batch_fit(X, y, weights):
+    """Weighted least squares with intercept (intercept first)."""
+    design = np.column_stack([np.ones(len(y)), X]) * np.sqrt(weights)[:, None]
+    return np.linalg.lstsq(design, y * np.sqrt(weights), rcond=None)[0]
+
+
+def _online(X, y, forgetting):
+    forecaster = OnlineForecaster(forgetting=forgetting, delta=1e8, features=FEATURES, fill_cols=())
+    site_ids = list(range(X.shape[0]))
+    for t in range(X.shape[1]):
+        forecaster.update(site_ids, X[:, t], y[:, t])
+    return forecaster
+
+
+@pytest.mark.parametrize('forgetting', [1.0, 0.98])
+def test_rls_converges_to_batch_fit(forgetting):
+    X, y = _series(400)
+    forecaster = _online(X, y, forgetting)
+    weights = forgetting ** np.arange(X.shape[1])[::-1]
+    for site in range(X.shape[0]):
+        expected = _batch_fit(X[site], y[site], weights)
+        np.testing.assert_allclose(forecaster.theta[site], expected, rtol=1e-4, atol=1e-4)
+    assert forecaster.n_obs.tolist() == [400] * X.shape[0]
+
+
+def test_forecast_uses_fitted_trend_and_min_obs():
+    X, y = _series(30, n_sites=2)
+    forecaster = _online(X, y, 1.0)
+
+    forecasts = forecaster.forecast([0, 1, 'unknown'], days_ahead=3, min_obs=10)
+    assert forecasts.shape == (3, 3)
+    assert np.isnan(forecasts[2]).all()
+    theta = forecaster.theta[0]
+    base = X[0].mean(axis=0) @ theta[1:]
+    expected = np.clip(theta[0] + base * (1 + 0.02 * np.arange(1, 4)), -100, 100)
+    np.testing.assert_allclose(forecasts[0], expected)
+
+    assert np.isnan(forecaster.forecast([0], min_obs=31)).all()
+
+
+def test_rows_with_missing_target_or_feature_are_skipped():
+    X, y = _series(20, n_sites=2)
+    forecaster = _online(X, y, 1.0)
+    before = forecaster.theta.copy()
+    X_bad = X[:, 0].copy()
+    X_bad[1, 0] = np.nan
+    forecaster.update([0, 1], X_bad, [np.nan, 1.0])
+    np.testing.assert_array_equal(forecaster.theta, before)
+    assert forecaster.n_obs.tolist() == [20, 20]
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hsri.cube import WeatherCube
+from hsri.playback import PLAYBACK_MAX_DAYS, playback_frames, playback_range
+
+START = pd.Timestamp('2024-06-01')
+
+
+@pytest.fixture
+def cube():
+    # 40 days, 3 sites; site s reports s * 1000 + hour position as HSRI
+    n_hours = 40 * 24
+    times = (START + pd.to_timedelta(np.arange(n_hours), unit='h')).as_unit('ns').asi8
+    hsri = np.arange(3)[:, None] * 1000.0 + np.arange(n_hours)[None, :]
+    hsri[:, 30] = np.nan  # nobody reported at hour 30
+    hsri[1, 31] = np.nan
+    data = np.stack([hsri, hsri], axis=2).astype(np.float32)
+    return WeatherCube.from_arrays(data, np.array([101, 102, 103]), times, variables=('temp', 'hsri'))
+
+
+def test_dates_cover_whole_days(cube):
+    frames = playback_frames(cube, pd.Timestamp('2024-06-02').date(), pd.Timestamp('2024-06-03').date())
+
+    times = pd.to_datetime(frames.times)
+    assert times[0] == pd.Timestamp('2024-06-02 00:00')
+    assert times[-1] == pd.Timestamp('2024-06-03 23:00')
+    # 48 hours less hour 30, at which no site reported; hour 31 stays with its gap
+    assert len(times) == 47
+    assert pd.Timestamp('2024-06-02 06:00') not in times
+    np.testing.assert_array_equal(frames.values[:, 0], np.delete(np.arange(24, 72), 6))
+    assert np.isnan(frames.values[6, 1])
+
+
+def test_an_end_with_a_time_is_kept(cube):
+    frames = playback_frames(cube, '2024-06-02 05:00', '2024-06-02 08:00')
+    assert pd.to_datetime(frames.times).hour.tolist() == [5, 7, 8]
+
+
+def test_site_order_is_kept_and_unknown_sites_dropped(cube):
+    frames = playback_frames(cube, '2024-06-01', '2024-06-01', site_ids=[103, 999, 101])
+
+    np.testing.assert_array_equal(frames.site_ids, [103, 101])
+    np.testing.assert_array_equal(frames.values[0], [2000.0, 0.0])
+    assert frames.values.shape == (24, 2)
+
+
+def test_long_ranges_keep_the_last_days(cube):
+    frames = playback_frames(cube, '2024-06-01', '2024-07-05')
+
+    times = pd.to_datetime(frames.times)
+    assert times[-1] == pd.Timestamp('2024-07-05 23:00')
+    assert times[0] == pd.Timestamp('2024-07-05') - pd.Timedelta(days=PLAYBACK_MAX_DAYS - 1)
+    assert len(times) == PLAYBACK_MAX_DAYS * 24
+
+    start, end = playback_range('2024-06-01', '2024-06-10', max_days=3)
+    assert (start, end) == (pd.Timestamp('2024-06-08'), pd.Timestamp('2024-06-10 23:00'))
+    assert playback_range('2024-06-09', '2024-06-10', max_days=3)[0] == pd.Timestamp('2024-06-09')
+
+
+def test_empty_ranges(cube):
+    frames = playback_frames(cube, '2025-01-01', '2025-01-02')
+    assert frames.times.shape == (0,)
+    assert frames.values.shape == (0, 3)
+
+    frames = playback_frames(cube, '2024-06-01', '2024-06-02', site_ids=[999])
+    assert frames.values.shape == (0, 0)
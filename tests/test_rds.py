@@ -0,0 +1,137 @@
+"""Round trip of hsri.rds against a small data frame serialized the way R does."""
+
+import gzip
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hsri import rds
+
+NA_REAL = struct.unpack('>d', bytes.fromhex('7ff00000000007a2'))[0]
+
+
+class _Writer:
+    """XDR serializer for the subset of R objects used here (as saveRDS writes them)."""
+
+    def __init__(self):
+        self.out = bytearray()
+        self.symbols = []
+
+    def int(self, value):
+        self.out += struct.pack('>i', value)
+
+    def charsxp(self, value):
+        if value is None:
+            self.int(rds.CHARSXP)
+            self.int(-1)
+        else:
+            data = value.encode('utf-8')
+            self.int(rds.CHARSXP | (1 << 15))  # UTF-8 flag
+            self.int(len(data))
+            self.out += data
+
+    def symbol(self, name):
+        if name in self.symbols:
+            self.int(rds.REFSXP | ((self.symbols.index(name) + 1) << 8))
+            return
+        self.symbols.append(name)
+        self.int(rds.SYMSXP)
+        self.charsxp(name)
+
+    def vector(self, sxp, values, attributes=None):
+        self.int(sxp | ((1 << 9) if attributes else 0))
+        self.int(len(values))
+        if sxp in (rds.LGLSXP, rds.INTSXP):
+            self.out += np.asarray(values, dtype='>i4').tobytes()
+        elif sxp == rds.REALSXP:
+            self.out += np.asarray(values, dtype='>f8').tobytes()
+        elif sxp == rds.STRSXP:
+            for value in values:
+                self.charsxp(value)
+        else:
+            for value in values:
+                self.vector(*value)
+        if attributes:
+            for name, value in attributes.items():
+                self.int(rds.LISTSXP | (1 << 10))
+                self.symbol(name)
+                self.vector(*value)
+            self.int(rds.NILVALUE_SXP)
+
+    def file(self, obj, version):
+        self.out += b'X\n'
+        self.int(version)
+        self.int(0x040301)
+        self.int(0x030500 if version == 3 else 0x020300)
+        if version == 3:
+            self.int(5)
+            self.out += b'UTF-8'
+        self.vector(*obj)
+        return bytes(self.out)
+
+
+NA = rds.NA_INTEGER
+
+# data.frame(id = c(1L, NA, 3L), name = c("Bronx", NA, "Kings"), hsri = c(0.5, NA, 2.25),
+#            hot = c(TRUE, NA, FALSE), level = factor(c("low", "high", "low")))
+# plus an sf-style point geometry column
+FRAME = (rds.VECSXP, [
+    (rds.INTSXP, [1, NA, 3]),
+    (rds.STRSXP, ['Bronx', None, 'Kings']),
+    (rds.REALSXP, [0.5, NA_REAL, 2.25]),
+    (rds.LGLSXP, [1, NA, 0]),
+    (rds.INTSXP, [2, 1, 2], {
+        'levels': (rds.STRSXP, ['high', 'low']),
+        'class': (rds.STRSXP, ['factor']),
+    }),
+    (rds.VECSXP, [
+        (rds.REALSXP, [-73.9, 40.8], {'class': (rds.STRSXP, ['XY', 'POINT', 'sfg'])}),
+        (rds.REALSXP, [-73.8, 40.7], {'class': (rds.STRSXP, ['XY', 'POINT', 'sfg'])}),
+        (rds.REALSXP, [-73.7, 40.6], {'class': (rds.STRSXP, ['XY', 'POINT', 'sfg'])}),
+    ], {
+        'crs': (rds.VECSXP, [(rds.STRSXP, ['EPSG:4326'])]),
+        'class': (rds.STRSXP, ['sfc_POINT', 'sfc']),
+    }),
+], {
+    'names': (rds.STRSXP, ['id', 'name', 'hsri', 'hot', 'level', 'geometry']),
+    'row.names': (rds.INTSXP, [NA, -3]),
+    'sf_column': (rds.STRSXP, ['geometry']),
+    'class': (rds.STRSXP, ['sf', 'data.frame']),
+})
+
+
+@pytest.mark.parametrize('version, compress', [(3, gzip.compress), (2, bytes)])
+def test_read_rds_frame_round_trip(tmp_path, version, compress):
+    path = tmp_path / 'fixture.rds'
+    path.write_bytes(compress(_Writer().file(FRAME, version)))
+
+    df = rds.read_rds_frame(path)
+
+    assert list(df.columns) == ['id', 'name', 'hsri', 'hot', 'level', 'geometry']
+    assert df['id'].dtype == 'Int64'
+    assert df['id'].tolist() == [1, pd.NA, 3]
+    assert df['name'].tolist() == ['Bronx', None, 'Kings']
+    np.testing.assert_array_equal(df['hsri'].to_numpy(), [0.5, np.nan, 2.25])
+    assert df['hot'].tolist() == [True, pd.NA, False]
+    assert df['level'].tolist() == ['low', 'high', 'low']
+    assert list(df['level'].cat.categories) == ['high', 'low']
+    np.testing.assert_allclose(np.stack(df['geometry']), [[-73.9, 40.8], [-73.8, 40.7], [-73.7, 40.6]])
+    assert df.attrs == {'sf_column': 'geometry', 'crs': 'EPSG:4326'}
+
+
+def test_read_rds_rejects_ascii(tmp_path):
+    path = tmp_path / 'ascii.rds'
+    path.write_bytes(b'A\n3\n')
+    with pytest.raises(ValueError, match='XDR'):
+        rds.read_rds(path)
+
+
+def test_rds_frame_rejects_non_frame(tmp_path):
+    path = tmp_path / 'vector.rds'
+    path.write_bytes(_Writer().file((rds.REALSXP, [1.0, 2.0]), 3))
+    obj = rds.read_rds(path)
+    np.testing.assert_array_equal(obj.value, [1.0, 2.0])
+    with pytest.raises(ValueError, match='not a data frame'):
+        rds.rds_frame(obj)
@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hsri.render_cache import RenderCache
+
+
+def test_bytes_bound_evicts_least_recently_used():
+    cache = RenderCache(max_bytes=30, max_entries=10)
+    cache.put('a', 'x' * 10)
+    cache.put('b', 'y' * 10)
+    cache.put('c', 'z' * 10)
+    assert cache.nbytes == 30 and len(cache) == 3
+
+    cache.put('d', 'w' * 10)
+    assert 'a' not in cache
+    assert [key for key in 'bcd' if key in cache] == ['b', 'c', 'd']
+    assert cache.nbytes == 30
+
+    # A large entry pushes out as many old ones as it needs
+    cache.put('e', 'v' * 25)
+    assert len(cache) == 1 and 'e' in cache and cache.nbytes == 25
+
+
+def test_hit_refreshes_recency():
+    cache = RenderCache(max_bytes=30, max_entries=10)
+    for key in 'abc':
+        cache.put(key, key * 10)
+
+    assert cache.get('a') == 'a' * 10
+    cache.put('d', 'd' * 10)
+    assert 'a' in cache and 'b' not in cache
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert cache.get('b') is None
+    assert cache.misses == 1
+
+
+def test_entry_bound_and_sizes_in_utf8_bytes():
+    cache = RenderCache(max_bytes=100, max_entries=2)
+    for key in 'abc':
+        cache.put(key, key)
+    assert 'a' not in cache and len(cache) == 2
+
+    cache = RenderCache(max_bytes=10)
+    cache.put('deg', '°' * 4)
+    assert cache.nbytes == 8
+    cache.put('big', '°' * 6)  # 12 bytes: never kept
+    assert 'big' not in cache and cache.nbytes == 8
+
+    # Replacing an entry does not count it twice
+    cache.put('deg', 'abc')
+    assert cache.nbytes == 3 and len(cache) == 1
+
+
+def test_concurrent_misses_render_once():
+    cache = RenderCache()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def render():
+        calls.append(1)
+        time.sleep(0.05)
+        return '<html>'
+
+    def call(_):
+        barrier.wait()
+        return cache.get_or_render('key', render)
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(call, range(8)))
+
+    assert results == ['<html>'] * 8
+    assert len(calls) == 1
+    assert cache.get_or_render('key', render) == '<html>' and len(calls) == 1
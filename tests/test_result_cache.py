@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hsri.result_cache import ResultCache, SingleFlight
+
+N_CALLERS = 8
+
+
+def _concurrently(fn):
+    """Run fn in N_CALLERS threads released together; their results in order."""
+    barrier = threading.Barrier(N_CALLERS)
+
+    def call(_):
+        barrier.wait()
+        return fn()
+
+    with ThreadPoolExecutor(N_CALLERS) as pool:
+        return list(pool.map(call, range(N_CALLERS)))
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResultCache()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    threading.Timer(0.2, release.set).start()
+    results = _concurrently(lambda: cache.get_or_compute('key', compute))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.misses == 1
+    assert cache.hits + cache.coalesced == N_CALLERS - 1
+    assert cache.get_or_compute('key', compute) is results[0]
+    assert cache.hits + cache.coalesced == N_CALLERS
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = ResultCache()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError('boom')
+
+    def call():
+        try:
+            cache.get_or_compute('key', fail)
+        except RuntimeError as exc:
+            return exc
+
+    errors = _concurrently(call)
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert len(calls) < N_CALLERS
+    assert 'key' not in cache
+    assert cache.get_or_compute('key', lambda: 1) == 1
+
+
+def test_single_flight_reports_shared_callers():
+    flight = SingleFlight()
+    release = threading.Event()
+    threading.Timer(0.2, release.set).start()
+
+    results = _concurrently(lambda: flight.do('key', lambda: 'value' if release.wait(5) else None))
+
+    assert [value for value, _ in results] == ['value'] * N_CALLERS
+    assert sum(not shared for _, shared in results) == 1
+    with pytest.raises(KeyError):
+        flight.do('other', lambda: {}['missing'])
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert len(cache) == 2
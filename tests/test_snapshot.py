@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from hsri.snapshot import MAX_VIEWS, Snapshot, build_snapshot
+from hsri.timeindex import build_time_index
+
+
+def _snapshot():
+    rows = pd.DataFrame({
+        'site_name': ['A', 'B', 'C', 'A'],
+        'hsri': [10.0, 50.0, 90.0, np.nan],
+    })
+    return Snapshot(pd.Timestamp('2024-07-01', tz='UTC'), rows)
+
+
+def test_views_filter_rows():
+    snapshot = _snapshot()
+    current, area, high = snapshot.views(['A', 'B'], 40)
+    assert current is snapshot.rows
+    assert area['site_name'].tolist() == ['A', 'B', 'A']
+    assert high['hsri'].tolist() == [50.0]
+    pd.testing.assert_frame_equal(snapshot.views(['A', 'B'], 40)[2], high)
+
+    # No selected site reported: the area is every row, not a copy
+    assert snapshot.views(['Z'], 0)[1] is snapshot.rows
+
+
+def test_views_cache_only_bounded_positions():
+    snapshot = _snapshot()
+    for threshold in range(MAX_VIEWS + 5):
+        snapshot.views(['A'], threshold)
+    assert len(snapshot._views) == MAX_VIEWS
+    for positions in snapshot._views.values():
+        assert all(p is None or isinstance(p, np.ndarray) for p in positions)
+
+
+def test_build_snapshot_tolerates_repeated_metro_county():
+    weather_df = pd.DataFrame({
+        'datetime': pd.to_datetime(['2024-07-01 00:00', '2024-07-01 01:00', '2024-07-01 01:00'], utc=True),
+        'aqs_id_full': pd.Series([1, 1, 2]).astype('category'),
+        'hsri': [70.0, 80.0, 90.0],
+        'risk_code': np.array([3, 4, 5], dtype=np.int8),
+    })
+    sites_df = pd.DataFrame({
+        'aqs_id_full': [1, 2], 'site_name': ['A', 'B'], 'county': ['Kings County', 'Other'],
+        'latitude': [40.6, 40.7], 'longitude': [-73.9, -73.8],
+    })
+    metro_df = pd.DataFrame({
+        'state': ['NY', 'NY', 'NJ'], 'county': ['Kings County', 'Kings County', 'Bergen County'],
+        'geoid': [36047, 99999, 34003],
+    })
+
+    snapshot = build_snapshot(weather_df, build_time_index(weather_df), 1, sites_df, metro_df)
+
+    assert snapshot.time == pd.Timestamp('2024-07-01 01:00', tz='UTC')
+    assert snapshot.rows['site_name'].tolist() == ['A', 'B']
+    assert snapshot.rows['geoid'].tolist()[0] == 36047
+    assert pd.isna(snapshot.rows['state'].tolist()[1])
+    assert snapshot.rows['risk_text'].tolist() == ['High Heat', 'Critical Heat']
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from hsri.spatial import EARTH_RADIUS_KM, KDTree, SiteIndex
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def sites():
+    rng = np.random.default_rng(7)
+    n = 300
+    latitude = rng.uniform(40.0, 41.5, n)
+    longitude = rng.uniform(-75.0, -72.5, n)
+    latitude[[5, 17]] = np.nan  # unlocated sites are not indexed
+    return np.arange(1000, 1000 + n), latitude, longitude
+
+
+@pytest.fixture
+def queries():
+    rng = np.random.default_rng(11)
+    return rng.uniform(39.8, 41.7, 40), rng.uniform(-75.2, -72.3, 40)
+
+
+@pytest.mark.parametrize('leaf_size', [1, 8, 64])
+def test_nearest_matches_brute_force(sites, queries, leaf_size):
+    ids, latitude, longitude = sites
+    index = SiteIndex(ids, latitude, longitude, leaf_size=leaf_size)
+    located = np.isfinite(latitude)
+
+    for lat, lon in zip(*queries):
+        expected_km = haversine_km(lat, lon, latitude[located], longitude[located])
+        order = np.argsort(expected_km, kind='stable')[:5]
+        found_ids, found_km = index.nearest(lat, lon, k=5)
+        np.testing.assert_array_equal(found_ids, ids[located][order])
+        np.testing.assert_allclose(found_km, expected_km[order], rtol=1e-9)
+
+
+def test_nearest_many_matches_nearest_and_pads(sites, queries):
+    ids, latitude, longitude = sites
+    index = SiteIndex(ids[:3], latitude[:3], longitude[:3])
+    many_ids, many_km = index.nearest_many(*queries, k=4)
+    assert many_ids.shape == many_km.shape == (40, 4)
+    assert np.isinf(many_km[:, 3]).all()
+    for row, (lat, lon) in enumerate(zip(*queries)):
+        one_ids, one_km = index.nearest(lat, lon, k=3)
+        np.testing.assert_array_equal(many_ids[row, :3], one_ids)
+        np.testing.assert_allclose(many_km[row, :3], one_km)
+
+
+@pytest.mark.parametrize('radius_km', [0.0, 5.0, 25.0, 500.0])
+def test_within_matches_brute_force(sites, queries, radius_km):
+    ids, latitude, longitude = sites
+    index = SiteIndex(ids, latitude, longitude)
+    located = np.isfinite(latitude)
+
+    for lat, lon in zip(*queries):
+        expected_km = haversine_km(lat, lon, latitude[located], longitude[located])
+        # Ignore sites within rounding of the boundary
+        inside = expected_km <= radius_km * (1 - 1e-9)
+        found_ids, found_km = index.within(lat, lon, radius_km)
+        assert set(ids[located][inside]) <= set(found_ids)
+        assert len(found_ids) <= (expected_km <= radius_km * (1 + 1e-9)).sum()
+        assert np.all(np.diff(found_km) >= 0)
+
+
+def test_empty_tree():
+    tree = KDTree(np.empty((0, 3)))
+    d, i = tree.query(np.zeros(3), k=3)
+    assert len(d) == len(i) == 0
+    d, i = tree.query_radius(np.zeros(3), 1.0)
+    assert len(d) == len(i) == 0
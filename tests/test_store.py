@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hsri.store import open_frame_store, open_store_array, prune_stores, store_path, write_frame_store
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'datetime': pd.to_datetime(['2024-07-01 00:00', '2024-07-01 01:00', '2024-07-01 02:00'], utc=True),
+        'aqs_id_full': pd.Series([840360610135, 840360050080, 840360610135]).astype('category'),
+        'temp': [80.5, np.nan, 79.0],
+        'risk_code': np.array([1, 2, 3], dtype=np.int8),
+        'reported': [True, False, True],
+    })
+
+
+def test_round_trip(tmp_path, frame):
+    root = str(tmp_path / 'store')
+    cube = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+    write_frame_store(frame, root, 'v1', arrays={'cube': cube})
+
+    df = open_frame_store(root, 'v1')
+    pd.testing.assert_frame_equal(df.copy(deep=True), frame)
+    assert df.attrs['data_version'] == 'v1'
+    np.testing.assert_array_equal(open_store_array(root, 'v1', 'cube'), cube)
+
+    projected = open_frame_store(root, 'v1', columns=['temp'])
+    assert list(projected.columns) == ['temp']
+
+    assert open_frame_store(root, 'v2') is None
+    assert open_store_array(root, 'v1', 'missing') is None
+
+
+def test_columns_are_read_only_memory_maps(tmp_path, frame):
+    root = str(tmp_path / 'store')
+    write_frame_store(frame, root, 'v1', arrays={'cube': np.zeros(3)})
+    df = open_frame_store(root, 'v1')
+
+    temp = df['temp'].to_numpy()
+    assert isinstance(temp.base, np.memmap) or isinstance(temp, np.memmap)
+    assert not temp.flags.writeable
+    with pytest.raises(ValueError):
+        temp[0] = 0.0
+
+    cube = open_store_array(root, 'v1', 'cube')
+    assert isinstance(cube, np.memmap)
+    with pytest.raises(ValueError):
+        cube[0] = 1.0
+
+
+def test_existing_version_is_kept_and_prune_keeps_current(tmp_path, frame):
+    root = str(tmp_path / 'store')
+    write_frame_store(frame, root, 'v1')
+    write_frame_store(frame.iloc[:1], root, 'v1')
+    assert len(open_frame_store(root, 'v1')) == 3
+
+    write_frame_store(frame, root, 'v2')
+    os.makedirs(store_path(root, 'v3') + '.tmp-other')
+    prune_stores(root, 'v2')
+    assert sorted(os.listdir(root)) == ['v2', 'v3.tmp-other']
+
+
+def test_unsupported_dtype_leaves_no_partial_store(tmp_path, frame):
+    root = str(tmp_path / 'store')
+    with pytest.raises(TypeError):
+        write_frame_store(frame.assign(name=['a', 'b', 'c']), root, 'v1')
+    assert os.listdir(root) == []
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hsri.sites import SiteRegistry
+from hsri.spatial import EARTH_RADIUS_KM
+from hsri.surface import IDW_POWER, MIN_DISTANCE_KM, HsriSurface, grid_axes
+
+BOUNDS = ((40.0, -74.1), (40.4, -73.7))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def stations():
+    latitudes, longitudes = grid_axes(BOUNDS)
+    # Site 0 sits on cell (3, 4); the others are well away from it
+    latitude = np.array([latitudes[3], 40.35, 40.05, np.nan, 40.2])
+    longitude = np.array([longitudes[4], -73.75, -73.75, -73.9, np.nan])
+    return latitude, longitude
+
+
+def test_cell_on_a_station_takes_its_value(stations):
+    surface = HsriSurface(*stations, BOUNDS)
+    grid = surface.interpolate(np.array([0.8, 0.1, 0.2, 0.5, 0.5]))
+
+    assert grid.shape == surface.shape == (20, 20)
+    assert grid[3, 4] == pytest.approx(0.8, rel=1e-3)
+
+
+def test_matches_inverse_distance_reference(stations):
+    latitude, longitude = stations
+    values = np.array([0.8, 0.1, 0.2, 0.5, 0.5])
+    surface = HsriSurface(latitude, longitude, BOUNDS)
+    grid = surface.interpolate(values)
+
+    located = np.isfinite(latitude) & np.isfinite(longitude)
+    for i, j in [(0, 0), (3, 4), (10, 15), (19, 19)]:
+        distance = haversine_km(surface.latitudes[i], surface.longitudes[j], latitude[located], longitude[located])
+        weights = np.maximum(distance, MIN_DISTANCE_KM) ** -IDW_POWER
+        assert grid[i, j] == pytest.approx(np.sum(weights * values[located]) / weights.sum(), rel=1e-4)
+
+
+def test_unlocated_and_unreported_sites_drop_out(stations):
+    surface = HsriSurface(*stations, BOUNDS)
+
+    # No coordinates, no weight, so their values never reach the grid
+    assert (surface.weights[:, 3:] == 0).all()
+    assert (surface.weights[:, :3] > 0).all()
+    base = surface.interpolate(np.array([0.8, 0.1, 0.2, np.nan, np.nan]))
+    np.testing.assert_array_equal(surface.interpolate(np.array([0.8, 0.1, 0.2, 5.0, -5.0])), base)
+
+    # A NaN value drops out of the weighted mean instead of counting as zero
+    only_two = HsriSurface(*(coord[1:3] for coord in stations), BOUNDS)
+    np.testing.assert_allclose(
+        surface.interpolate(np.array([np.nan, 0.1, 0.2, np.nan, np.nan])),
+        only_two.interpolate(np.array([0.1, 0.2])), rtol=1e-6,
+    )
+    assert np.isnan(surface.interpolate(np.full(5, np.nan))).all()
+
+
+def test_mask_and_many_frames(stations):
+    mask = np.zeros((20, 20), dtype=bool)
+    mask[5:15, 5:15] = True
+    surface = HsriSurface(*stations, BOUNDS, mask=mask)
+    values = np.array([[0.8, 0.3], [0.1, 0.4], [0.2, np.nan], [0.5, 0.5], [0.5, 0.5]])
+    grids = surface.interpolate_many(values)
+
+    assert grids.shape == (2, 20, 20)
+    assert np.isnan(grids[:, ~mask]).all()
+    assert np.isfinite(grids[:, mask]).all()
+    for frame in range(2):
+        np.testing.assert_array_equal(grids[frame], surface.interpolate(values[:, frame]))
+
+
+def test_centroid_placed_sites_are_left_out():
+    table = pd.DataFrame({
+        'site_name': ['Queens', 'Bronx'],
+        'county': ['Queens County', 'Bronx County'],
+        'geoid': ['36081', '36005'],
+        'latitude': [40.25, 40.15],
+        'longitude': [-73.8, -74.0],
+    }, index=pd.Index([840360810124, 840360050110], name='aqs_id_full'))
+    counties = pd.DataFrame({
+        'county': ['Kings County'], 'state': ['NY'], 'latitude': [40.1], 'longitude': [-73.95],
+    }, index=pd.Index(['36047'], name='geoid'))
+    registry = SiteRegistry(table, counties)
+    ids = [840360050110, 840360470118, 840360810124]
+
+    # lookup() places the unknown Kings station at the county centroid ...
+    sites = registry.lookup(ids)
+    assert sites.loc[840360470118, ['latitude', 'longitude']].tolist() == [40.1, -73.95]
+
+    # ... but it carries no weight on the surface
+    latitude, longitude = registry.surveyed_coordinates(ids)
+    np.testing.assert_array_equal(latitude, [40.15, np.nan, 40.25])
+    np.testing.assert_array_equal(longitude, [-74.0, np.nan, -73.8])
+    surface = HsriSurface(latitude, longitude, BOUNDS)
+    assert (surface.weights[:, 1] == 0).all()
+    np.testing.assert_array_equal(
+        surface.interpolate(np.array([0.3, 0.9, 0.6])),
+        surface.interpolate(np.array([0.3, np.nan, 0.6])),
+    )
@@ -0,0 +1,85 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hsri.timeindex import build_day_index, build_time_index, find_closest_time, find_day, get_day_slice, get_time_slice
+
+
+def _frame(times):
+    """One or more rows per timestamp, sorted by time."""
+    stamps = pd.to_datetime(times, utc=True)
+    repeats = np.arange(len(stamps)) % 3 + 1
+    return pd.DataFrame({'datetime': np.repeat(stamps, repeats), 'row': np.arange(repeats.sum())})
+
+
+TIMES = ['2024-07-01 00:00', '2024-07-01 02:00', '2024-07-01 03:00', '2024-07-02 23:00', '2024-07-03 00:00']
+
+
+def test_time_index_row_ranges():
+    df = _frame(TIMES)
+    index = build_time_index(df)
+    assert len(index.times) == len(TIMES)
+    for pos, ts in enumerate(pd.to_datetime(TIMES, utc=True)):
+        rows = get_time_slice(df, index, pos)
+        pd.testing.assert_frame_equal(rows, df[df['datetime'] == ts])
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('2024-07-01 00:00', 0),
+    ('2024-06-30 12:00', 0),            # before the first time
+    ('2024-07-01 01:00', 0),            # tie: the earlier time wins
+    ('2024-07-01 01:01', 1),
+    ('2024-07-01 02:30', 1),            # tie
+    ('2024-07-01 02:31', 2),
+    ('2024-07-02 12:00', 3),
+    ('2024-07-04 00:00', 4),            # after the last time
+    (pd.Timestamp('2024-07-01 05:00', tz='America/New_York'), 2),  # 09:00 UTC
+])
+def test_find_closest_time(query, expected):
+    index = build_time_index(_frame(TIMES))
+    assert find_closest_time(index, query) == expected
+
+
+def test_find_closest_time_naive_is_utc_and_empty_index():
+    index = build_time_index(_frame(TIMES))
+    assert find_closest_time(index, pd.Timestamp('2024-07-01 03:00')) == 2
+    empty = build_time_index(_frame([]))
+    assert len(empty.times) == 0
+    assert find_closest_time(empty, '2024-07-01') == -1
+
+
+def _day_reference(df):
+    """{date: (first row, stop row)} by grouping on the UTC date."""
+    dates = df['datetime'].dt.tz_convert('UTC').dt.date
+    return {date: (rows.index.min(), rows.index.max() + 1) for date, rows in df.groupby(dates)}
+
+
+@pytest.mark.parametrize('times', [
+    TIMES,
+    ['2024-07-01 05:00'],
+    pd.date_range('2024-06-29 17:00', periods=100, freq='3h').strftime('%Y-%m-%d %H:%M').tolist(),
+])
+def test_day_index_matches_groupby_date(times):
+    df = _frame(times)
+    day_index = build_day_index(build_time_index(df))
+    reference = _day_reference(df)
+
+    assert [day.item() for day in day_index.days] == sorted(reference)
+    for pos, day in enumerate(day_index.days):
+        assert (day_index.starts[pos], day_index.stops[pos]) == reference[day.item()]
+        assert find_day(day_index, day.item()) == pos
+        pd.testing.assert_frame_equal(get_day_slice(df, day_index, pos), df[df['datetime'].dt.date == day.item()])
+
+
+def test_find_day():
+    day_index = build_day_index(build_time_index(_frame(TIMES)))
+    assert find_day(day_index, date(2024, 7, 2)) == 1
+    assert find_day(day_index, '2024-07-03') == 2
+    assert find_day(day_index, pd.Timestamp('2024-07-01 23:59')) == 0
+    assert find_day(day_index, date(2024, 7, 4)) is None
+
+    empty = build_day_index(build_time_index(_frame([])))
+    assert len(empty.days) == len(empty.starts) == len(empty.stops) == 0
+    assert find_day(empty, date(2024, 7, 1)) is None